@@ -1,4 +1,9 @@
 import os
+import threading
+import time
+from dataclasses import dataclass
+from collections import OrderedDict
+from typing import Any, Tuple
 from singleton import singleton
 from tool_manager import ToolManager
 from langchain_ollama import ChatOllama, OllamaLLM
@@ -6,7 +11,16 @@ from langchain_ollama import ChatOllama, OllamaLLM
 # from langchain_openai import ChatOpenAI # if you want to use openai
 from langchain_core.messages import HumanMessage
 from langchain.agents import AgentExecutor, create_tool_calling_agent
+from parallel_executor import ParallelAgentExecutor
 from langchain_core.prompts import ChatPromptTemplate
+from conversation_memory import ConversationMemory
+from ollama_residency import ModelResidency, KEEP_ALIVE, NUM_CTX
+from tool_manifest import tools_signature
+from tool_router import ToolRouter
+from intent_router import IntentRouter
+from response_cache import ResponseCache
+import observation_budget
+from prompt_profiler import PromptProfile, PromptProfiler, format_report, tool_token_costs
 
 import logging
 
@@ -57,31 +71,133 @@ Your Action: Call run_command to install cmatrix, then retry matrix_mode
 
 Remember: Be proactive, not reactive. Try to solve problems automatically rather than just reporting errors."""
 
+
+@dataclass(frozen=True)
+class AgentSnapshot:
+    """Immutable tools + agent + executor generation. A run keeps the snapshot it started with."""
+    version: int
+    tools: Tuple[Any, ...]
+    agent: Any
+    executor: AgentExecutor
+    signature: str  # hash of the tool schemas (prompt prefix)
+    router: ToolRouter  # BM25 index over this generation's tools
+    executors: "OrderedDict[Tuple[str, ...], AgentExecutor]"  # per routed subset, LRU
+
+
+MAX_ROUTED_EXECUTORS = 32
+
+
 @singleton
 class AIManager:
     def __init__(self):
         self.tool_manager = ToolManager()
 
-        self.llm = ChatOllama(model=os.getenv("LLAMA_MODEL"), reasoning=os.getenv("LLAMA_RESONING"), base_url=os.getenv("OLLAMA_BASE_URL"))
+        # keep_alive stops Ollama from unloading the model between commands,
+        # num_ctx must stay the same for every request or Ollama reloads the model
+        self.llm = ChatOllama(
+            model=os.getenv("LLAMA_MODEL"),
+            reasoning=os.getenv("LLAMA_RESONING"),
+            base_url=os.getenv("OLLAMA_BASE_URL"),
+            keep_alive=KEEP_ALIVE,
+            num_ctx=NUM_CTX
+        )
         #llm = ChatOpenAI(model="gpt-4o-mini", api_key=api_key, organization=org_id) for openai
 
-        # Load initial tools
-        self.tools = self.tool_manager.load_all_tools()
-
         # prompt setup
         self.prompt = self.get_prompt()
+        self.memory = ConversationMemory(self.llm)
+        self.residency = ModelResidency(self)
+        self.last_profile = None  # PromptProfile of the last request
+        self.intent_router = IntentRouter()  # answers trivial commands without the LLM
+        self._last_routed = ()  # tool names of the last routed request
+        self.response_cache = ResponseCache()  # answers near-repeats of tool-free questions
+        if observation_budget.SUMMARIZE:
+            observation_budget.ObservationStore().summarizer = observation_budget.make_llm_summarizer(self.llm)
+
+        # Reloads build a new snapshot and publish it with one attribute assignment
+        self._build_lock = threading.Lock()
+        self._executors_lock = threading.Lock()  # routed executors cache of the snapshots
+        self._reload_lock = threading.Lock()
+        self._reload_requested = False
+        self._reload_thread = None
+        # Tool changes waiting for the reload worker
+        self._pending_modules = set()
+        self._pending_removed = set()
+        self._pending_all = False
 
+        # Load initial tools, agent + executor
+        self._snapshot = self._build_snapshot(1, self.tool_manager.load_all_tools())
+
+    def _build_snapshot(self, version: int, tools) -> AgentSnapshot:
+        tools = tuple(tools)
+        agent, executor = self._build_executor(tools)
+        return AgentSnapshot(version, tools, agent, executor, tools_signature(tools),
+                             ToolRouter(tools), OrderedDict())
+
+    def _build_executor(self, tools):
+        agent = create_tool_calling_agent(llm=self.llm, tools=list(tools), prompt=self.prompt)
         # Agent + executor with error handling
-        self.agent = create_tool_calling_agent(llm=self.llm, tools=self.tools, prompt=self.prompt)
-        self.executor = AgentExecutor(
-            agent=self.agent, 
-            tools=self.tools, 
+        executor = ParallelAgentExecutor(
+            agent=agent, 
+            tools=list(tools), 
             verbose=True,
             max_iterations=10,  # Allow multiple attempts to solve problems
             max_execution_time=120,  # 2 minutes max for complex tasks
             handle_parsing_errors=True,  # Gracefully handle parsing errors
             return_intermediate_steps=True  # Don't clutter output with intermediate steps
         )
+        return agent, executor
+
+    def _get_routed_executor(self, snapshot: AgentSnapshot, command: str) -> AgentExecutor:
+        """Executor bound to the tools the router picked for this command."""
+        if not snapshot.router.is_enabled():
+            return snapshot.executor
+        # The previous question helps with follow-ups ("et à Londres ?")
+        tools = snapshot.router.select(f"{self.memory.last_user_input()} {command}")
+        key = tuple(tool.name for tool in tools)
+        self._last_routed = key
+        with self._executors_lock:
+            executor = snapshot.executors.get(key)
+            if executor is None:
+                executor = self._build_executor(tools)[1]
+                snapshot.executors[key] = executor
+                if len(snapshot.executors) > MAX_ROUTED_EXECUTORS:
+                    snapshot.executors.popitem(last=False)
+            else:
+                snapshot.executors.move_to_end(key)
+        return executor
+
+    def get_warm_up_tools(self) -> Tuple[Any, ...]:
+        """
+        Tools a request is most likely to bind, so a warm-up evaluates the same prefix.
+
+        Returns:
+            The tools of the last routed subset (pinned tools until a request was
+            routed), or every tool when routing is disabled
+        """
+        snapshot = self._snapshot
+        if not snapshot.router.is_enabled():
+            return snapshot.tools
+        # Names survive reloads, the subset is rebuilt from this generation's tools
+        names = set(self._last_routed)
+        tools = tuple(tool for tool in snapshot.tools if tool.name in names)
+        return tools or tuple(snapshot.router.pinned)
+
+    def get_snapshot(self) -> AgentSnapshot:
+        """The current agent generation (read once per run)."""
+        return self._snapshot
+
+    @property
+    def tools(self):
+        return list(self._snapshot.tools)
+
+    @property
+    def agent(self):
+        return self._snapshot.agent
+
+    @property
+    def executor(self):
+        return self._snapshot.executor
 
     def set_tool_manager(self, tool_manager):
         self.tool_manager = tool_manager
@@ -95,6 +211,7 @@ class AIManager:
                 (
                 "system", SYSTEM_PROMPT
                 ),
+                ("placeholder", "{history}"),
                 ("human", "{input}"),
                 ("placeholder", "{agent_scratchpad}"),
             ]
@@ -103,21 +220,128 @@ class AIManager:
     def get_executor(self):
         return self.executor
 
-    def reload(self):
-        self.tools = self.tool_manager.get_all_tools()
-        # Recreate agent with updated tools
-        self.agent = create_tool_calling_agent(llm=self.llm, tools=self.tools, prompt=self.prompt)
-        self.executor = AgentExecutor(
-            agent=self.agent, 
-            tools=self.tools, 
-            verbose=True,
-            max_iterations=10,
-            max_execution_time=120,
-            handle_parsing_errors=True,
-            return_intermediate_steps=True
-        )
-        logging.info("🔄 AIManager updated with fresh tools")  
+    def invoke(self, command: str, config=None):
+        """
+        Run the agent on a command with the conversation history and remember the turn.
+        Trivial commands matched by the intent router and near-repeats of earlier
+        tool-free questions skip the LLM.
+
+        Args:
+            command: The user's input
+            config: Optional LangChain RunnableConfig (callbacks...)
+
+        Returns:
+            The executor response dict ("output", "intermediate_steps"...)
+        """
+        snapshot = self._snapshot  # a concurrent reload doesn't affect this run
+        if self.intent_router.is_enabled():
+            response = self.intent_router.route(command, snapshot.tools, config)
+            if response is not None:
+                self.memory.add_turn(command, response["output"])
+                return response
+        history = self.memory.get_messages()
+        cached = self.response_cache.lookup(command, history)
+        if cached is not None:
+            self.memory.add_turn(command, cached)
+            return {"input": command, "output": cached, "intermediate_steps": []}
+
+        executor = self._get_routed_executor(snapshot, command)
+
+        # Per-component token breakdown of every LLM call of the run
+        profile = PromptProfile(command, tool_token_costs(executor.tools))
+        self.last_profile = profile
+        config = dict(config or {})
+        config["callbacks"] = list(config.get("callbacks") or []) + [PromptProfiler(profile)]
+
+        self.residency.touch()
+        start = time.perf_counter()
+        with self.memory.agent_running():
+            response = executor.invoke({"input": command, "history": history}, config=config)
+        self.intent_router.record_agent_latency(time.perf_counter() - start)
+        self.residency.touch()
+        logging.info(profile.summary())
+        self.response_cache.store(command, response, history)
+        self.memory.add_turn(command, response["output"])
+        return response
+
+    def get_prompt_stats(self) -> dict:
+        """Estimated token breakdown of the first LLM call of the last request."""
+        if self.last_profile is None or not self.last_profile.calls:
+            return {}
+        stats = dict(self.last_profile.calls[0].components)
+        if self.last_profile.evaluated_tokens is not None:
+            stats["ollama_evaluated"] = self.last_profile.evaluated_tokens
+        return stats
+
+    def get_token_report(self) -> str:
+        """Report of where the prompt tokens go: last request and every tool schema."""
+        report = format_report(self.last_profile, self._snapshot.tools)
+        return f"{report}\n{observation_budget.ObservationStore().get_stats()}"
+
+    def reload(self) -> AgentSnapshot:
+        """
+        Build a new snapshot from the ToolManager's current tools and publish it.
+
+        Runs in progress keep using the snapshot they started with.
+
+        Returns:
+            The published snapshot
+        """
+        with self._build_lock:
+            previous = self._snapshot
+            snapshot = self._build_snapshot(previous.version + 1, self.tool_manager.get_all_tools())
+            self._snapshot = snapshot  # atomic swap
+        logging.info(f"🔄 AIManager updated with fresh tools (agent v{snapshot.version}, {len(snapshot.tools)} tools)")
+        # The tool schemas are part of the prompt prefix, get it evaluated again
+        # unless only the tools' implementation changed
+        if snapshot.signature != previous.signature:
+            self.residency.warm_up_async()
+        return snapshot
+
+    def reload_async(self, modules=(), removed=(), reload_all: bool = False):
+        """
+        Reload tool modules and rebuild the agent on a background thread.
+
+        Requests made meanwhile are coalesced. Runs in progress keep their
+        snapshot, and the ToolManager is only changed on the reload worker.
 
-# 
+        Args:
+            modules: Module or tool names to reload
+            removed: Module names whose file was deleted
+            reload_all: Reload every tool module
+        """
+        with self._reload_lock:
+            self._pending_modules.update(modules)
+            self._pending_removed.update(removed)
+            self._pending_all = self._pending_all or reload_all
+            self._reload_requested = True
+            if self._reload_thread is not None:
+                return  # the running worker will pick the request up
+            self._reload_thread = threading.Thread(target=self._reload_worker, name="pierre-reload", daemon=True)
+            self._reload_thread.start()
 
+    def _reload_worker(self):
+        while True:
+            with self._reload_lock:
+                if not self._reload_requested:
+                    self._reload_thread = None
+                    return
+                self._reload_requested = False
+                modules, removed, reload_all = self._pending_modules, self._pending_removed, self._pending_all
+                self._pending_modules, self._pending_removed, self._pending_all = set(), set(), False
+            try:
+                self._apply_tool_changes(modules, removed, reload_all)
+                self.reload()
+            except Exception as e:
+                logging.error(f"❌ Failed to rebuild the agent: {e}")
 
+    def _apply_tool_changes(self, modules, removed, reload_all: bool):
+        # One lock for the whole batch: get_all_tools() sees all of these changes or none
+        with self.tool_manager.lock:
+            if reload_all:
+                self.tool_manager.reload_all_tools()
+                return
+            for module_name in sorted(removed):
+                self.tool_manager.unload_module(module_name)
+            for identifier in sorted(set(modules) - set(removed)):
+                self.tool_manager.reload_specific_tool(identifier)
@@ -0,0 +1,226 @@
+"""
+Audio capture subsystem.
+A dedicated thread drains the microphone continuously into a fixed-size,
+preallocated ring buffer. Consumers (wake word, command STT, VAD) read through
+their own cursors, so audio keeps being captured while the agent or TTS runs.
+"""
+
+import logging
+import os
+import threading
+from typing import Optional
+
+from singleton import singleton
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2  # paInt16
+CHANNELS = 1
+PA_INPUT_OVERFLOWED = -9981  # pyaudio.paInputOverflowed
+
+
+class RingBuffer:
+    """
+    Single-producer ring buffer of raw PCM bytes.
+
+    Only the capture thread writes, seqlock style: `writing_position` is bumped
+    before the copy to where the write will end, and `write_position` (every
+    byte ever written) is published after it. Readers never take a lock on the
+    data path; they detect being lapped by checking `writing_position` after
+    copying. The condition variable is only used to wake up waiting readers.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self.write_position = 0
+        self.writing_position = 0  # end of the write in progress
+        self.closed = False  # no more data is coming
+        self._data_ready = threading.Condition()
+
+    def write(self, data: bytes):
+        size = len(data)
+        position = self.write_position
+        if size > self.capacity:
+            # Only the most recent `capacity` bytes can be kept
+            position += size - self.capacity
+            data = data[-self.capacity:]
+            size = self.capacity
+
+        self.writing_position = position + size
+        start = position % self.capacity
+        first = min(size, self.capacity - start)
+        self._view[start:start + first] = data[:first]
+        if first < size:
+            self._view[0:size - first] = data[first:]
+
+        self.write_position = position + size
+        with self._data_ready:
+            self._data_ready.notify_all()
+
+    def read_at(self, position: int, size: int) -> Optional[bytes]:
+        """
+        Copy `size` bytes starting at absolute `position`.
+
+        Returns:
+            The bytes, or None if the writer overwrote them before or during the copy
+        """
+        if self.writing_position - position > self.capacity:
+            return None
+        start = position % self.capacity
+        first = min(size, self.capacity - start)
+        data = bytes(self._view[start:start + first])
+        if first < size:
+            data += bytes(self._view[0:size - first])
+        if self.writing_position - position > self.capacity:
+            return None
+        return data
+
+    def wait_for(self, position: int, timeout: Optional[float]) -> bool:
+        """Wait until the write position reaches `position` or the buffer is closed."""
+        with self._data_ready:
+            return self._data_ready.wait_for(lambda: self.write_position >= position or self.closed, timeout)
+
+    def close(self):
+        """Wake up waiting readers, the writer stopped."""
+        with self._data_ready:
+            self.closed = True
+            self._data_ready.notify_all()
+
+    def reopen(self):
+        self.closed = False
+
+
+class CaptureCursor:
+    """Independent read position of one consumer in the capture ring buffer."""
+
+    def __init__(self, ring: RingBuffer, name: str):
+        self.ring = ring
+        self.name = name
+        self.position = ring.write_position
+        self.overruns = 0
+        self.dropped_bytes = 0
+
+    def read(self, size: int, timeout: Optional[float] = None) -> bytes:
+        """
+        Read `size` bytes, blocking until they have been captured.
+
+        Args:
+            size: Number of bytes to read
+            timeout: Maximum time to wait in seconds, None waits until the capture stops
+
+        Returns:
+            The audio bytes; fewer than `size` if the timeout expired or the
+            capture stopped (empty once everything captured has been read)
+        """
+        self.ring.wait_for(self.position + size, timeout)
+        size = min(size, self.ring.write_position - self.position)
+
+        while True:
+            self._check_overrun()
+            data = self.ring.read_at(self.position, size)
+            if data is not None:
+                self.position += len(data)
+                return data
+
+    def available(self) -> int:
+        """Number of captured bytes not yet read by this cursor."""
+        self._check_overrun()
+        return self.ring.write_position - self.position
+
+    def fill_level(self) -> float:
+        """Fraction of the ring buffer holding audio this cursor has not read yet."""
+        return min(1.0, (self.ring.write_position - self.position) / self.ring.capacity)
+
+    def seek_to_live(self):
+        """Skip everything captured so far and continue from the current position."""
+        self.position = self.ring.write_position
+
+    def _check_overrun(self):
+        # The writer lapped this cursor (or is about to): jump to the oldest audio still in the buffer
+        lag = self.ring.writing_position - self.position
+        if lag > self.ring.capacity:
+            # Keep a small margin so the writer does not lap us again right away
+            skip = lag - self.ring.capacity + self.ring.capacity // 10
+            self.position += skip
+            self.overruns += 1
+            self.dropped_bytes += skip
+            logging.warning(f"⚠️  Capture cursor '{self.name}' overrun, dropped {skip} bytes")
+
+
+@singleton
+class AudioCapture:
+    """Singleton owning the capture thread and the shared ring buffer."""
+
+    FRAMES_PER_READ = 1600  # 100 ms at 16 kHz
+
+    def __init__(self):
+        seconds = float(os.getenv("CAPTURE_BUFFER_SECONDS", 30))
+        self.ring = RingBuffer(int(SAMPLE_RATE * SAMPLE_WIDTH * CHANNELS * seconds))
+        self.cursors = {}
+        self.device_overflows = 0
+        self._stream = None
+        self._thread = None
+        self._running = threading.Event()
+        logging.info(f"🎙️ AudioCapture initialized ({seconds:.0f}s ring buffer)")
+
+    def start(self, stream):
+        """
+        Start draining a PyAudio input stream on the capture thread.
+
+        Args:
+            stream: An opened PyAudio input stream (16 kHz, mono, int16)
+        """
+        if self._running.is_set():
+            return
+        self._stream = stream
+        self.ring.reopen()
+        self._running.set()
+        self._thread = threading.Thread(target=self._run, name="pierre-capture", daemon=True)
+        self._thread.start()
+        logging.info("🎙️ Audio capture thread started")
+
+    def stop(self):
+        """Stop the capture thread."""
+        self._running.clear()
+        self.ring.close()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def is_running(self) -> bool:
+        return self._running.is_set()
+
+    def open_cursor(self, name: str) -> CaptureCursor:
+        """
+        Get the cursor of a consumer, created at the live position on first use.
+
+        Args:
+            name: Consumer name (e.g. "wake_word", "command")
+        """
+        if name not in self.cursors:
+            self.cursors[name] = CaptureCursor(self.ring, name)
+        return self.cursors[name]
+
+    def get_stats(self) -> str:
+        """Get formatted capture counters (device overflows, per-cursor overruns and fill level)."""
+        seconds = self.ring.write_position / (SAMPLE_RATE * SAMPLE_WIDTH * CHANNELS)
+        info = f"🎙️ Captured {seconds:.0f}s of audio, {self.device_overflows} device overflow(s)\n"
+        for name, cursor in self.cursors.items():
+            info += (f"  • {name}: fill {cursor.fill_level() * 100:.0f}%, "
+                     f"{cursor.overruns} overrun(s), {cursor.dropped_bytes} bytes dropped\n")
+        return info
+
+    def _run(self):
+        while self._running.is_set():
+            try:
+                data = self._stream.read(self.FRAMES_PER_READ, exception_on_overflow=True)
+            except IOError as e:
+                if getattr(e, "errno", None) == PA_INPUT_OVERFLOWED:
+                    self.device_overflows += 1
+                    continue
+                logging.error(f"❌ Audio capture failed: {e}")
+                self._running.clear()
+                self.ring.close()  # readers must not wait for audio that won't come
+                return
+            self.ring.write(data)
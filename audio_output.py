@@ -0,0 +1,172 @@
+"""
+Audio output engine.
+Plays raw PCM on a single long-lived PyAudio output stream instead of writing
+a WAV file and starting a new player for every utterance.
+"""
+
+import logging
+import queue
+import threading
+from typing import Iterable, Optional, Tuple
+
+from singleton import singleton
+from input import InputMethod
+
+_END = object()
+
+
+@singleton
+class AudioOutput:
+    """Singleton owning the PyAudio output stream used for every reply."""
+
+    WRITE_CHUNK_SECONDS = 0.05  # granularity of stream writes
+    PREFETCH_CHUNKS = 4  # synthesized chunks buffered ahead of playback
+
+    def __init__(self):
+        self._lock = threading.Lock()  # one utterance at a time on the stream
+        self._generation = 0  # bumped by interrupt(), utterances of older generations stop
+        self._stream = None
+        self._stream_format: Optional[Tuple[int, int, int]] = None
+        logging.info("🔈 AudioOutput initialized")
+
+    def _get_stream(self, sample_rate: int, channels: int, sample_width: int):
+        """Open the output stream, or reopen it if the audio format changed."""
+        stream_format = (sample_rate, channels, sample_width)
+        if self._stream is not None and self._stream_format == stream_format:
+            return self._stream
+
+        self._close_stream()
+        pAudio = InputMethod().pAudio  # reuse the PyAudio instance of the input side
+        self._stream = pAudio.open(
+            format=pAudio.get_format_from_width(sample_width),
+            channels=channels,
+            rate=sample_rate,
+            output=True
+        )
+        self._stream_format = stream_format
+        logging.info(f"🔈 Opened audio output stream ({sample_rate} Hz, {channels} ch)")
+        return self._stream
+
+    @property
+    def generation(self) -> int:
+        """Current playback generation; pass it to play() to tie an utterance to it."""
+        return self._generation
+
+    def _write(self, stream, pcm: bytes, sample_rate: int, channels: int, sample_width: int, generation: int) -> bool:
+        # Small writes so an interruption takes effect within one slice
+        step = int(sample_rate * self.WRITE_CHUNK_SECONDS) * channels * sample_width
+        for offset in range(0, len(pcm), step):
+            if self._generation != generation:
+                return False
+            stream.write(pcm[offset:offset + step])
+        return True
+
+    def interrupt(self, timeout: float = 0.2) -> bool:
+        """
+        Stop the utterance currently playing (barge-in), and any utterance of
+        the same generation that has not started yet.
+
+        Args:
+            timeout: Maximum time to wait for the writer to give up the stream
+
+        Returns:
+            True once playback has stopped
+        """
+        self._generation += 1
+        # The writer holds the lock for the whole utterance
+        stopped = self._lock.acquire(timeout=timeout)
+        if stopped:
+            self._lock.release()
+        return stopped
+
+    def play(self, pcm: bytes, sample_rate: int, channels: int = 1, sample_width: int = 2,
+             generation: Optional[int] = None):
+        """
+        Play a PCM buffer and block until it has been written to the device.
+
+        Args:
+            pcm: Raw interleaved PCM samples
+            sample_rate: Sample rate in Hz
+            channels: Number of channels
+            sample_width: Bytes per sample
+            generation: Playback generation the utterance belongs to (default: the current one);
+                nothing is played if interrupt() was called since
+        """
+        generation = self._generation if generation is None else generation
+        with self._lock:
+            if self._generation != generation:
+                return
+            stream = self._get_stream(sample_rate, channels, sample_width)
+            self._write(stream, pcm, sample_rate, channels, sample_width, generation)
+
+    def play_chunks(self, chunks: Iterable, generation: Optional[int] = None) -> Optional[bytes]:
+        """
+        Play Piper `AudioChunk`s as they are synthesized.
+
+        Synthesis runs on a helper thread a few chunks ahead of playback, so the
+        next sentence is ready by the time the current one has been written.
+
+        Args:
+            chunks: Iterable of Piper AudioChunk objects (e.g. `voice.synthesize(text)`)
+            generation: Playback generation the utterance belongs to (default: the current one)
+
+        Returns:
+            The complete PCM that was played, or None if playback was interrupted
+        """
+        generation = self._generation if generation is None else generation
+        pending = queue.Queue(maxsize=self.PREFETCH_CHUNKS)
+        done = threading.Event()  # set when the consumer stops, so the producer never blocks forever
+
+        def put(item):
+            while not done.is_set():
+                try:
+                    pending.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def produce():
+            try:
+                for chunk in chunks:
+                    if done.is_set():
+                        return
+                    put(chunk)
+            except Exception as e:
+                logging.error(f"❌ Speech synthesis failed: {e}")
+            finally:
+                put(_END)
+
+        threading.Thread(target=produce, name="pierre-synth", daemon=True).start()
+
+        played = bytearray()
+        with self._lock:
+            try:
+                while True:
+                    if self._generation != generation:
+                        return None
+                    try:
+                        chunk = pending.get(timeout=self.WRITE_CHUNK_SECONDS)
+                    except queue.Empty:
+                        continue
+                    if chunk is _END:
+                        break
+                    stream = self._get_stream(chunk.sample_rate, chunk.sample_channels, chunk.sample_width)
+                    if not self._write(stream, chunk.audio_int16_bytes, chunk.sample_rate, chunk.sample_channels,
+                                       chunk.sample_width, generation):
+                        return None
+                    played += chunk.audio_int16_bytes
+            finally:
+                done.set()
+        return bytes(played)
+
+    def _close_stream(self):
+        if self._stream is not None:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._stream = None
+            self._stream_format = None
+
+    def close(self):
+        """Close the output stream."""
+        with self._lock:
+            self._close_stream()
@@ -0,0 +1,157 @@
+"""
+Barge-in support.
+Lets the user interrupt Pierre: when speech is detected during playback, the
+answer stops playing, the agent run in flight is cancelled and the new
+utterance is processed. Also keeps metrics on how often it happens and how
+fast cancellation completes.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# "wake": saying the wake word interrupts (robust to Pierre hearing itself)
+# "vad": any speech interrupts (needs headphones or echo cancellation)
+BARGE_IN_MODE = os.getenv("BARGE_IN_MODE", "wake")
+BARGE_IN_MIN_SPEECH_MS = 240  # sustained speech needed in "vad" mode
+
+
+class RunCancelled(Exception):
+    """Raised inside an agent run that was cancelled by a barge-in."""
+
+
+class CancellationHandler(BaseCallbackHandler):
+    """
+    Callback that aborts an agent run at its next step once cancelled.
+
+    LangChain re-raises errors of handlers with `raise_error = True`, so raising
+    from `on_llm_new_token` stops a streaming LLM call mid-answer, and raising
+    from the tool/agent callbacks stops the run between tool calls. The
+    parallel executor also polls `check()` while it waits for pool tools, so a
+    slow tool call does not hold the run; the call itself keeps running.
+    """
+
+    raise_error = True
+
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self.cancelled_at: Optional[float] = None
+
+    def cancel(self):
+        if not self._cancelled.is_set():
+            self.cancelled_at = time.time()
+            self._cancelled.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def check(self):
+        """Raise RunCancelled if the run was cancelled."""
+        if self._cancelled.is_set():
+            raise RunCancelled("Agent run cancelled by barge-in")
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self.check()
+
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        self.check()
+
+    def on_llm_new_token(self, token, **kwargs):
+        self.check()
+
+    def on_agent_action(self, action, **kwargs):
+        self.check()
+
+    def on_tool_start(self, serialized, input_str, **kwargs):
+        self.check()
+
+    def on_tool_end(self, output, **kwargs):
+        self.check()
+
+
+class BargeInDetector:
+    """Decides, chunk by chunk, whether the user is talking over Pierre."""
+
+    def __init__(self, wake_word: str, mode: str = BARGE_IN_MODE):
+        self.wake_word = wake_word.lower()
+        self.mode = mode
+        from vad import VoiceActivityDetector  # numpy, only needed once the microphone is used
+        self.detector = VoiceActivityDetector()
+        self.recognizer = None
+        self._speech_frames = 0
+        self._needed_frames = max(1, BARGE_IN_MIN_SPEECH_MS // 30)
+
+    def reset(self):
+        self.detector.reset()
+        self._speech_frames = 0
+        if self.recognizer is not None:
+            self.recognizer.Reset()
+
+    def heard(self, chunk: bytes) -> bool:
+        """Feed a chunk of captured audio, True when the user barged in."""
+        if self.mode == "vad":
+            _, flags = self.detector.frames(chunk)
+            for speech in flags:
+                self._speech_frames = self._speech_frames + 1 if speech else 0
+                if self._speech_frames >= self._needed_frames:
+                    return True
+            return False
+
+        if not self.detector.is_speech(chunk):
+            return False
+        if self.recognizer is None:
+            from speechToText import SpeechToText
+            self.recognizer = SpeechToText().newWakeRecognizer(self.wake_word)
+        if self.recognizer.AcceptWaveform(chunk):
+            text = json.loads(self.recognizer.Result()).get("text", "")
+        else:
+            text = json.loads(self.recognizer.PartialResult()).get("partial", "")
+        return self.wake_word in text.lower()
+
+
+class BargeInMetrics:
+    """Counts barge-ins and measures how fast playback and the agent stop."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.answers = 0
+        self.barge_ins = 0
+        self.playback_stop_latencies: List[float] = []
+        self.cancel_latencies: List[float] = []
+
+    def record_answer(self):
+        with self._lock:
+            self.answers += 1
+
+    def record_barge_in(self, playback_stop_latency: float):
+        with self._lock:
+            self.barge_ins += 1
+            self.playback_stop_latencies.append(playback_stop_latency)
+        logging.info(f"🛑 Barge-in: playback stopped in {playback_stop_latency * 1000:.0f} ms")
+
+    def record_cancellation(self, latency: float):
+        with self._lock:
+            self.cancel_latencies.append(latency)
+        logging.info(f"🛑 Barge-in: agent run cancelled in {latency * 1000:.0f} ms")
+
+    def get_stats(self) -> str:
+        """Get formatted barge-in statistics."""
+        with self._lock:
+            rate = (self.barge_ins / self.answers * 100) if self.answers else 0
+            info = f"🛑 Barge-in: {self.barge_ins} of {self.answers} answers interrupted ({rate:.0f}%)"
+            if self.playback_stop_latencies:
+                info += (f", playback stopped in avg {_avg_ms(self.playback_stop_latencies)} ms "
+                         f"(max {max(self.playback_stop_latencies) * 1000:.0f} ms)")
+            if self.cancel_latencies:
+                info += (f", agent cancelled in avg {_avg_ms(self.cancel_latencies)} ms "
+                         f"(max {max(self.cancel_latencies) * 1000:.0f} ms)")
+            return info
+
+
+def _avg_ms(values: List[float]) -> str:
+    return f"{sum(values) / len(values) * 1000:.0f}"
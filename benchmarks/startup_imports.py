@@ -0,0 +1,79 @@
+"""
+Startup import benchmark.
+Imports each of Pierre's entry modules in a fresh interpreter and reports the
+import time, the peak RSS and which heavy native stacks (vosk, piper,
+onnxruntime, pyaudio, numpy) got loaded along the way.
+
+Usage:
+    python benchmarks/startup_imports.py [--repeat 5]
+
+The "main (keyboard)" row imports main.py without running its __main__ block,
+which is what a keyboard-mode startup pays before the first prompt. The rows
+after it import the audio stacks alone, which is what keyboard mode no longer
+pays; run it where they are installed, a missing stack shows as an error row.
+Run it on two commits to compare before/after numbers.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["vosk", "piper", "onnxruntime", "pyaudio", "numpy"]
+
+TARGETS = [
+    ("(interpreter)", ""),
+    ("input", "import input"),
+    ("pipeline", "import pipeline"),
+    ("ai_manager", "import ai_manager"),
+    ("tts", "import tts"),
+    ("speechToText", "import speechToText"),
+    ("main (keyboard)", "import main"),
+    ("numpy", "import numpy"),
+    ("vosk", "import vosk"),
+    ("piper", "import piper"),
+    ("pyaudio", "import pyaudio"),
+]
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+rss_mb = rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+print(json.dumps({{"seconds": elapsed, "rss_mb": rss_mb,
+                   "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(statement: str) -> dict:
+    code = PROBE.format(statement=statement, heavy=HEAVY_MODULES)
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed"
+        return {"error": error}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per module, the best time is kept")
+    args = parser.parse_args()
+
+    print(f"{'module':<18}{'import':>10}{'peak RSS':>12}  heavy stacks loaded")
+    for name, statement in TARGETS:
+        runs = [measure(statement) for _ in range(args.repeat)]
+        ok = [run for run in runs if "error" not in run]
+        if not ok:
+            print(f"{name:<18}{'-':>10}{'-':>12}  ❌ {runs[0]['error']}")
+            continue
+        best = min(ok, key=lambda run: run["seconds"])
+        print(f"{name:<18}{best['seconds'] * 1000:>8.0f}ms{best['rss_mb']:>10.1f}MB  {', '.join(best['heavy']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Tool router benchmark.
+Measures how the prompt grows with the number of tools when every schema is
+bound versus when the BM25 router binds only the top-k (plus pinned) tools,
+and how long routing itself takes. Extra tools are synthesized by cloning the
+real tools' schemas under new names.
+
+Usage:
+    python benchmarks/tool_router.py [--counts 12 25 50 100 200] [--top-k 4] [--ollama]
+
+--ollama also sends each prompt to the local model (1 generated token) and
+reports Ollama's prompt_eval_duration for both variants.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from tool_manager import ToolManager
+from tool_manifest import LazyTool, describe_tool
+from tool_router import ToolRouter, PINNED_TOOLS
+from utils.tokens import estimate_tokens
+
+QUERIES = [
+    "Quelle heure est-il ?",
+    "Quelle heure est-il à Tokyo ?",
+    "Lis le fichier requirements.txt",
+    "Cherche sur internet la population de Lyon",
+    "Quelles sont les actualités du jour ?",
+    "Installe numpy avec pip",
+    "Fais une capture d'écran",
+    "What is the battery level?",
+    "Switch to keyboard mode",
+    "Bonjour, comment ça va ?",
+]
+
+
+def synthesize_tools(real_tools, count):
+    """Real tools plus clones with new names, up to `count` tools."""
+    tools = list(real_tools)
+    entries = [describe_tool(tool) for tool in real_tools]
+    i = 0
+    while len(tools) < count:
+        entry = dict(entries[i % len(entries)])
+        entry["name"] = f"{entry['name']}_{i // len(entries) + 1}"
+        tools.append(LazyTool.from_manifest(entry, "synthetic", lambda module, name: None))
+        i += 1
+    return tools
+
+
+def schema_tokens(tools) -> int:
+    return sum(estimate_tokens(json.dumps(describe_tool(tool)["parameters"]) + tool.name + tool.description)
+               for tool in tools)
+
+
+def ollama_prompt_eval_ms(tools, query: str):
+    from ai_manager import AIManager
+    ai_manager = AIManager()
+    messages = ai_manager.get_prompt().format_messages(input=query, history=[], agent_scratchpad=[])
+    llm = ai_manager.llm.model_copy(update={"num_predict": 1})
+    response = llm.bind_tools(tools).invoke(messages)
+    return response.response_metadata.get("prompt_eval_duration", 0) / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--counts", type=int, nargs="+", default=[12, 25, 50, 100, 200])
+    parser.add_argument("--top-k", type=int, default=4)
+    parser.add_argument("--ollama", action="store_true", help="measure prompt_eval_duration on the local model")
+    args = parser.parse_args()
+
+    from ai_manager import SYSTEM_PROMPT
+    system_tokens = estimate_tokens(SYSTEM_PROMPT)
+    real_tools = ToolManager().load_all_tools()
+    print(f"{len(real_tools)} real tools, top-k {args.top_k}, pinned: {', '.join(PINNED_TOOLS)}")
+    print(f"{'tools':>6}{'all (tok)':>12}{'routed (tok)':>14}{'saved':>8}{'index ms':>10}{'route ms':>10}"
+          + (f"{'eval all ms':>13}{'eval routed ms':>16}" if args.ollama else ""))
+
+    for count in args.counts:
+        tools = synthesize_tools(real_tools, count)
+        start = time.perf_counter()
+        router = ToolRouter(tools, top_k=args.top_k)
+        index_ms = (time.perf_counter() - start) * 1000
+
+        all_tokens = system_tokens + schema_tokens(tools)
+        routed_tokens, route_ms, eval_all, eval_routed = [], [], [], []
+        for query in QUERIES:
+            start = time.perf_counter()
+            selected = router.select(query)
+            route_ms.append((time.perf_counter() - start) * 1000)
+            routed_tokens.append(system_tokens + schema_tokens(selected))
+            if args.ollama:
+                eval_all.append(ollama_prompt_eval_ms(tools, query))
+                eval_routed.append(ollama_prompt_eval_ms(selected, query))
+
+        routed = sum(routed_tokens) / len(routed_tokens)
+        line = (f"{count:>6}{all_tokens:>12}{routed:>14.0f}{(1 - routed / all_tokens) * 100:>7.0f}%"
+                f"{index_ms:>10.2f}{sum(route_ms) / len(route_ms):>10.3f}")
+        if args.ollama:
+            line += f"{sum(eval_all) / len(eval_all):>13.0f}{sum(eval_routed) / len(eval_routed):>16.0f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Wake-word CPU benchmark.
+Feeds the same audio through the full large-vocabulary recognizer and through
+the grammar-restricted wake-word recognizer, and reports the CPU time each
+mode costs per hour of listening.
+
+Usage:
+    python benchmarks/wake_word_cpu.py [--wav recording.wav] [--seconds 120]
+
+Without --wav, a mix of silence and low-level noise is used, which is what an
+always-on box hears most of the day.
+"""
+
+import argparse
+import json
+import os
+import random
+import struct
+import sys
+import time
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import vosk
+from model_manager import ModelManager as Model
+
+SAMPLE_RATE = 16000
+
+
+def load_audio(wav_path: str, seconds: float) -> bytes:
+    if wav_path:
+        with wave.open(wav_path, "rb") as wav_file:
+            if wav_file.getframerate() != SAMPLE_RATE or wav_file.getnchannels() != 1 or wav_file.getsampwidth() != 2:
+                raise SystemExit("The recording must be 16 kHz mono int16")
+            return wav_file.readframes(int(SAMPLE_RATE * seconds))
+
+    # Silence with bursts of low-level noise
+    random.seed(0)
+    samples = []
+    for i in range(int(SAMPLE_RATE * seconds)):
+        noisy = (i // SAMPLE_RATE) % 4 == 0
+        samples.append(random.randint(-800, 800) if noisy else random.randint(-30, 30))
+    return struct.pack(f"<{len(samples)}h", *samples)
+
+
+def run(recognizer, audio: bytes, chunk_size: int, use_partials: bool) -> float:
+    start = time.process_time()
+    for offset in range(0, len(audio), chunk_size):
+        if recognizer.AcceptWaveform(audio[offset:offset + chunk_size]):
+            json.loads(recognizer.Result())
+        elif use_partials:
+            json.loads(recognizer.PartialResult())
+    return time.process_time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare wake-word CPU cost of the full and grammar recognizers")
+    parser.add_argument("--wav", help="16 kHz mono int16 recording to replay")
+    parser.add_argument("--seconds", type=float, default=120, help="Seconds of audio to process")
+    parser.add_argument("--wake-word", default="pierre")
+    args = parser.parse_args()
+
+    vosk.SetLogLevel(-1)
+    audio = load_audio(args.wav, args.seconds)
+    audio_seconds = len(audio) / (SAMPLE_RATE * 2)
+
+    print(f"Loading models ({Model().get_model_vosk()}, {Model().get_model_vosk_wake()})...")
+    full_model = vosk.Model(Model().get_model_vosk())
+    wake_path = Model().get_model_vosk_wake()
+    wake_model = vosk.Model(wake_path) if os.path.isdir(wake_path) else full_model
+
+    modes = {
+        "full (1 s reads)": (vosk.KaldiRecognizer(full_model, SAMPLE_RATE), 16000, False),
+        "grammar (125 ms reads + partials)": (
+            vosk.KaldiRecognizer(wake_model, SAMPLE_RATE, json.dumps([args.wake_word, "[unk]"])), 4000, True
+        ),
+    }
+
+    print(f"\nProcessed {audio_seconds:.0f}s of audio per mode\n")
+    print(f"{'mode':<36}{'CPU s/audio s':>15}{'CPU s/hour':>12}{'core %':>9}")
+    for name, (recognizer, chunk_size, use_partials) in modes.items():
+        cpu = run(recognizer, audio, chunk_size, use_partials)
+        ratio = cpu / audio_seconds
+        print(f"{name:<36}{ratio:>15.4f}{ratio * 3600:>12.0f}{ratio * 100:>8.1f}%")
+
+
+if __name__ == "__main__":
+    main()
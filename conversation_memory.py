@@ -0,0 +1,175 @@
+"""
+Conversation memory for AIManager.
+Keeps the most recent turns verbatim within a token budget and folds older
+turns into a running summary on a background thread, so the prompt stays
+bounded without adding latency to the turn being answered. Summaries are only
+generated while no agent run is using the model; failed ones are retried
+with a backoff, and after repeated failures the oldest turns are dropped so
+the history still fits in the budget.
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Iterable, List, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+from utils.tokens import estimate_messages_tokens, estimate_tokens
+
+SUMMARY_PROMPT = """You maintain a running summary of a conversation between a user and Pierre, a voice assistant.
+Merge the new lines into the current summary. Keep facts, names, preferences, decisions and open tasks.
+Drop greetings and small talk. Write at most {max_words} words, in the language of the conversation.
+Reply with the summary only."""
+
+_THINK_BLOCK = re.compile(r'<think>.*?</think>', re.DOTALL)
+
+MAX_SUMMARY_FAILURES = 3  # in a row, before unsummarized turns are dropped
+RETRY_DELAY = 5.0  # seconds before the first retry, doubled after each failure
+MAX_RETRY_DELAY = 120.0
+
+
+class ConversationMemory:
+    """Token-budgeted history with rolling summarization."""
+
+    def __init__(self, llm, token_budget: int = None, summary_words: int = None):
+        self.llm = llm
+        self.token_budget = token_budget or int(os.getenv("MEMORY_TOKEN_BUDGET", 1500))
+        self.summary_words = summary_words or int(os.getenv("MEMORY_SUMMARY_WORDS", 120))
+        self.turns = deque()  # (human, ai) kept verbatim
+        self.pending: List[Tuple[str, str]] = []  # evicted turns not summarized yet
+        self.summary = ""
+        self.failures = 0  # summarizations failed in a row
+        self._lock = threading.Lock()
+        self._wake_up = threading.Event()
+        self._idle = threading.Event()  # no agent run is using the model
+        self._idle.set()
+        self._running = 0
+        self._thread = threading.Thread(target=self._summarize_loop, name="pierre-memory", daemon=True)
+        self._thread.start()
+
+    def add_turn(self, human: str, ai: str):
+        """
+        Record a finished turn, evicting the oldest turns beyond the token budget.
+
+        Args:
+            human: The user's input
+            ai: Pierre's answer
+        """
+        with self._lock:
+            self.turns.append((human, ai))
+            while len(self.turns) > 1 and self._tokens(self.turns) > self.token_budget:
+                self.pending.append(self.turns.popleft())
+            if self.pending:
+                self._wake_up.set()
+
+    @contextmanager
+    def agent_running(self):
+        """Hold summarization back while an agent run uses the model."""
+        with self._lock:
+            self._running += 1
+            self._idle.clear()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._running -= 1
+                if not self._running:
+                    self._idle.set()
+
+    def get_messages(self) -> List[BaseMessage]:
+        """
+        Get the history to insert in the prompt.
+
+        The summary is its own system message after the main system prompt, so
+        the static prefix (system prompt + tools) is unchanged when it updates.
+        Turns still waiting to be summarized stay verbatim until they are, or
+        until summarization has failed MAX_SUMMARY_FAILURES times in a row.
+        """
+        with self._lock:
+            messages: List[BaseMessage] = []
+            if self.summary:
+                messages.append(SystemMessage(content=f"Summary of the earlier conversation:\n{self.summary}"))
+            pending = list(self.pending)
+            if self.failures >= MAX_SUMMARY_FAILURES:  # the summarizer is failing, keep within the budget
+                room = self.token_budget - self._tokens(self.turns)
+                while pending and self._tokens(pending) > room:
+                    pending.pop(0)
+            for human, ai in pending + list(self.turns):
+                messages.append(HumanMessage(content=human))
+                messages.append(AIMessage(content=ai))
+            return messages
+
+    def last_user_input(self) -> str:
+        """The user's input of the latest recorded turn, or an empty string."""
+        with self._lock:
+            if self.turns:
+                return self.turns[-1][0]
+            return self.pending[-1][0] if self.pending else ""
+
+    def token_count(self) -> int:
+        """Estimated tokens the history adds to the prompt."""
+        return estimate_messages_tokens(self.get_messages())
+
+    def clear(self):
+        with self._lock:
+            self.turns.clear()
+            self.pending.clear()
+            self.summary = ""
+            self.failures = 0
+
+    @staticmethod
+    def _tokens(turns: Iterable[Tuple[str, str]]) -> int:
+        return sum(estimate_tokens(human) + estimate_tokens(ai) + 8 for human, ai in turns)
+
+    def _drop_pending(self):
+        # Caller holds the lock. Oldest unsummarized turns go first
+        dropped = 0
+        while self.pending and self._tokens(self.pending) + self._tokens(self.turns) > self.token_budget:
+            self.pending.pop(0)
+            dropped += 1
+        if dropped:
+            logging.warning(f"⚠️  Dropped {dropped} unsummarized turn(s) to stay within the memory budget")
+
+    def _summarize_loop(self):
+        while True:
+            self._wake_up.wait()
+            self._wake_up.clear()
+            self._idle.wait()  # don't compete with a live run for the model
+            with self._lock:
+                batch = list(self.pending)
+                summary = self.summary
+            if not batch:
+                continue
+
+            lines = "\n".join(f"User: {human}\nPierre: {ai}" for human, ai in batch)
+            try:
+                result = self.llm.invoke([
+                    SystemMessage(content=SUMMARY_PROMPT.format(max_words=self.summary_words)),
+                    HumanMessage(content=f"Current summary:\n{summary or '(empty)'}\n\nNew lines:\n{lines}"),
+                ])
+                new_summary = _THINK_BLOCK.sub("", result.content).strip()
+            except Exception as e:
+                with self._lock:
+                    self.failures += 1
+                    failures = self.failures
+                    if failures >= MAX_SUMMARY_FAILURES:
+                        self._drop_pending()
+                delay = min(MAX_RETRY_DELAY, RETRY_DELAY * 2 ** (failures - 1))
+                logging.error(f"❌ Failed to summarize conversation ({failures} in a row), retrying in {delay:.0f}s: {e}")
+                time.sleep(delay)
+                self._wake_up.set()
+                continue
+
+            with self._lock:
+                self.failures = 0
+                self.summary = new_summary
+                # Only drop the turns that made it into this summary
+                del self.pending[:len(batch)]
+                if self.pending:
+                    self._wake_up.set()
+            logging.info(f"🧾 Conversation summary updated ({estimate_tokens(new_summary)} tokens)")
@@ -1,7 +1,8 @@
-import pyaudio
 import logging
-import aslaNoOutPut
+import select
+import sys
 from singleton import singleton
+from audio_capture import AudioCapture
 
 
 logging.basicConfig(level=logging.INFO)
@@ -15,12 +16,23 @@ class InputMethod:
 
     def __init__(self, selected_method=None):
         self.__selected_method = selected_method
-        self.pAudio = pyaudio.PyAudio()
+        self._pAudio = None  # PyAudio is only started when audio input or output is used
         self.audioStream = None
+        self._prompted = False  # "You: " is printed, waiting for the line
         if self.__selected_method == self.MICROPHONE:
             self._initialize_microphone()
 
+    @property
+    def pAudio(self):
+        """The shared PyAudio instance, created on first use."""
+        if self._pAudio is None:
+            import pyaudio
+            import aslaNoOutPut  # silence ALSA before PortAudio probes the devices
+            self._pAudio = pyaudio.PyAudio()
+        return self._pAudio
+
     def _initialize_microphone(self):
+        import pyaudio
         logging.info("Initializing microphone...")
         self.audioStream = self.pAudio.open(
             format=pyaudio.paInt16, 
@@ -31,6 +43,8 @@ class InputMethod:
             output=False
         )
         self.audioStream.start_stream()
+        # Drain the device continuously, consumers read through capture cursors
+        AudioCapture().start(self.audioStream)
 
     def get_selected_method(self):
         return self.__selected_method
@@ -38,6 +52,7 @@ class InputMethod:
         logging.info(f"Setting input method to: {method}")
         if method in [self.KEYBOARD, self.MICROPHONE]:
             self.__selected_method = method
+            self._prompted = False
             if method == self.MICROPHONE and self.audioStream is None:
                 self._initialize_microphone()
         else:
@@ -48,18 +63,48 @@ class InputMethod:
         else:
             return None
 
-    def getCommand(self):
-        if self.__selected_method == self.KEYBOARD:
-            command = input("You: ")
-            return command
+    def getAudioCursor(self, name):
+        if self.__selected_method == self.MICROPHONE:
+            return AudioCapture().open_cursor(name)
         else:
             return None
 
+    def getCommand(self, timeout=None):
+        """
+        Read a line typed on the keyboard.
+
+        Args:
+            timeout: Seconds to wait for the line, None waits until one is typed
+
+        Returns:
+            The line, or None if none was typed in time or keyboard mode is not selected
+        """
+        if self.__selected_method != self.KEYBOARD:
+            return None
+        if timeout is None:
+            self._prompted = False
+            return input("You: ")
+        if not self._prompted:
+            print("You: ", end="", flush=True)
+            self._prompted = True
+        # The terminal hands the line over once Enter is pressed, so select
+        # never returns on a half-typed line
+        ready, _, _ = select.select([sys.stdin], [], [], timeout)
+        if not ready:
+            return None
+        self._prompted = False
+        line = sys.stdin.readline()
+        if not line:
+            raise EOFError
+        return line.rstrip("\n")
+
     def closeAudioStream(self):
+        AudioCapture().stop()
         if self.audioStream:
             self.audioStream.stop_stream()
             self.audioStream.close()
-        self.pAudio.terminate()
+        if self._pAudio is not None:
+            self._pAudio.terminate()
 
     def askForInputMethod(self):
         print("Select input method:")
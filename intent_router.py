@@ -0,0 +1,238 @@
+"""
+Intent router.
+Deterministic fast path in front of the agent: short, unambiguous commands
+("Quelle heure est-il ?", "take a screenshot", "passe en mode clavier") are
+matched against compiled French and English pattern tables, optionally with
+fuzzy matching for speech-recognition slips, and run the tool directly without
+an LLM call. Anything that doesn't match cleanly falls through to the agent.
+"""
+
+import difflib
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.agents import AgentAction
+
+ENABLED = os.getenv("INTENT_ROUTER", "True").lower() == "true"
+FUZZY_THRESHOLD = float(os.getenv("INTENT_ROUTER_FUZZY", 0.85))  # 0 disables fuzzy matching
+AMBIGUITY_MARGIN = 0.05  # two intents scoring this close to each other are left to the agent
+FUZZY_MAX_WORDS = 8  # longer inputs are never fuzzy-matched
+AGENT_LATENCY_SMOOTHING = 0.3  # weight of the latest agent run in the latency average
+
+# Leading wake word and politeness, which don't change the intent
+_FILLERS = re.compile(r"^(?:(?:hey|ok|dis|salut) )?pierre |^(?:please|stp|svp|s il te plait|s il vous plait) "
+                      r"| (?:please|stp|svp|s il te plait|s il vous plait|pierre)$")
+_FAILURE = re.compile(r"^\W*(error|failed|sorry|unable)", re.IGNORECASE)
+_CLOCK = re.compile(r"(\d{1,2}):(\d{2}) ([AP]M)")
+
+
+def normalize(text: str) -> str:
+    """Lowercase, accents and punctuation removed, fillers stripped."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^a-z0-9]+", " ", text).strip()
+    previous = None
+    while previous != text:
+        previous, text = text, _FILLERS.sub("", text).strip()
+    return text
+
+
+def _time_in_french(result: str, args: dict) -> str:
+    match = _CLOCK.search(result)
+    if match is None:
+        return result
+    hour, minute, meridiem = int(match.group(1)) % 12, int(match.group(2)), match.group(3)
+    hour += 12 if meridiem == "PM" else 0
+    place = f" à {args['city'].title()}" if args.get("city") else ""
+    return f"Il est {hour} h {minute:02d}{place}."
+
+
+@dataclass
+class Intent:
+    """A command the router can answer without the LLM."""
+    tool: str
+    patterns: Dict[str, Sequence[str]]  # language -> regexes on the normalized input, named groups are arguments
+    examples: Dict[str, Sequence[str]] = field(default_factory=dict)  # language -> phrasings for fuzzy matching
+    args: dict = field(default_factory=dict)  # fixed arguments
+    french: Optional[Callable[[str, dict], str]] = None  # rewrites the tool's English output for French input
+
+
+_CITY = r"(?P<city>[a-z]+(?: [a-z]+){0,2})"
+
+INTENTS: List[Intent] = [
+    Intent("get_time",
+           {"fr": [r"(?:quelle heure (?:est il|il est)|il est quelle heure|(?:tu as|t as|donne moi|dis moi) l heure)(?: maintenant)?"],
+            "en": [r"(?:what time is it|what s the time|what is the time|(?:tell|give) me the time)(?: now)?"]},
+           {"fr": ["quelle heure est il", "il est quelle heure"], "en": ["what time is it", "what s the time"]},
+           french=_time_in_french),
+    Intent("get_time_city",
+           {"fr": [rf"(?:quelle heure (?:est il|il est)|il est quelle heure) (?:a|au|aux) {_CITY}"],
+            "en": [rf"(?:what time is it|what s the time|what is the time) in {_CITY}"]},
+           french=_time_in_french),
+    Intent("capture_screenshot",
+           {"fr": [r"(?:fais|prends|faire|prendre) (?:une )?capture(?: d ecran)?", r"capture d ecran"],
+            "en": [r"(?:take|make|grab) (?:a )?screenshot", r"screenshot", r"capture the screen"]},
+           {"fr": ["fais une capture d ecran", "prends une capture d ecran"], "en": ["take a screenshot"]}),
+    Intent("switch_to_keyboard_mode",
+           {"fr": [r"(?:passe|bascule|repasse|mets toi)(?: en| au| sur le)? mode clavier", r"mode clavier"],
+            "en": [r"(?:switch|go|change) (?:back )?to keyboard(?: mode)?", r"keyboard mode"]},
+           {"fr": ["passe en mode clavier"], "en": ["switch to keyboard mode"]}),
+    Intent("switch_to_audio_mode",
+           {"fr": [r"(?:passe|bascule|repasse|mets toi)(?: en| au| sur le)? mode (?:audio|vocal|micro)",
+                   r"mode (?:audio|vocal|micro)"],
+            "en": [r"(?:switch|go|change) (?:back )?to (?:audio|voice|microphone)(?: mode)?",
+                   r"(?:audio|voice|microphone) mode"]},
+           {"fr": ["passe en mode vocal", "passe en mode audio"], "en": ["switch to voice mode", "switch to audio mode"]}),
+    Intent("reload_tools",
+           {"fr": [r"recharge(?:r)? (?:tous )?les outils"], "en": [r"reload (?:all )?(?:the )?tools"]},
+           {"fr": ["recharge les outils"], "en": ["reload all tools"]},
+           args={"identifier": "all"}),
+    Intent("reload_tools",
+           {"fr": [r"(?:liste|montre)(?: moi)? (?:tous )?les outils"], "en": [r"(?:list|show)(?: me)? (?:all )?(?:the )?tools"]},
+           {"fr": ["liste les outils"], "en": ["list all tools"]},
+           args={"identifier": "list"}),
+    Intent("get_os",
+           {"fr": [r"quel (?:est mon |est le )?systeme d exploitation(?: j utilise| tu utilises)?"],
+            "en": [r"what (?:os|operating system) (?:am i (?:using|running)|is this|do i have)"]}),
+]
+
+
+@dataclass
+class IntentMatch:
+    intent: Intent
+    language: str
+    args: dict
+    score: float  # 1.0 for a pattern match, the similarity ratio for a fuzzy one
+
+
+class IntentRouter:
+    """Matches commands against the intent tables and runs the tool directly."""
+
+    def __init__(self, intents: Sequence[Intent] = INTENTS, fuzzy_threshold: float = FUZZY_THRESHOLD):
+        self.fuzzy_threshold = fuzzy_threshold
+        self._patterns: List[Tuple[Intent, str, re.Pattern]] = [
+            (intent, language, re.compile(rf"^(?:{pattern})$"))
+            for intent in intents for language, patterns in intent.patterns.items() for pattern in patterns
+        ]
+        self._examples: List[Tuple[Intent, str, str]] = [
+            (intent, language, example)
+            for intent in intents for language, examples in intent.examples.items() for example in examples
+        ]
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.total = 0
+        self.fuzzy_hits = 0
+        self.saved_seconds = 0.0
+        self.agent_latency: Optional[float] = None  # moving average of an agent run, in seconds
+
+    def is_enabled(self) -> bool:
+        return ENABLED
+
+    def match(self, command: str) -> Optional[IntentMatch]:
+        """The intent of a command, or None if it isn't a clear-cut fast-path command."""
+        text = normalize(command)
+        if not text:
+            return None
+        for intent, language, pattern in self._patterns:
+            found = pattern.match(text)
+            if found:
+                args = {**intent.args, **{k: v for k, v in found.groupdict().items() if v}}
+                return IntentMatch(intent, language, args, 1.0)
+        if self.fuzzy_threshold <= 0 or len(text.split()) > FUZZY_MAX_WORDS:
+            return None
+
+        # Fuzzy matching, for transcription slips ("quel heure et il")
+        best: Dict[int, Tuple[float, Intent, str]] = {}
+        for intent, language, example in self._examples:
+            matcher = difflib.SequenceMatcher(None, text, example)
+            if matcher.real_quick_ratio() < self.fuzzy_threshold or matcher.quick_ratio() < self.fuzzy_threshold:
+                continue
+            score = matcher.ratio()
+            if score >= self.fuzzy_threshold and score > best.get(id(intent), (0,))[0]:
+                best[id(intent)] = (score, intent, language)
+        ranked = sorted(best.values(), key=lambda item: -item[0])
+        if not ranked:
+            return None
+        if len(ranked) > 1 and ranked[0][0] - ranked[1][0] < AMBIGUITY_MARGIN:
+            logging.debug(f"⚡ Ambiguous fast path for {command!r}: {ranked[0][1].tool} / {ranked[1][1].tool}")
+            return None
+        score, intent, language = ranked[0]
+        return IntentMatch(intent, language, dict(intent.args), score)
+
+    def route(self, command: str, tools: Sequence, config=None) -> Optional[dict]:
+        """
+        Answer a command without the LLM if it matches an intent.
+
+        Args:
+            command: The user's input
+            tools: Tools of the current agent snapshot
+            config: Optional LangChain RunnableConfig passed to the tool
+
+        Returns:
+            A response shaped like the executor's ("output", "intermediate_steps"),
+            or None to let the agent handle the command
+        """
+        start = time.perf_counter()
+        found = self.match(command)
+        tool = None
+        if found is not None:
+            tool = next((t for t in tools if t.name == found.intent.tool), None)
+        if tool is None:
+            self._record(None)
+            return None
+
+        try:
+            result = tool.invoke(found.args, config=config)
+        except Exception as e:
+            logging.warning(f"⚠️  Fast path {tool.name} failed, falling back to the agent: {e}")
+            self._record(None)
+            return None
+        if isinstance(result, str) and _FAILURE.match(result):
+            logging.info(f"⚡ Fast path {tool.name} returned an error, falling back to the agent")
+            self._record(None)
+            return None
+
+        output = str(result)
+        if found.language == "fr" and found.intent.french is not None:
+            output = found.intent.french(output, found.args)
+        self._record(time.perf_counter() - start, fuzzy=found.score < 1.0, tool_name=tool.name)
+        action = AgentAction(tool=tool.name, tool_input=found.args, log=f"fast path ({found.score:.2f})")
+        return {"input": command, "output": output, "intermediate_steps": [(action, result)]}
+
+    def record_agent_latency(self, seconds: float):
+        """Feed the duration of an agent run, used to estimate the time the fast path saves."""
+        with self._lock:
+            if self.agent_latency is None:
+                self.agent_latency = seconds
+            else:
+                self.agent_latency += AGENT_LATENCY_SMOOTHING * (seconds - self.agent_latency)
+
+    def _record(self, elapsed: Optional[float], fuzzy: bool = False, tool_name: str = None):
+        with self._lock:
+            self.total += 1
+            if elapsed is None:
+                return
+            self.hits += 1
+            self.fuzzy_hits += fuzzy
+            saved = ""
+            if self.agent_latency is not None:
+                self.saved_seconds += max(0.0, self.agent_latency - elapsed)
+                saved = f", ≈{max(0.0, self.agent_latency - elapsed):.2f}s saved ({self.saved_seconds:.1f}s total)"
+            logging.info(f"⚡ Fast path: {tool_name} in {elapsed * 1000:.0f} ms{saved} | "
+                         f"hit rate {self.hits / self.total * 100:.0f}% ({self.hits}/{self.total})")
+
+    def get_stats(self) -> str:
+        """Get formatted fast-path statistics."""
+        with self._lock:
+            rate = (self.hits / self.total * 100) if self.total else 0
+            info = (f"⚡ Fast path: {self.hits}/{self.total} commands ({rate:.0f}% hit rate, "
+                    f"{self.fuzzy_hits} fuzzy), ≈{self.saved_seconds:.1f}s saved")
+            if self.agent_latency is not None:
+                info += f", agent run ≈{self.agent_latency:.2f}s"
+            return info
@@ -1,95 +1,93 @@
-import logging
 import time
+_process_start = time.perf_counter()  # before the heavy imports, for the startup profile
+
+import argparse
+import logging
+import os
+import threading
 from dotenv import load_dotenv
 
+# Load .env before importing modules that read their settings at import time
+load_dotenv()
+
 # Importing main classes
+# speechToText (vosk) and tts (piper) are imported only once microphone mode needs them
 from input import InputMethod
-from speechToText import SpeechToText, SpeechToTextBadInputError, SpeechToTextError
 from ai_manager import AIManager
-from tts import speak_text
-
-load_dotenv()
-
-TRIGGER_WORD = "pierre"
-CONVERSATION_TIMEOUT = 30  # seconds of inactivity before exiting conversation mode
+from pipeline import InteractionPipeline
+from startup import StartupOrchestrator, should_preload_audio
+from tool_watcher import ToolWatcher
 
 logging.basicConfig(level=logging.DEBUG)  # logging
 
 # api_key = os.getenv("OPENAI_API_KEY") removed because it's not needed for ollama
 # org_id = os.getenv("OPENAI_ORG_ID") removed because it's not needed for ollama
 
-inputTool = InputMethod()
-stream = inputTool.getAudioStream() 
+startup = StartupOrchestrator(started_at=_process_start)
+startup.record("imports", 0.0, time.perf_counter() - _process_start)
+
+with startup.phase("input devices"):
+    inputTool = InputMethod()
+    stream = inputTool.getAudioStream() 
 
 
 # Initialize LLM
-ai_manager = AIManager()
+with startup.phase("agent + tools"):
+    ai_manager = AIManager()
 
-conversation_mode = False
-last_interaction_time = None
-# Main interaction loop
+# Main interaction loop: listener, agent and speaker stages run concurrently
 def write():
-    while True:
-        if inputTool.get_selected_method() == inputTool.MICROPHONE:
-            promptUsingAudio()
-        elif inputTool.get_selected_method() == inputTool.KEYBOARD:
-            promptUsingKeyboard()
-def promptUsingAudio():
-    global conversation_mode, last_interaction_time
+    InteractionPipeline(inputTool, ai_manager).run_forever()
 
-    try:
-        if not conversation_mode:
-            if SpeechToText().waitForWakeWord(TRIGGER_WORD):
-                logging.info(f"🗣 Triggered by wake word: {TRIGGER_WORD}")
-                conversation_mode = True
-                speak_text("Oui monsieur?")
-                last_interaction_time = time.time()
-        else:
-            logging.info("🎤 Listening for next command...")
-            audio = inputTool.getAudioStream().read(32000, exception_on_overflow=False)
-            logging.info("🔊 Processing audio...")
-            command = SpeechToText().getText(audio)
-            if not command:
-                logging.info("⚠️ No command detected, continuing...")
-                return
-            logging.info(f"📥 Command: {command}")
-            logging.info("🤖 Sending command to agent...")
-            response = ai_manager.get_executor().invoke({"input": command})
-            content = response["output"]
-            logging.info(f"✅ Agent responded: {content}")
-            print("Pierre:", content)
-            speak_text(content)
-            last_interaction_time = time.time()
-            if time.time() - last_interaction_time > CONVERSATION_TIMEOUT:
-                logging.info("⌛ Timeout: Returning to wake word mode.")
-                conversation_mode = False
-
-    except Exception as e:
-        logging.critical(f"❌ Critical error in main loop: {e}")
-
-def promptUsingKeyboard():
-    try:
-        command = inputTool.getCommand()
-        logging.info(f"📥 Command: {command}")
-        logging.info("🤖 Sending command to agent...")
-        response = ai_manager.get_executor().invoke({"input": command})
-        content = response["output"]
-        logging.info(f"✅ Agent responded: {content}")
-        print("Pierre:", content)
-    except Exception as e:
-        logging.critical(f"❌ Critical error in main loop: {e}")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Pierre, a voice assistant running on a local LLM")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print a per-component timing breakdown of the startup")
+    return parser.parse_args()
+
+
+def load_speech_to_text():
+    from speechToText import SpeechToText
+    SpeechToText().preloadModels()
+
+
+def load_text_to_speech():
+    from tts import load_voice
+    load_voice()
+
+
+def start_microphone_mode():
+    from speechToText import SpeechToText, SpeechToTextBadInputError
+    from tts import prewarm_speech
+    stt = SpeechToText()
+    try:
+        startup.wait("vosk model")
+        stt.loadModel()
+    except SpeechToTextBadInputError as e:
+        logging.critical(f"❌ {e}")
+        exit(1)
+    # Synthesize the wake-word acknowledgement & co. before they are needed
+    threading.Thread(target=prewarm_speech, name="pierre-tts-prewarm", daemon=True).start()
 
 
 if __name__ == "__main__":
-    inputTool.askForInputMethod()
+    args = parse_args()
+    # Load the models concurrently while the user picks a mode
+    startup.submit("ollama warm-up", ai_manager.residency.warm_up)
+    if should_preload_audio():
+        startup.submit("vosk model", load_speech_to_text)
+        startup.submit("piper voice", load_text_to_speech)
+    with startup.phase("input method prompt"):
+        inputTool.askForInputMethod()
+
     if inputTool.get_selected_method() == inputTool.MICROPHONE:
-        stt = SpeechToText()
-        try:
-            stt.loadModel()
-        except SpeechToTextBadInputError as e:
-            logging.critical(f"❌ {e}")
-            exit(1)
+        with startup.phase("microphone mode"):
+            start_microphone_mode()
+    if os.getenv("TOOL_WATCHER", "True").lower() == "true":
+        ToolWatcher(ai_manager).start()  # hot-reload tools when their files change
+    startup.mark_ready()
+    if args.profile_startup:
+        startup.wait_all()  # show every component, even those still loading in the background
+        print(startup.report())
     write()
-
-
@@ -11,6 +11,11 @@ class ModelManager:
             "fr": "vosk-model-fr-0.22",
             "en": "vosk-model-small-en-us-0.15",
         },
+        # Small models support runtime grammars, used for wake-word spotting
+        "VOSK_WAKE": {
+            "fr": "vosk-model-small-fr-0.22",
+            "en": "vosk-model-small-en-us-0.15",
+        },
         "PIPER": {
             "fr": "fr_FR-tom-medium",
             "en": "piper-en_US-ryan-high",
@@ -33,6 +38,11 @@ class ModelManager:
         path = self.models_directory + "/" + "vosk/" + self.modelsMap["VOSK"].get(self.language, "vosk-model-fr-0.22")
         return path
     
+    def get_model_vosk_wake(self) -> str:
+        """Get the small VOSK model used for wake-word detection based on the selected language."""
+        path = self.models_directory + "/" + "vosk/" + self.modelsMap["VOSK_WAKE"].get(self.language, "vosk-model-small-fr-0.22")
+        return path
+
     def set_language(self, language: str):
         """Set the language for model selection."""
         if language in ["fr", "en"]:
@@ -50,10 +60,11 @@ class ModelManager:
         download_voices.download_voice(model_name, download_dir)
         print(f"Piper model '{model_name}' downloaded to '{download_dir}'")
 
-    def download_vosk_model(self):
-        """Download the VOSK model for the selected language."""
+    def download_vosk_model(self, model_type: str = "VOSK"):
+        """Download the VOSK model ("VOSK" or "VOSK_WAKE") for the selected language."""
         import subprocess
-        model_name = self.modelsMap["VOSK"].get(self.language, "vosk-model-fr-0.22")
+        default = "vosk-model-small-fr-0.22" if model_type == "VOSK_WAKE" else "vosk-model-fr-0.22"
+        model_name = self.modelsMap[model_type].get(self.language, default)
         download_url = f"https://alphacephei.com/vosk/models/{model_name}.zip"
         download_dir = Path(self.models_directory + "/vosk/")
         download_dir.mkdir(parents=True, exist_ok=True)
@@ -73,4 +84,5 @@ class ModelManager:
 if __name__ == "__main__":
     ModelManager().set_language("fr")
     ModelManager().download_pipers_model()
-    ModelManager().download_vosk_model()
\ No newline at end of file
+    ModelManager().download_vosk_model()
+    ModelManager().download_vosk_model("VOSK_WAKE")
\ No newline at end of file
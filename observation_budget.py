@@ -0,0 +1,249 @@
+"""
+Observation budget.
+Tool outputs go into the agent scratchpad and are evaluated again at every
+later iteration of the run. Outputs over their tool's token budget are cut
+down before they get there: JSON keeps its structure with shortened lists and
+strings, sectioned outputs (run_command's --- STDOUT --- ...) keep every
+section's head and tail, anything else keeps its first and last lines. An LLM
+summary can be used instead (OBSERVATION_SUMMARIZE). The full output stays in
+memory under a handle the agent can read with the read_observation tool.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional
+
+from singleton import singleton
+from utils.tokens import CHARS_PER_TOKEN, estimate_tokens
+from utils.tool_options import get_observation_tokens
+
+SUMMARIZE = os.getenv("OBSERVATION_SUMMARIZE", "False").lower() == "true"
+STORE_MAX_ENTRIES = int(os.getenv("OBSERVATION_STORE_MAX_ENTRIES", 64))
+
+HEAD_SHARE = 0.6  # of the kept characters, at the start of the output
+_SECTION = re.compile(r"^--- .+ ---$", re.MULTILINE)
+SUMMARY_PROMPT = """Summarize the output of the {tool} tool for an assistant that called it.
+Keep errors, warnings, numbers, names, paths and anything needed to decide the next step.
+Write at most {max_words} words. Reply with the summary only."""
+
+# (items kept per list, characters kept per string), tried in order until the JSON fits
+_JSON_STEPS = [(20, 200), (10, 120), (5, 80), (3, 40), (1, 20)]
+
+
+@dataclass
+class BudgetStats:
+    """Observations cut during one agent run (or since startup)."""
+    truncated: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_in - self.bytes_out
+
+    def add(self, before: str, after: str):
+        self.truncated += 1
+        self.bytes_in += len(before.encode())
+        self.bytes_out += len(after.encode())
+
+    def summary(self) -> str:
+        return (f"✂️  Observation budget: {self.truncated} tool output(s) cut, "
+                f"{self.bytes_in / 1024:.1f} KB → {self.bytes_out / 1024:.1f} KB "
+                f"({self.bytes_saved / 1024:.1f} KB saved)")
+
+
+@singleton
+class ObservationStore:
+    """Full outputs of the cut observations, by handle (LRU)."""
+
+    def __init__(self, max_entries: int = STORE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # handle -> (tool name, full text)
+        self._counter = 0
+        self._lock = threading.Lock()
+        self.totals = BudgetStats()
+        self.summarizer: Optional[Callable[[str, str, int], str]] = None  # (tool, text, max chars) -> summary
+
+    def put(self, tool_name: str, text: str) -> str:
+        with self._lock:
+            self._counter += 1
+            handle = f"obs-{self._counter}"
+            self._entries[handle] = (tool_name, text)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return handle
+
+    def get(self, handle: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(handle.strip())
+            if entry is None:
+                return None
+            self._entries.move_to_end(handle.strip())
+            return entry[1]
+
+    def record(self, before: str, after: str):
+        with self._lock:
+            self.totals.add(before, after)
+
+    def get_stats(self) -> str:
+        """Get formatted statistics since startup."""
+        with self._lock:
+            return f"{self.totals.summary()}, {len(self._entries)} full outputs kept"
+
+
+def _head_tail_lines(text: str, max_chars: int) -> str:
+    """Whole first and last lines of a text within max_chars."""
+    if len(text) <= max_chars:
+        return text
+    lines = text.split("\n")
+    head, tail = [], []
+    head_budget, tail_budget = int(max_chars * HEAD_SHARE), max_chars - int(max_chars * HEAD_SHARE)
+    used = 0
+    for line in lines:
+        if used + len(line) + 1 > head_budget:
+            break
+        head.append(line)
+        used += len(line) + 1
+    used = 0
+    for line in reversed(lines[len(head):]):
+        if used + len(line) + 1 > tail_budget:
+            break
+        tail.insert(0, line)
+        used += len(line) + 1
+    omitted = lines[len(head):len(lines) - len(tail)]
+    if not head and not tail:  # a few huge lines, cut inside them
+        return (f"{text[:head_budget]}\n[... {len(text) - max_chars} characters omitted ...]\n"
+                f"{text[len(text) - tail_budget:]}")
+    omitted_chars = sum(len(line) + 1 for line in omitted)
+    return "\n".join(head + [f"[... {len(omitted)} lines, {omitted_chars} characters omitted ...]"] + tail)
+
+
+def _prune_json(value: Any, items: int, chars: int) -> Any:
+    if isinstance(value, dict):
+        return {key: _prune_json(item, items, chars) for key, item in value.items()}
+    if isinstance(value, list):
+        kept = [_prune_json(item, items, chars) for item in value[:items]]
+        if len(value) > items:
+            kept.append(f"... {len(value) - items} more items")
+        return kept
+    if isinstance(value, str) and len(value) > chars:
+        return value[:chars] + f"... ({len(value)} chars)"
+    return value
+
+
+def _truncate_json(text: str, max_chars: int) -> Optional[str]:
+    stripped = text.strip()
+    if not stripped or stripped[0] not in "[{":
+        return None
+    try:
+        value = json.loads(stripped)
+    except ValueError:
+        return None
+    for items, chars in _JSON_STEPS:
+        candidate = json.dumps(_prune_json(value, items, chars), ensure_ascii=False)
+        if len(candidate) <= max_chars:
+            return candidate
+    return _head_tail_lines(json.dumps(value, ensure_ascii=False, indent=1), max_chars)
+
+
+def _truncate_sections(text: str, max_chars: int) -> Optional[str]:
+    headers = list(_SECTION.finditer(text))
+    if not headers:
+        return None
+    # (header, body) pairs; text before the first header is kept as a header-less section
+    sections = [("", text[:headers[0].start()])]
+    for i, header in enumerate(headers):
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(text)
+        sections.append((header.group(0), text[header.end():end]))
+    fixed = sum(len(header) + 1 for header, _ in sections)
+    room = max(0, max_chars - fixed)
+    total = sum(len(body) for _, body in sections) or 1
+    parts: List[str] = []
+    for header, body in sections:
+        share = max(200, int(room * len(body) / total))  # small sections (exit code...) stay whole
+        parts.append((header + "\n" if header else "") + _head_tail_lines(body.strip("\n"), share))
+    return "\n".join(part for part in parts if part.strip())
+
+
+def truncate_output(text: str, max_chars: int) -> str:
+    """
+    Cut a tool output down to about max_chars, keeping its structure.
+
+    Args:
+        text: Full output
+        max_chars: Target size
+
+    Returns:
+        The shortened output (unchanged if it already fits)
+    """
+    if len(text) <= max_chars:
+        return text
+    return (_truncate_json(text, max_chars) or _truncate_sections(text, max_chars)
+            or _head_tail_lines(text, max_chars))
+
+
+def budget_observation(tool, observation: Any, stats: Optional[BudgetStats] = None) -> Any:
+    """
+    Fit a tool's output in its observation budget, storing the full output.
+
+    Args:
+        tool: The tool that produced the output
+        observation: Its output
+        stats: Per-run statistics to update, if any
+
+    Returns:
+        The observation to put in the scratchpad
+    """
+    limit = get_observation_tokens(tool)
+    if not limit or observation is None:
+        return observation
+    text = observation if isinstance(observation, str) else _to_text(observation)
+    if estimate_tokens(text) <= limit:
+        return observation
+
+    store = ObservationStore()
+    handle = store.put(tool.name, text)
+    max_chars = int(limit * CHARS_PER_TOKEN) - 250  # room for the footer
+    body, kind = None, "summarized"
+    if SUMMARIZE and store.summarizer is not None:
+        try:
+            body = store.summarizer(tool.name, truncate_output(text, max_chars * 4), max_chars)
+        except Exception as e:
+            logging.warning(f"⚠️  Could not summarize the {tool.name} output, truncating it: {e}")
+    if not body:
+        body, kind = truncate_output(text, max_chars), "cut"
+    result = (f"{body}\n[{tool.name} output {kind} from {len(text)} to {len(body)} characters. "
+              f"Full output kept as \"{handle}\": call read_observation(handle=\"{handle}\", offset=..., "
+              f"search=...) to see the rest.]")
+    store.record(text, result)
+    if stats is not None:
+        stats.add(text, result)
+    return result
+
+
+def make_llm_summarizer(llm) -> Callable[[str, str, int], str]:
+    """Summarizer for ObservationStore.summarizer, one short generation of the given chat model."""
+    from langchain_core.messages import HumanMessage, SystemMessage
+    from speech_stream import strip_reasoning
+
+    def summarize(tool_name: str, text: str, max_chars: int) -> str:
+        max_tokens = int(max_chars / CHARS_PER_TOKEN)
+        reply = llm.model_copy(update={"num_predict": max_tokens}).invoke([
+            SystemMessage(SUMMARY_PROMPT.format(tool=tool_name, max_words=int(max_tokens * 0.6))),
+            HumanMessage(text),
+        ])
+        return strip_reasoning(reply.content).strip()[:max_chars]
+
+    return summarize
+
+
+def _to_text(observation: Any) -> str:
+    try:
+        return json.dumps(observation, ensure_ascii=False, default=str)
+    except (TypeError, ValueError):
+        return str(observation)
@@ -0,0 +1,117 @@
+"""
+Ollama model residency.
+Keeps the model loaded and the prompt prefix (system prompt + tool schemas)
+evaluated in Ollama's KV cache: warm-up request with the exact agent prefix at
+startup and after every reload, and periodic pings during conversations and
+for a while after they end, when the model is idle and most at risk of being
+unloaded or having its prefix evicted.
+"""
+
+import logging
+import os
+import threading
+import time
+
+# Passed to ChatOllama by AIManager
+KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+NUM_CTX = int(os.getenv("OLLAMA_NUM_CTX", 8192))
+PING_INTERVAL = float(os.getenv("OLLAMA_PING_INTERVAL", 120))
+PING_LINGER = float(os.getenv("OLLAMA_PING_LINGER", 600))  # seconds of pings after a conversation ends
+
+WARM_UP_INPUT = "."
+
+
+class ModelResidency:
+    """Warms up and keeps alive the model used by an AIManager."""
+
+    def __init__(self, ai_manager):
+        self.ai_manager = ai_manager
+        self.last_request_at = 0.0  # last real or warm-up request sent to Ollama
+        self.last_warm_up_duration = None
+        self._warm_up_lock = threading.Lock()
+        self._keepalive_stop = None
+        self._keepalive_until = None  # end of the pings once the conversation is over
+        self._keepalive_lock = threading.Lock()
+
+    def warm_up(self) -> bool:
+        """
+        Send the exact agent prompt prefix with a 1-token generation.
+
+        With tool routing, the prefix holds the tools of the last routed request
+        (the pinned tools before the first one), which is what the next request
+        most likely binds; binding every tool would cache a prefix nobody sends.
+
+        Ollama loads the model (with the same num_ctx as real requests, so it is not
+        reloaded later) and keeps the evaluated prefix in its cache.
+
+        Returns:
+            True if the warm-up request succeeded
+        """
+        if not self._warm_up_lock.acquire(blocking=False):
+            return False  # a warm-up is already running
+        try:
+            start = time.time()
+            tools = self.ai_manager.get_warm_up_tools()
+            messages = self.ai_manager.get_prompt().format_messages(
+                input=WARM_UP_INPUT, history=[], agent_scratchpad=[]
+            )
+            llm = self.ai_manager.llm.model_copy(update={"num_predict": 1})
+            llm.bind_tools(tools).invoke(messages)
+            self.last_request_at = time.time()
+            self.last_warm_up_duration = self.last_request_at - start
+            logging.info(f"🔥 Ollama warmed up in {self.last_warm_up_duration:.2f}s ({len(tools)} tools in prefix)")
+            return True
+        except Exception as e:
+            logging.warning(f"⚠️  Ollama warm-up failed: {e}")
+            return False
+        finally:
+            self._warm_up_lock.release()
+
+    def warm_up_async(self):
+        """Warm up on a background thread."""
+        threading.Thread(target=self.warm_up, name="pierre-warm-up", daemon=True).start()
+
+    def touch(self):
+        """Record that a real request just used the model."""
+        self.last_request_at = time.time()
+
+    def start_keepalive(self, interval: float = PING_INTERVAL):
+        """Ping the model while in conversation mode, unless real requests already keep it hot."""
+        with self._keepalive_lock:
+            self._keepalive_until = None
+            if self._keepalive_stop is not None:
+                return  # still running, possibly lingering after the previous conversation
+            stop = threading.Event()
+            self._keepalive_stop = stop
+
+        def ping_loop():
+            while not stop.wait(interval / 4):
+                with self._keepalive_lock:
+                    if self._keepalive_until is not None and time.time() >= self._keepalive_until:
+                        self._keepalive_stop = self._keepalive_until = None
+                        logging.info("🏓 Ollama keep-alive pings stopped")
+                        return
+                if time.time() - self.last_request_at >= interval:
+                    logging.debug("🏓 Pinging Ollama to keep the prompt prefix cached")
+                    self.warm_up()
+
+        threading.Thread(target=ping_loop, name="pierre-keepalive", daemon=True).start()
+        logging.info("🏓 Ollama keep-alive pings started")
+
+    def stop_keepalive(self, linger: float = PING_LINGER):
+        """
+        Stop the pings once the conversation is over.
+
+        Args:
+            linger: Seconds to keep pinging first (0 stops them now)
+        """
+        with self._keepalive_lock:
+            if self._keepalive_stop is None:
+                return
+            if linger > 0:
+                self._keepalive_until = time.time() + linger
+                logging.info(f"🏓 Ollama keep-alive pings continue for {linger:.0f}s")
+                return
+            self._keepalive_stop.set()
+            self._keepalive_stop = self._keepalive_until = None
+        logging.info("🏓 Ollama keep-alive pings stopped")
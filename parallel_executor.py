@@ -0,0 +1,202 @@
+"""
+Parallel agent executor.
+AgentExecutor runs the tool calls of one agent step one after another. When the
+model asks for several tools at once (get_time_city for three cities,
+get_system_info + get_battery_status...), this executor runs the parallel-safe
+ones concurrently on a bounded pool, with a timeout per tool, and hands the
+observations back in the original order. Tools declared non-parallel-safe with
+`utils.tool_options` run on the agent's thread, one at a time, and split the
+step: the calls before one finish before it starts, the calls after it start
+once it is done, so the order the model asked for is kept. Calls that time out
+keep their worker busy until they return; once half the pool is stuck that
+way, new calls go to a fresh pool. A barge-in stops the wait for pool calls
+too: they are abandoned like timed-out ones.
+Observations over their tool's budget are cut down (observation_budget.py)
+before they reach the scratchpad.
+"""
+
+import contextvars
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import List, Optional
+
+from langchain.agents import AgentExecutor
+from langchain_core.agents import AgentStep
+
+from barge_in import CancellationHandler, RunCancelled
+from observation_budget import BudgetStats, budget_observation
+from utils.tool_options import get_timeout, is_parallel_safe
+
+TOOL_POOL_SIZE = int(os.getenv("TOOL_POOL_SIZE", 4))
+CANCEL_POLL = 0.1  # seconds between cancellation checks while waiting for pool calls
+
+_pool = None
+_pool_stuck = 0  # workers of the current pool still running a timed-out call
+_pool_lock = threading.Lock()
+_deferral = threading.local()  # tool calls collected during the current step, per agent thread
+_run_state = threading.local()  # observation budget statistics of the current run, per agent thread
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool, _pool_stuck
+    with _pool_lock:
+        if _pool is not None and _pool_stuck >= max(1, TOOL_POOL_SIZE // 2):
+            logging.warning(f"⚠️  {_pool_stuck} tool worker(s) stuck in timed-out calls, starting a new pool")
+            _pool.shutdown(wait=False)  # the stuck workers exit when their call returns
+            _pool = None
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=TOOL_POOL_SIZE, thread_name_prefix="pierre-tool")
+            _pool_stuck = 0
+        return _pool
+
+
+def _abandon(future: Future, pool: ThreadPoolExecutor):
+    """Give up on a timed-out call: drop it if it hasn't started, else count its worker as stuck."""
+    global _pool_stuck
+    if future.cancel():
+        return
+    with _pool_lock:
+        if pool is not _pool:
+            return
+        _pool_stuck += 1
+
+    def release(_):
+        global _pool_stuck
+        with _pool_lock:
+            if pool is _pool:
+                _pool_stuck -= 1
+
+    future.add_done_callback(release)
+
+
+def _cancellation(run_manager) -> Optional[CancellationHandler]:
+    """The barge-in handler among the run's callbacks, if any."""
+    handlers = getattr(run_manager, "handlers", None) or []
+    return next((handler for handler in handlers if isinstance(handler, CancellationHandler)), None)
+
+
+def _result(future: Future, deadline: float, cancellation: Optional[CancellationHandler]):
+    """Wait for a call until the deadline, raising RunCancelled as soon as the run is cancelled."""
+    if cancellation is None:
+        return future.result(timeout=max(0.0, deadline - time.time()))
+    while True:
+        cancellation.check()
+        remaining = deadline - time.time()
+        try:
+            return future.result(timeout=max(0.0, min(remaining, CANCEL_POLL)))
+        except FutureTimeout:
+            if remaining <= CANCEL_POLL:
+                raise
+
+
+class _PendingStep:
+    """Placeholder for a tool call collected during an agent step."""
+
+    def __init__(self, args):
+        self.args = args  # arguments of AgentExecutor._perform_agent_action
+        self.step: Optional[AgentStep] = None
+
+    @property
+    def action(self):
+        return self.args[2]
+
+
+class ParallelAgentExecutor(AgentExecutor):
+    """AgentExecutor running the independent tool calls of a step concurrently."""
+
+    def _call(self, inputs, run_manager=None):
+        previous = getattr(_run_state, "budget", None)
+        stats = _run_state.budget = BudgetStats()
+        try:
+            return super()._call(inputs, run_manager)
+        finally:
+            _run_state.budget = previous
+            if stats.truncated:
+                logging.info(stats.summary())
+
+    def _iter_next_step(self, name_to_tool_map, color_mapping, inputs, intermediate_steps, run_manager=None):
+        # Let the base class plan the step while tool calls are only collected,
+        # then run them and yield the results in the original order
+        state = _deferral.__dict__
+        previous = state.get("pending")
+        pending: List[_PendingStep] = []
+        state["pending"] = pending
+        try:
+            outputs = list(super()._iter_next_step(name_to_tool_map, color_mapping, inputs,
+                                                   intermediate_steps, run_manager))
+        finally:
+            state["pending"] = previous
+        self._run_pending(pending, name_to_tool_map)
+        for output in outputs:
+            output = output.step if isinstance(output, _PendingStep) else output
+            if isinstance(output, AgentStep):
+                output = self._budget(output, name_to_tool_map)
+            yield output
+
+    def _perform_agent_action(self, name_to_tool_map, color_mapping, agent_action, run_manager=None):
+        pending = _deferral.__dict__.get("pending")
+        if pending is None:
+            return super()._perform_agent_action(name_to_tool_map, color_mapping, agent_action, run_manager)
+        step = _PendingStep((name_to_tool_map, color_mapping, agent_action, run_manager))
+        pending.append(step)
+        return step
+
+    def _run_pending(self, pending: List[_PendingStep], name_to_tool_map):
+        perform = super()._perform_agent_action
+        batch = []  # consecutive parallel-safe calls
+        for step in pending:
+            tool = name_to_tool_map.get(step.action.tool)
+            if tool is not None and is_parallel_safe(tool):
+                batch.append((step, tool))
+                continue
+            # A serial call waits for the calls asked before it, and runs before the ones after it
+            self._run_batch(batch, perform)
+            batch = []
+            step.step = perform(*step.args)
+        self._run_batch(batch, perform)
+
+    @staticmethod
+    def _run_batch(batch, perform):
+        """Run parallel-safe calls on the pool (even alone, for their timeout)."""
+        if not batch:
+            return
+        start = time.time()
+        pool = _get_pool()
+        cancellation = _cancellation(batch[0][0].args[3])
+        futures = []
+        for step, tool in batch:
+            context = contextvars.copy_context()  # keeps the run's callbacks and tracing context
+            futures.append((step, tool, pool.submit(context.run, perform, *step.args)))
+
+        for step, tool, future in futures:
+            timeout = get_timeout(tool)
+            try:
+                step.step = _result(future, start + timeout, cancellation)
+            except RunCancelled:
+                logging.info(f"🛑 Run cancelled, abandoning {sum(not f.done() for _, _, f in futures)} tool call(s)")
+                for _, _, other in futures:
+                    if not other.done():
+                        _abandon(other, pool)
+                raise
+            except FutureTimeout:
+                logging.warning(f"⏱️  Tool {tool.name} timed out after {timeout:g}s")
+                _abandon(future, pool)
+                step.step = AgentStep(action=step.action,
+                                      observation=f"Error: {tool.name} did not answer within {timeout:g} seconds.")
+        if len(futures) > 1:
+            logging.info(f"⚡ Ran {len(futures)} tool calls concurrently in {time.time() - start:.2f}s: "
+                         f"{', '.join(step.action.tool for step, _, _ in futures)}")
+
+    @staticmethod
+    def _budget(step: AgentStep, name_to_tool_map) -> AgentStep:
+        """Cut an observation down to its tool's budget (return_direct outputs go to the user, not the LLM)."""
+        tool = name_to_tool_map.get(step.action.tool)
+        if tool is None or tool.return_direct:
+            return step
+        observation = budget_observation(tool, step.observation, getattr(_run_state, "budget", None))
+        if observation is step.observation:
+            return step
+        return AgentStep(action=step.action, observation=observation)
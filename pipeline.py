@@ -0,0 +1,261 @@
+"""
+Interaction pipeline.
+Replaces the blocking main loop with explicit stages running on their own
+threads and connected by bounded queues:
+
+    listener (keyboard / capture + wake word + VAD + STT)
+        -> commands queue ->
+    agent (AgentExecutor)
+        -> speech queue ->
+    speaker (Piper + audio output)
+
+Recognition keeps running while the agent thinks and while TTS plays, and the
+keyboard prompt no longer waits for the previous answer. A barge-in monitor
+watches the microphone during playback and interrupts Pierre when the user
+talks over it.
+"""
+
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+
+from input import InputMethod
+from speech_stream import SpeechQueue, StreamingSpeechHandler
+from barge_in import BargeInDetector, BargeInMetrics, CancellationHandler, RunCancelled
+
+# The audio stacks (vosk, piper, numpy) are imported inside the microphone code
+# paths, so keyboard mode never loads them
+
+TRIGGER_WORD = "pierre"
+CONVERSATION_TIMEOUT = 30  # seconds of inactivity before exiting conversation mode
+STREAM_TTS = os.getenv("STREAM_TTS", "True").lower() == "true"  # speak sentence by sentence while the LLM generates
+COMMAND_QUEUE_SIZE = int(os.getenv("COMMAND_QUEUE_SIZE", 4))
+SPEECH_QUEUE_SIZE = int(os.getenv("SPEECH_QUEUE_SIZE", 16))
+BARGE_IN = os.getenv("BARGE_IN", "True").lower() == "true"
+
+LISTEN_SLICE = 1.0  # seconds, how often the listener re-checks mode and timeout
+
+
+@dataclass
+class Command:
+    text: str
+    source: str  # InputMethod.KEYBOARD or InputMethod.MICROPHONE
+    heard_at: float = field(default_factory=time.time)
+
+
+class InteractionPipeline:
+    """Runs the listener, agent and speaker stages concurrently."""
+
+    def __init__(self, input_method: InputMethod, ai_manager):
+        self.input_method = input_method
+        self.ai_manager = ai_manager
+        self.commands = queue.Queue(maxsize=COMMAND_QUEUE_SIZE)
+        self.speech = SpeechQueue(maxsize=SPEECH_QUEUE_SIZE)
+        self.endpointer = None
+        self.conversation_mode = False
+        self.last_interaction_time = 0.0
+        self.barge_in_metrics = BargeInMetrics()
+        self._current_run = None  # CancellationHandler of the agent run in flight
+        self._barge_in_at = 0.0
+        self._agent_busy = threading.Event()
+        self._stopped = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """Start the listener, agent and barge-in stages (the speaker stage runs inside SpeechQueue)."""
+        stages = [("pierre-listener", self._listen_loop), ("pierre-agent", self._agent_loop)]
+        if BARGE_IN:
+            stages.append(("pierre-barge-in", self._barge_in_loop))
+        for name, target in stages:
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logging.info("🚦 Interaction pipeline started")
+
+    def run_forever(self):
+        """Start the pipeline and block until it is stopped (exit tool or Ctrl+C)."""
+        self.start()
+        try:
+            while not self._stopped.wait(0.5):
+                pass
+        except KeyboardInterrupt:
+            logging.info("🔴 Interrupted, stopping Pierre...")
+        self.stop()
+
+    def stop(self):
+        self._stopped.set()
+        self.speech.close()
+
+    # ------------------------------------------------------------------ listener stage
+
+    def _listen_loop(self):
+        while not self._stopped.is_set():
+            try:
+                method = self.input_method.get_selected_method()
+                if method == self.input_method.MICROPHONE:
+                    self._listen_audio()
+                elif method == self.input_method.KEYBOARD:
+                    self._read_keyboard()
+                else:
+                    time.sleep(0.1)
+            except Exception as e:
+                logging.critical(f"❌ Critical error in listener stage: {e}")
+                time.sleep(0.5)
+
+    def _read_keyboard(self):
+        # Time-sliced like the microphone, so a switch to audio mode takes effect without a keypress
+        command = self.input_method.getCommand(timeout=LISTEN_SLICE)
+        if command and command.strip():
+            self._submit(Command(command.strip(), InputMethod.KEYBOARD))
+
+    def _listen_audio(self):
+        from speechToText import SpeechToText
+        from vad import Endpointer
+        if not self.conversation_mode:
+            if SpeechToText().waitForWakeWord(TRIGGER_WORD):
+                logging.info(f"🗣 Triggered by wake word: {TRIGGER_WORD}")
+                self.conversation_mode = True
+                self.ai_manager.residency.start_keepalive()
+                self.speech.say("Oui monsieur?")
+                self.speech.wait()
+                self.input_method.getAudioCursor("command").seek_to_live()
+                self.last_interaction_time = time.time()
+            return
+
+        if self.endpointer is None:
+            self.endpointer = Endpointer()
+        utterance = self.endpointer.listen(self.input_method.getAudioCursor("command"), timeout=LISTEN_SLICE)
+
+        if utterance is None:
+            busy = self._agent_busy.is_set() or self.speech.is_speaking() or not self.commands.empty()
+            if busy:
+                self.last_interaction_time = time.time()
+            elif time.time() - self.last_interaction_time > CONVERSATION_TIMEOUT:
+                logging.info("⌛ Timeout: Returning to wake word mode.")
+                self.conversation_mode = False
+                self.ai_manager.residency.stop_keepalive()
+            return
+
+        # Utterances overlapping playback are most likely Pierre hearing itself,
+        # unless the user barged in while saying them
+        started_at = time.time() - len(utterance) / 32000
+        barged_in = self._barge_in_at >= started_at
+        if not barged_in and (self.speech.is_speaking() or self.speech.last_spoken_at > started_at):
+            logging.debug("🔇 Ignoring utterance captured during playback")
+            return
+
+        logging.info("🔊 Processing audio...")
+        command = SpeechToText().transcribe(utterance)
+        if not command:
+            logging.info("⚠️ No command detected, continuing...")
+            return
+        self.last_interaction_time = time.time()
+        self._submit(Command(command, InputMethod.MICROPHONE))
+
+    # ------------------------------------------------------------------ barge-in stage
+
+    def _barge_in_loop(self):
+        detector = None
+        monitoring = False
+        while not self._stopped.is_set():
+            cursor = self.input_method.getAudioCursor("barge_in")
+            if cursor is None or not self._speech_to_text_loaded() or not self.speech.is_speaking():
+                monitoring = False
+                time.sleep(0.05)
+                continue
+            if detector is None:
+                detector = BargeInDetector(TRIGGER_WORD)
+            if not monitoring:
+                # Only what is said during this answer counts
+                cursor.seek_to_live()
+                detector.reset()
+                monitoring = True
+            try:
+                if detector.heard(cursor.read(1600, timeout=0.2)):
+                    self._barge_in()
+                    monitoring = False
+            except Exception as e:
+                logging.error(f"❌ Barge-in detection failed: {e}")
+                time.sleep(0.5)
+
+    @staticmethod
+    def _speech_to_text_loaded() -> bool:
+        # Don't import vosk just to find out it is not needed
+        if "speechToText" not in sys.modules:
+            return False
+        return sys.modules["speechToText"].SpeechToText().isLoaded()
+
+    def _barge_in(self):
+        """Stop playback, cancel the agent run in flight and let the listener take the new utterance."""
+        from tts import stop_speaking
+        detected_at = time.time()
+        self._barge_in_at = detected_at
+        # Cancel first so the run stops queuing sentences, then silence what is queued and playing
+        run = self._current_run
+        if run is not None:
+            run.cancel()
+        self.speech.clear()
+        stop_speaking()
+        self.barge_in_metrics.record_barge_in(time.time() - detected_at)
+        self.conversation_mode = True
+        self.last_interaction_time = detected_at
+
+    def _submit(self, command: Command):
+        logging.info(f"📥 Command: {command.text}")
+        if self.commands.full():
+            logging.warning("⚠️ Agent is still busy, command queued behind the previous ones")
+        self.commands.put(command)
+
+    # ------------------------------------------------------------------ agent stage
+
+    def _agent_loop(self):
+        while not self._stopped.is_set():
+            try:
+                command = self.commands.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            self._agent_busy.set()
+            self._current_run = CancellationHandler()
+            try:
+                self._answer(command, self._current_run)
+            except RunCancelled:
+                self.barge_in_metrics.record_cancellation(time.time() - self._current_run.cancelled_at)
+                logging.info(self.barge_in_metrics.get_stats())
+            except SystemExit:
+                # exit_pierre runs on this thread, stop the whole pipeline
+                logging.info("🔴 Exit requested by the agent")
+                self._stopped.set()
+            except Exception as e:
+                logging.critical(f"❌ Critical error in agent stage: {e}")
+            finally:
+                self._current_run = None
+                self._agent_busy.clear()
+                self.last_interaction_time = time.time()
+
+    def _answer(self, command: Command, cancellation: CancellationHandler):
+        logging.info("🤖 Sending command to agent...")
+        speak = command.source == InputMethod.MICROPHONE
+        # The cancellation handler goes first so a cancelled run stops before queuing more speech
+        callbacks = [cancellation]
+
+        if speak and STREAM_TTS:
+            handler = StreamingSpeechHandler(self.speech)
+            callbacks.append(handler)
+            response = self.ai_manager.invoke(command.text, config={"callbacks": callbacks})
+            content = response["output"]
+            # Don't wait for playback, the next command can already go to the agent
+            handler.finish(content, wait=False)
+        else:
+            response = self.ai_manager.invoke(command.text, config={"callbacks": callbacks})
+            content = response["output"]
+            if speak:
+                self.speech.say(content)
+        if speak:
+            self.barge_in_metrics.record_answer()
+
+        logging.info(f"✅ Agent responded: {content}")
+        print("Pierre:", content)
@@ -0,0 +1,204 @@
+"""
+Prompt profiler.
+Breaks the prompt of each request down by component (system prompt, tool
+schemas, history, input, scratchpad tool calls and observations) and records
+what Ollama actually evaluated (`prompt_eval_count` / `prompt_eval_duration`)
+for every LLM call of the agent run, so the cost of each tool description can
+be expressed in tokens and in milliseconds.
+
+Usage:
+    python prompt_profiler.py [--query "Quelle heure est-il ?"] [--ollama]
+"""
+
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from tool_manifest import describe_tool
+from utils.tokens import estimate_messages_tokens, estimate_tokens
+
+TOOL_OVERHEAD_TOKENS = 10  # template markup around each tool in the prompt
+
+
+def estimate_tool_tokens(tool) -> int:
+    """Estimated tokens a tool's schema adds to the prompt."""
+    entry = describe_tool(tool)
+    return (estimate_tokens(entry["name"]) + estimate_tokens(entry["description"])
+            + estimate_tokens(json.dumps(entry["parameters"])) + TOOL_OVERHEAD_TOKENS)
+
+
+def tool_token_costs(tools: Sequence) -> List[Tuple[str, int]]:
+    """(tool name, estimated tokens) sorted from the most to the least expensive."""
+    return sorted(((tool.name, estimate_tool_tokens(tool)) for tool in tools), key=lambda item: -item[1])
+
+
+@dataclass
+class LLMCall:
+    """One model call of an agent run (planning step)."""
+    components: Dict[str, int]  # estimated tokens per component
+    prompt_eval_count: Optional[int] = None  # reported by Ollama, excludes tokens reused from its cache
+    prompt_eval_ms: Optional[float] = None
+    started_at: float = field(default_factory=time.time)
+
+
+@dataclass
+class PromptProfile:
+    """Token breakdown of one request."""
+    input: str
+    tools: List[Tuple[str, int]]  # bound tools and their estimated cost
+    calls: List[LLMCall] = field(default_factory=list)
+
+    @property
+    def evaluated_tokens(self) -> Optional[int]:
+        counts = [call.prompt_eval_count for call in self.calls if call.prompt_eval_count is not None]
+        return sum(counts) if counts else None
+
+    @property
+    def ms_per_token(self) -> Optional[float]:
+        """Ollama's prompt evaluation speed measured on this request."""
+        measured = [c for c in self.calls if c.prompt_eval_count and c.prompt_eval_ms is not None]
+        if not measured:
+            return None
+        return sum(c.prompt_eval_ms for c in measured) / sum(c.prompt_eval_count for c in measured)
+
+    def summary(self) -> str:
+        """One-line summary for the logs."""
+        if not self.calls:
+            return "📏 Prompt: no LLM call recorded"
+        first = self.calls[0].components
+        line = "📏 Prompt (est. tokens): " + ", ".join(f"{k} {v}" for k, v in first.items())
+        line += f" | {len(self.calls)} LLM call(s)"
+        if self.evaluated_tokens is not None:
+            line += f", Ollama evaluated {self.evaluated_tokens} tokens"
+            if self.ms_per_token is not None:
+                line += f" ({self.ms_per_token:.2f} ms/token)"
+        return line
+
+
+class PromptProfiler(BaseCallbackHandler):
+    """Callback recording the prompt breakdown of every LLM call of an agent run."""
+
+    def __init__(self, profile: PromptProfile):
+        self.profile = profile
+        self._tools_tokens = sum(tokens for _, tokens in profile.tools)
+        self._pending: Dict[object, LLMCall] = {}  # run_id -> call
+        self._lock = threading.Lock()
+
+    def on_chat_model_start(self, serialized, messages, *, run_id=None, **kwargs):
+        call = LLMCall(self._split(messages[0]))
+        with self._lock:
+            self._pending[run_id] = call
+            self.profile.calls.append(call)
+
+    def on_llm_end(self, response, *, run_id=None, **kwargs):
+        with self._lock:
+            call = self._pending.pop(run_id, None)
+        if call is None:
+            return
+        try:
+            generation = response.generations[0][0]
+            metadata = dict(generation.generation_info or {})
+            metadata.update(getattr(getattr(generation, "message", None), "response_metadata", None) or {})
+        except (IndexError, AttributeError):
+            return
+        if metadata.get("prompt_eval_count") is not None:
+            call.prompt_eval_count = metadata["prompt_eval_count"]
+        if metadata.get("prompt_eval_duration") is not None:
+            call.prompt_eval_ms = metadata["prompt_eval_duration"] / 1e6  # nanoseconds
+
+    def _split(self, messages) -> Dict[str, int]:
+        """Estimated tokens per component of the messages sent to the model."""
+        # The agent prompt is: system, history..., human input, scratchpad...
+        last_human = max((i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=len(messages))
+        system = [m for m in messages[:1] if isinstance(m, SystemMessage)]
+        history = messages[len(system):last_human]
+        scratchpad = messages[last_human + 1:]
+        tool_calls = [m for m in scratchpad if isinstance(m, AIMessage)]
+        observations = [m for m in scratchpad if isinstance(m, ToolMessage)]
+        components = {
+            "system": estimate_messages_tokens(system),
+            "tools": self._tools_tokens,
+            "history": estimate_messages_tokens(history),
+            "input": estimate_messages_tokens(messages[last_human:last_human + 1]),
+            "tool_calls": estimate_messages_tokens(tool_calls)
+                          + sum(estimate_tokens(json.dumps(m.tool_calls)) for m in tool_calls),
+            "observations": estimate_messages_tokens(observations),
+        }
+        components["total"] = sum(components.values())
+        return components
+
+
+def format_report(profile: Optional[PromptProfile], all_tools: Sequence, ms_per_token: float = None) -> str:
+    """
+    Human-readable token report: last request breakdown and per-tool costs.
+
+    Args:
+        profile: Profile of the last request (None if nothing ran yet)
+        all_tools: Every loaded tool, for the per-tool table
+        ms_per_token: Prompt evaluation speed used to convert tokens to latency,
+            defaults to the speed measured on the last request
+    """
+    lines = []
+    if ms_per_token is None and profile is not None:
+        ms_per_token = profile.ms_per_token
+
+    if profile is not None and profile.calls:
+        lines.append(f"📏 Last request: {profile.input[:60]!r}")
+        for i, call in enumerate(profile.calls, 1):
+            parts = ", ".join(f"{k} {v}" for k, v in call.components.items() if v)
+            measured = ""
+            if call.prompt_eval_count is not None:
+                measured = f" | Ollama: {call.prompt_eval_count} tokens"
+                if call.prompt_eval_ms is not None:
+                    measured += f" in {call.prompt_eval_ms:.0f} ms"
+            lines.append(f"  call {i}: {parts}{measured}")
+        lines.append(f"  bound tools: {len(profile.tools)} of {len(all_tools)}")
+    else:
+        lines.append("📏 No request profiled yet")
+
+    costs = tool_token_costs(all_tools)
+    total = sum(tokens for _, tokens in costs)
+    speed = f" at {ms_per_token:.2f} ms/token" if ms_per_token else ""
+    lines.append(f"🔧 Tool schemas, {total} tokens if all bound{speed}:")
+    for name, tokens in costs:
+        cost_ms = f" ≈ {tokens * ms_per_token:.0f} ms" if ms_per_token else ""
+        lines.append(f"  • {name}: {tokens} tokens ({tokens / total * 100:.0f}%){cost_ms}" if total else f"  • {name}")
+    return "\n".join(lines)
+
+
+def main():
+    import argparse
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Report where Pierre's prompt tokens go")
+    parser.add_argument("--query", default="Quelle heure est-il ?", help="user input to profile")
+    parser.add_argument("--ollama", action="store_true",
+                        help="send the prompt to the model (1 generated token) to get Ollama's real counts")
+    args = parser.parse_args()
+
+    from ai_manager import AIManager
+    ai_manager = AIManager()
+    snapshot = ai_manager.get_snapshot()
+    tools = snapshot.router.select(args.query) if snapshot.router.is_enabled() else list(snapshot.tools)
+    profile = PromptProfile(args.query, tool_token_costs(tools))
+    profiler = PromptProfiler(profile)
+    messages = ai_manager.get_prompt().format_messages(input=args.query, history=ai_manager.memory.get_messages(),
+                                                        agent_scratchpad=[])
+    if args.ollama:
+        llm = ai_manager.llm.model_copy(update={"num_predict": 1})
+        llm.bind_tools(tools).invoke(messages, config={"callbacks": [profiler]})
+    else:
+        profiler.on_chat_model_start({}, [messages])
+    print(format_report(profile, snapshot.tools))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    main()
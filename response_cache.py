@@ -0,0 +1,326 @@
+"""
+Semantic response cache.
+Near-repeats of tool-free questions ("qui es-tu", "what can you do") get the
+answer Pierre gave last time instead of a full generation: the normalized input
+is embedded with a small local model and compared with the cached questions in
+one NumPy matrix product. Answers that used tools are never stored, their
+result may have changed since. An answer only serves a question asked after
+the same last exchange it was given after (a follow-up like "et demain ?" means
+something else in another conversation), and the cache is written to disk by a
+background thread.
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional, Sequence
+
+from intent_router import normalize
+
+if TYPE_CHECKING:
+    import numpy as np  # imported on first use, keyboard mode starts without it
+
+ENABLED = os.getenv("RESPONSE_CACHE", "True").lower() == "true"
+# Ollama embedding model, or "ngram" for hashed character trigrams (no model, near-exact repeats only)
+EMBED_MODEL = os.getenv("RESPONSE_CACHE_EMBED_MODEL", "all-minilm")
+THRESHOLD = float(os.getenv("RESPONSE_CACHE_THRESHOLD", 0.92))  # cosine similarity
+TTL = float(os.getenv("RESPONSE_CACHE_TTL", 7 * 24 * 3600))
+MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 512))
+CACHE_PATH = Path(os.getenv("RESPONSE_CACHE_PATH", ".cache/response_cache.npz"))
+
+MIN_WORDS = 2  # one-word inputs ("oui", "merci") depend too much on the conversation
+NGRAM_DIM = 1024
+CACHE_VERSION = 3
+SAVE_DELAY = 2.0  # seconds, changes made meanwhile are written together
+
+
+@dataclass
+class CachedResponse:
+    question: str  # normalized input
+    answer: str
+    created_at: float
+    used_at: float
+    hits: int = 0
+    context: str = ""  # conversation_key() of the history it was answered with
+
+
+def conversation_key(history: Optional[Sequence] = None) -> str:
+    """
+    Hash of the last exchange of the conversation a question is asked in.
+
+    Only the last user message and the answers after it count: hashing the whole
+    history would make every key unique once a conversation is a few turns long.
+
+    Returns:
+        The key, "" if there is no history
+    """
+    if not history:
+        return ""
+    humans = [i for i, message in enumerate(history) if message.type == "human"]
+    digest = hashlib.sha1()
+    for message in history[humans[-1] if humans else -1:]:
+        digest.update(f"{message.type}\0{message.content}\0".encode())
+    return digest.hexdigest()[:16]
+
+
+class HashedNgramEmbedder:
+    """Character trigram counts hashed into a fixed-size vector."""
+
+    name = "ngram"
+
+    def embed(self, text: str) -> "np.ndarray":
+        import numpy as np
+        vector = np.zeros(NGRAM_DIM, dtype=np.float32)
+        padded = f" {text} "
+        for i in range(len(padded) - 2):
+            vector[zlib.crc32(padded[i:i + 3].encode()) % NGRAM_DIM] += 1.0
+        return vector
+
+
+class OllamaEmbedder:
+    """Embeddings from a model served by the local Ollama."""
+
+    def __init__(self, model: str):
+        from langchain_ollama import OllamaEmbeddings
+        self.name = f"ollama:{model}"
+        self._embeddings = OllamaEmbeddings(model=model, base_url=os.getenv("OLLAMA_BASE_URL"))
+
+    def embed(self, text: str) -> "np.ndarray":
+        import numpy as np
+        return np.asarray(self._embeddings.embed_query(text), dtype=np.float32)
+
+
+class ResponseCache:
+    """Nearest-neighbour cache of tool-free answers with TTL and LRU eviction."""
+
+    def __init__(self, embed_model: str = EMBED_MODEL, threshold: float = THRESHOLD, ttl: float = TTL,
+                 max_entries: int = MAX_ENTRIES, path: Optional[Path] = CACHE_PATH):
+        self.embedder = HashedNgramEmbedder() if embed_model == "ngram" else OllamaEmbedder(embed_model)
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = Path(path) if path else None
+        self.enabled = ENABLED
+        self.entries: List[CachedResponse] = []
+        self.vectors: Optional["np.ndarray"] = None  # one unit-norm row per entry
+        self._recent = OrderedDict()  # normalized input -> vector, reused when the answer is stored
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lookup_seconds = 0.0
+        self._loaded = False  # the saved cache is read on first use
+        self._dirty = False  # changed since the last save
+        self._save_requested = threading.Event()
+        self._save_lock = threading.Lock()
+        self._writer = None
+
+    def lookup(self, command: str, history: Optional[Sequence] = None) -> Optional[str]:
+        """
+        The cached answer of the closest earlier question, if similar enough.
+
+        Args:
+            command: The user's input
+            history: Conversation messages the question is asked in
+
+        Returns:
+            The answer, or None on a miss
+        """
+        question = normalize(command)
+        if not self.enabled or len(question.split()) < MIN_WORDS:
+            return None
+        import numpy as np
+        self._ensure_loaded()
+        start = time.perf_counter()
+        context = conversation_key(history)
+        with self._lock:
+            self._expire()
+            if not any(entry.context == context for entry in self.entries):
+                self.misses += 1  # nothing to compare with, don't pay for the embedding
+                return None
+        vector = self._embed(question)
+        if vector is None:
+            return None
+        with self._lock:
+            best, score = None, 0.0
+            candidates = [i for i, entry in enumerate(self.entries) if entry.context == context]
+            if candidates:
+                scores = self.vectors[candidates] @ vector
+                position = int(np.argmax(scores))
+                best, score = candidates[position], float(scores[position])
+            elapsed = time.perf_counter() - start
+            self.lookup_seconds += elapsed
+            if best is None or score < self.threshold:
+                self.misses += 1
+                return None
+            entry = self.entries[best]
+            entry.used_at = time.time()
+            entry.hits += 1
+            self.hits += 1
+            self._schedule_save()
+            logging.info(f"💬 Response cache hit ({score:.2f}, {entry.question!r}) in {elapsed * 1000:.0f} ms | "
+                         f"hit rate {self.hits / (self.hits + self.misses) * 100:.0f}% ({self.hits}/{self.hits + self.misses})")
+            return entry.answer
+
+    def store(self, command: str, response: dict, history: Optional[Sequence] = None):
+        """
+        Remember the answer of an agent run, unless it used tools.
+
+        Args:
+            command: The user's input
+            response: The executor response ("output", "intermediate_steps")
+            history: Conversation messages the run was given
+        """
+        question = normalize(command)
+        answer = response.get("output")
+        if (not self.enabled or response.get("intermediate_steps") or not isinstance(answer, str)
+                or not answer.strip() or len(question.split()) < MIN_WORDS):
+            return
+        import numpy as np
+        self._ensure_loaded()
+        vector = self._embed(question)
+        if vector is None:
+            return
+        now = time.time()
+        context = conversation_key(history)
+        with self._lock:
+            same = [i for i, entry in enumerate(self.entries)
+                    if entry.question == question and entry.context == context]
+            if same:
+                self._remove(same)
+            self.entries.append(CachedResponse(question, answer, now, now, context=context))
+            row = vector[np.newaxis, :]
+            self.vectors = row if self.vectors is None else np.vstack([self.vectors, row])
+            if len(self.entries) > self.max_entries:
+                oldest = min(range(len(self.entries)), key=lambda i: self.entries[i].used_at)
+                self._remove([oldest])
+                self.evictions += 1
+            self._schedule_save()
+
+    def clear(self):
+        with self._lock:
+            self._loaded = True
+            self.entries, self.vectors = [], None
+            self._schedule_save()
+
+    def flush(self):
+        """Write the cache to disk now if it changed since the last save."""
+        if self.path is None:
+            return
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                self._dirty = False
+                meta = {"version": CACHE_VERSION, "embedder": self.embedder.name,
+                        "entries": [asdict(entry) for entry in self.entries]}
+                vectors = self.vectors  # replaced, never modified in place
+            self._write(meta, vectors)
+
+    def get_stats(self) -> str:
+        """Get formatted cache statistics."""
+        self._ensure_loaded()
+        with self._lock:
+            lookups = self.hits + self.misses
+            rate = (self.hits / lookups * 100) if lookups else 0
+            average = (self.lookup_seconds / lookups * 1000) if lookups else 0
+            return (f"💬 Response cache ({self.embedder.name}, threshold {self.threshold:g}): "
+                    f"{len(self.entries)}/{self.max_entries} answers, {self.hits} hits / {self.misses} misses "
+                    f"({rate:.0f}% hit rate), {average:.0f} ms per lookup, {self.evictions} evictions")
+
+    def _embed(self, question: str) -> Optional["np.ndarray"]:
+        with self._lock:
+            vector = self._recent.get(question)
+        if vector is not None:
+            return vector
+        try:
+            vector = self.embedder.embed(question)
+        except Exception as e:
+            logging.warning(f"⚠️  Response cache disabled, embedding failed ({self.embedder.name}): {e}")
+            self.enabled = False
+            return None
+        import numpy as np
+        norm = float(np.linalg.norm(vector))
+        vector = vector / norm if norm else vector
+        with self._lock:
+            self._recent[question] = vector
+            while len(self._recent) > 8:
+                self._recent.popitem(last=False)
+        return vector
+
+    def _expire(self):
+        deadline = time.time() - self.ttl
+        expired = [i for i, entry in enumerate(self.entries) if entry.created_at < deadline]
+        if expired:
+            self._remove(expired)
+            self._schedule_save()
+
+    def _remove(self, indexes: List[int]):
+        import numpy as np
+        drop = set(indexes)
+        self.entries = [entry for i, entry in enumerate(self.entries) if i not in drop]
+        self.vectors = np.delete(self.vectors, indexes, axis=0) if self.entries else None
+
+    def _ensure_loaded(self):
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            self._load()
+
+    def _load(self):
+        if self.path is None or not self.path.exists():
+            return
+        import numpy as np
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                meta = json.loads(str(data["meta"]))
+                vectors = data["vectors"]
+        except Exception as e:
+            logging.warning(f"⚠️  Ignoring unreadable response cache {self.path}: {e}")
+            return
+        if meta.get("version") != CACHE_VERSION or meta.get("embedder") != self.embedder.name:
+            return  # vectors from another model are not comparable
+        self.entries = [CachedResponse(**entry) for entry in meta["entries"]]
+        self.vectors = vectors.astype(np.float32) if self.entries else None
+        self._expire()
+        logging.debug(f"💬 Loaded {len(self.entries)} cached responses from {self.path}")
+
+    def _schedule_save(self):
+        """Have the writer thread save the cache shortly (called with the lock held)."""
+        if self.path is None:
+            return
+        self._dirty = True
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._save_loop, name="pierre-response-cache", daemon=True)
+            self._writer.start()
+            atexit.register(self.flush)
+        self._save_requested.set()
+
+    def _save_loop(self):
+        while True:
+            self._save_requested.wait()
+            time.sleep(SAVE_DELAY)
+            self._save_requested.clear()
+            self.flush()
+
+    def _write(self, meta: dict, vectors: Optional["np.ndarray"]):
+        import numpy as np
+        if vectors is None:
+            vectors = np.zeros((0, 0), dtype=np.float32)
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp, "wb") as f:
+                np.savez(f, vectors=vectors, meta=np.array(json.dumps(meta, ensure_ascii=False)))
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logging.warning(f"⚠️  Could not save the response cache: {e}")
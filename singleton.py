@@ -1,10 +1,15 @@
+import threading
+
 
 def singleton(cls):
     instances = {}
+    lock = threading.RLock()  # startup loads subsystems from several threads at once
 
     def get_instance(*args, **kwargs):
         if cls not in instances:
-            instances[cls] = cls(*args, **kwargs)
+            with lock:
+                if cls not in instances:
+                    instances[cls] = cls(*args, **kwargs)
         return instances[cls]
 
     return get_instance
@@ -1,30 +1,73 @@
 import logging
+import os
+import threading
 import time
 import vosk
 from singleton import singleton
 from input import InputMethod
 from model_manager import ModelManager as Model
+from vad import SpeechGate
 import json
 
+# "grammar": small recognizer restricted to the wake word, "full": large-vocabulary recognizer
+WAKE_WORD_MODE = os.getenv("WAKE_WORD_MODE", "grammar")
+WAKE_WORD_CHUNK = 4000  # 125 ms, partial results make detection faster than 1 s reads
+WAKE_WORD_RESUME_GAP = 1.0  # seconds, a call starting sooner continues the previous one
+
 @singleton
 class SpeechToText:
     def __init__(self, model_path='models/vosk/vosk-model-fr-0.22'):
         self.input_method = InputMethod()
         self.__model_path = Model().get_model_vosk()
+        self.__wake_model_path = Model().get_model_vosk_wake()
         self.__loaded = False
         self.model = None
         self.rec = None
+        self.wake_model = None
+        self.wake_recognizers = {}  # wake word -> grammar-restricted KaldiRecognizer
+        self._load_lock = threading.Lock()
+        self._wake_listened_at = 0.0  # end of the last waitForWakeWord call
+
+    def preloadModels(self):
+        """Load the Vosk models from disk without needing the microphone (startup warm-up)."""
+        with self._load_lock:
+            if self.model is None:
+                self.model = vosk.Model(self.__model_path)
+            if WAKE_WORD_MODE == "grammar" and self.wake_model is None:
+                self.wake_model = self._loadWakeModel()
 
     def loadModel(self):
         if self.__loaded:
             return
         if not self.input_method.getAudioStream():
             raise SpeechToTextBadInputError("Audio stream not initialized. Please select microphone as input method.")
-        self.model = vosk.Model(self.__model_path)
+        self.preloadModels()  # no-op if the startup warm-up already did it
         self.rec = vosk.KaldiRecognizer(self.model, 16000)
         self.__loaded = True
         logging.info("✅ Speech-to-Text model loaded successfully.")
 
+    def _loadWakeModel(self):
+        # Large models have a static graph and ignore runtime grammars, so prefer the small model
+        if self.__wake_model_path != self.__model_path and os.path.isdir(self.__wake_model_path):
+            logging.info(f"🎯 Loading wake-word model: {self.__wake_model_path}")
+            return vosk.Model(self.__wake_model_path)
+        logging.warning(f"⚠️  Wake-word model not found at {self.__wake_model_path}, using the main model with a grammar")
+        return self.model
+
+    def getWakeRecognizer(self, wake_word: str):
+        """Get the shared recognizer that only knows the wake word (everything else maps to [unk])."""
+        wake_word = wake_word.lower()
+        if wake_word not in self.wake_recognizers:
+            self.wake_recognizers[wake_word] = self.newWakeRecognizer(wake_word)
+        return self.wake_recognizers[wake_word]
+
+    def newWakeRecognizer(self, wake_word: str):
+        """Create a separate wake-word recognizer, for consumers running on another thread."""
+        if not self.__loaded:
+            raise SpeechToTextError("Model not loaded. Call loadModel() before newWakeRecognizer().")
+        grammar = json.dumps([wake_word.lower(), "[unk]"])
+        return vosk.KaldiRecognizer(self.wake_model or self.model, 16000, grammar)
+
     def getRecognizer(self):
         return self.rec
     
@@ -41,19 +84,63 @@ class SpeechToText:
         else:
             return ""
 
+    def transcribe(self, utterance: bytes) -> str:
+        """Transcribe a complete utterance (as returned by the VAD endpointer)."""
+        if not self.__loaded:
+            raise SpeechToTextError("Model not loaded. Call loadModel() before transcribe().")
+        self.rec.AcceptWaveform(utterance)
+        return json.loads(self.rec.FinalResult()).get("text", "")
+
     def waitForWakeWord(self, wake_word: str, timeout: float = 10) -> bool:
-        logging.info("🎤 Listening for wake word...")
         if not self.__loaded:
             raise SpeechToTextError("Model not loaded. Call loadModel() before waitForWakeWord().")
+        cursor = self.input_method.getAudioCursor("wake_word")
+        # Callers loop on short timeouts: only a new listening session skips to
+        # the live position, slices in between read on so no audio is dropped
+        if time.time() - self._wake_listened_at > WAKE_WORD_RESUME_GAP:
+            logging.info("🎤 Listening for wake word...")
+            cursor.seek_to_live()
+        if WAKE_WORD_MODE == "grammar":
+            heard = self._waitForWakeWordGrammar(cursor, wake_word, timeout)
+        else:
+            heard = self._waitForWakeWordFull(cursor, wake_word, timeout)
+        self._wake_listened_at = 0.0 if heard else time.time()
+        return heard
+
+    def _waitForWakeWordFull(self, cursor, wake_word: str, timeout: float) -> bool:
+        gate = SpeechGate()
         startTime = time.time()
         while True:
             if time.time() - startTime > timeout:
+                self.rec.Reset()  # don't let a half-heard phrase prefix the next one
                 return False
-            audio_data = self.input_method.getAudioStream().read(16000, exception_on_overflow=False)
+            audio_data = gate.filter(cursor.read(16000))
+            if not audio_data:
+                continue  # silence, don't wake the recognizer up
             text = self.getText(audio_data)
             if wake_word.lower() in text.lower():
                 return True
 
+    def _waitForWakeWordGrammar(self, cursor, wake_word: str, timeout: float) -> bool:
+        # The heavy recognizer is not fed here, it only runs once the trigger fired
+        rec = self.getWakeRecognizer(wake_word)
+        gate = SpeechGate()
+        startTime = time.time()
+        while time.time() - startTime < timeout:
+            audio_data = gate.filter(cursor.read(WAKE_WORD_CHUNK, timeout=1))
+            if not audio_data:
+                continue  # silence, don't wake the recognizer up
+            if rec.AcceptWaveform(audio_data):
+                text = json.loads(rec.Result()).get("text", "")
+            else:
+                # Partial results fire as soon as the word is recognized, before the endpoint
+                text = json.loads(rec.PartialResult()).get("partial", "")
+            if wake_word.lower() in text.lower():
+                rec.Reset()
+                return True
+        rec.Reset()
+        return False
+
     
 
 class SpeechToTextError(Exception):
@@ -0,0 +1,266 @@
+"""
+Streaming speech output.
+Cuts the LLM answer into sentences while tokens are still arriving and hands
+each sentence to the TTS engine, so Pierre starts talking after the first
+sentence instead of after the whole answer.
+"""
+
+import logging
+import queue
+import re
+import threading
+import time
+from typing import Callable, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# A sentence ends on terminal punctuation followed by whitespace, or on a newline
+# (markdown list items, paragraphs). "3.14" or "file.txt" never match because the
+# punctuation must be followed by whitespace.
+_BOUNDARY = re.compile(r'[.!?…]+["»”)\]]*(?=\s)|\n')
+_LAST_WORD = re.compile(r'(\w[\w.]*)\.$')
+_THINK_BLOCK = re.compile(r'<think>.*?</think>', re.DOTALL)
+
+# Words followed by a dot that do not end a sentence (French and English)
+ABBREVIATIONS = {"m", "mm", "mme", "mlle", "mr", "mrs", "ms", "dr", "st", "etc", "e.g", "i.e", "vs", "p.ex", "cf"}
+
+# Shorter pieces are merged with the next one to avoid choppy synthesis
+MIN_SENTENCE_CHARS = 12
+
+
+def _hold_partial_tag(text: str) -> str:
+    """Text without a trailing "<", "<th"... that may be the start of a <think> tag still streaming."""
+    start = text.rfind("<")
+    if start != -1 and "<think>".startswith(text[start:]):
+        return text[:start]
+    return text
+
+
+def strip_reasoning(text: str) -> str:
+    """Remove <think>...</think> blocks (and a trailing unfinished one) from model output."""
+    text = _THINK_BLOCK.sub("", text)
+    if "<think>" in text:
+        text = text[:text.index("<think>")]
+    return text
+
+
+class SentenceSplitter:
+    """Incrementally splits a token stream into speakable sentences."""
+
+    def __init__(self, min_chars: int = MIN_SENTENCE_CHARS):
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """
+        Add text to the buffer and return every sentence completed by it.
+
+        Args:
+            text: New text (usually a single token)
+
+        Returns:
+            List of complete sentences, possibly empty
+        """
+        self._buffer += text
+        sentences = []
+        start = 0
+
+        for match in _BOUNDARY.finditer(self._buffer):
+            piece = self._buffer[start:match.end()].strip()
+            if not piece:
+                start = match.end()
+                continue
+
+            # "M. Dupont", "etc. and", "J. Smith" are not sentence ends
+            last_word = _LAST_WORD.search(piece)
+            if last_word:
+                word = last_word.group(1)
+                if word.lower() in ABBREVIATIONS or (len(word) == 1 and word.isupper()):
+                    continue
+
+            if len(piece) < self.min_chars:
+                continue
+
+            sentences.append(piece)
+            start = match.end()
+
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> List[str]:
+        """Return whatever is left in the buffer as a final sentence."""
+        rest = self._buffer.strip()
+        self._buffer = ""
+        return [rest] if rest else []
+
+    def reset(self):
+        """Drop the buffered text."""
+        self._buffer = ""
+
+
+def _speak_text(text: str, generation: Optional[int] = None):
+    from tts import speak_text  # Piper is only imported once something has to be said
+    speak_text(text, generation)
+
+
+def _playback_generation() -> int:
+    from audio_output import AudioOutput
+    return AudioOutput().generation
+
+
+class SpeechQueue:
+    """Background worker that speaks queued sentences one after another."""
+
+    def __init__(self, speak: Optional[Callable[[str, Optional[int]], None]] = None, maxsize: int = 0,
+                 playback_generation: Optional[Callable[[], int]] = None):
+        self._speak = speak or _speak_text  # (text, playback generation it was queued in)
+        self._playback_generation = playback_generation or _playback_generation
+        self._queue = queue.Queue(maxsize)  # bounded: a fast LLM waits for playback instead of piling up audio
+        self._speaking = threading.Event()
+        self._generation = 0  # bumped by clear(), older sentences are dropped
+        self.last_spoken_at = 0.0  # when the last sentence finished playing
+        self._thread = threading.Thread(target=self._run, name="pierre-tts", daemon=True)
+        self._thread.start()
+
+    def say(self, text: str):
+        """Queue a sentence for playback."""
+        if text and text.strip():
+            # An interrupt between now and its playback (barge-in) must silence it too
+            self._queue.put((self._generation, self._playback_generation(), text))
+
+    def wait(self):
+        """Block until every queued sentence has been spoken."""
+        self._queue.join()
+
+    def is_speaking(self) -> bool:
+        """True while a sentence is playing or waiting to be played."""
+        return self._speaking.is_set() or not self._queue.empty()
+
+    def clear(self):
+        """Drop every sentence not played yet (the one playing must be interrupted separately)."""
+        self._generation += 1
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                return
+            self._queue.task_done()
+
+    def close(self):
+        """Stop the worker once the queue is drained."""
+        self._queue.put(None)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                generation, playback_generation, text = item
+                if generation != self._generation:
+                    continue
+                self._speaking.set()
+                self._speak(text, playback_generation)
+            except Exception as e:
+                logging.error(f"❌ Failed to speak sentence: {e}")
+            finally:
+                if self._speaking.is_set():
+                    self._speaking.clear()
+                    self.last_spoken_at = time.time()
+                self._queue.task_done()
+
+
+class StreamingSpeechHandler(BaseCallbackHandler):
+    """
+    LangChain callback that speaks the agent's answer while it is generated.
+
+    The tool-calling agent streams every LLM call of the run (AgentExecutor plans
+    with `runnable.stream`), so tokens arrive through `on_llm_new_token`. Each LLM
+    call restarts the splitter; a call that turns out to be a tool call is muted
+    from the moment the tool call shows up in the stream. Models often say what
+    they are about to do before the tool call ("Je regarde l'heure."), so the
+    first sentence of a call is held until a second one is complete or the call
+    ends without a tool call.
+    """
+
+    def __init__(self, speech_queue: SpeechQueue):
+        self.speech_queue = speech_queue
+        self.splitter = SentenceSplitter()
+        self._raw = ""
+        self._emitted = 0
+        self._tool_call = False
+        self._held: List[str] = []  # first sentence(s) of the call, not spoken yet
+        self._released = False  # the call is an answer, speak sentences right away
+        self._last_answer = ""
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self._start_llm_run()
+
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        self._start_llm_run()
+
+    def on_llm_new_token(self, token: str, *, chunk=None, **kwargs):
+        if self._tool_call:
+            return
+
+        message = getattr(chunk, "message", None)
+        if getattr(message, "tool_call_chunks", None):
+            # This LLM call is a tool call, whatever comes next is not the answer
+            self._tool_call = True
+            self.splitter.reset()
+            self._held = []
+            return
+
+        self._raw += token
+        self._say(self.splitter.feed(self._new_text(_hold_partial_tag(strip_reasoning(self._raw)))))
+
+    def on_llm_end(self, response, **kwargs):
+        if self._tool_call:
+            self.splitter.reset()
+            self._held = []
+            return
+        visible = strip_reasoning(self._raw)
+        sentences = self._held + self.splitter.feed(self._new_text(visible)) + self.splitter.flush()
+        self._held = []
+        self._released = True
+        self._say(sentences)
+        self._last_answer = visible.strip()
+
+    def finish(self, output: str, wait: bool = True):
+        """
+        Make sure the final answer gets spoken, optionally waiting for playback to end.
+
+        The output does not come from a streamed LLM call when a `return_direct`
+        tool answered, so in that case it is spoken in one go.
+
+        Args:
+            output: The agent's final output
+            wait: Block until the speech queue is drained
+        """
+        if strip_reasoning(output).strip() != self._last_answer:
+            self.speech_queue.say(output)
+        if wait:
+            self.speech_queue.wait()
+
+    def _new_text(self, visible: str) -> str:
+        new_text = visible[self._emitted:]
+        self._emitted = len(visible)
+        return new_text
+
+    def _say(self, sentences: List[str]):
+        if not self._released:
+            self._held.extend(sentences)
+            if len(self._held) < 2:
+                return
+            sentences, self._held = self._held, []
+            self._released = True
+        for sentence in sentences:
+            self.speech_queue.say(sentence)
+
+    def _start_llm_run(self):
+        self.splitter.reset()
+        self._raw = ""
+        self._emitted = 0
+        self._tool_call = False
+        self._held = []
+        self._released = False
@@ -0,0 +1,146 @@
+"""
+Startup orchestrator.
+Loads the slow subsystems (Vosk model, Piper voice, Ollama warm-up) concurrently
+on a thread pool while the input-method prompt is on screen, and keeps a
+per-component timing breakdown of the cold start.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+# "auto": load Vosk and Piper during the prompt only if the host has a sound card
+# "true" / "false": always / never (they are then loaded when microphone mode is chosen)
+PRELOAD_AUDIO = os.getenv("PRELOAD_AUDIO", "auto").lower()
+
+
+def should_preload_audio() -> bool:
+    """Whether the audio models are worth loading before the user has picked a mode."""
+    if PRELOAD_AUDIO in ("true", "false"):
+        return PRELOAD_AUDIO == "true"
+    if sys.platform.startswith("linux"):
+        # Headless keyboard-only hosts have no ALSA PCM devices
+        try:
+            return any(name.startswith("pcm") for name in os.listdir("/dev/snd"))
+        except OSError:
+            return False
+    return True
+
+
+@dataclass
+class ComponentTiming:
+    name: str
+    started: float  # seconds since process start
+    duration: Optional[float] = None  # None while still running
+    parallel: bool = False
+    error: Optional[str] = None
+
+
+class StartupOrchestrator:
+    """Runs startup components concurrently and profiles the whole cold start."""
+
+    def __init__(self, started_at: float = None, max_workers: int = 4):
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.ready_at: Optional[float] = None
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pierre-startup")
+        self._futures = {}
+        self._timings: List[ComponentTiming] = []
+        self._lock = threading.Lock()
+
+    def _now(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    def record(self, name: str, started: float, duration: float):
+        """Record a phase that ran on the main thread (e.g. imports)."""
+        with self._lock:
+            self._timings.append(ComponentTiming(name, started, duration))
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block running on the main thread."""
+        started = self._now()
+        try:
+            yield
+        finally:
+            self.record(name, started, self._now() - started)
+
+    def submit(self, name: str, load: Callable):
+        """
+        Start loading a component on the pool.
+
+        Args:
+            name: Component name used by wait() and in the report
+            load: Callable doing the work; returning False marks the component as failed
+        """
+        timing = ComponentTiming(name, self._now(), parallel=True)
+        with self._lock:
+            self._timings.append(timing)
+
+        def run():
+            start = time.perf_counter()
+            try:
+                if load() is False:
+                    timing.error = "failed"
+            except Exception as e:
+                timing.error = str(e)
+                logging.error(f"❌ Startup: {name} failed to load: {e}")
+            finally:
+                timing.duration = time.perf_counter() - start
+            logging.info(f"⏱️  Startup: {name} ready in {timing.duration:.2f}s")
+
+        self._futures[name] = self._pool.submit(run)
+
+    def wait(self, name: str, timeout: float = None) -> bool:
+        """
+        Block until a component has finished loading.
+
+        Returns:
+            True if it loaded without error, False if it failed, timed out or was never submitted
+        """
+        future = self._futures.get(name)
+        if future is None:
+            return False
+        wait_futures([future], timeout=timeout)
+        timing = self._get_timing(name)
+        return future.done() and timing.error is None
+
+    def wait_all(self, timeout: float = None):
+        wait_futures(list(self._futures.values()), timeout=timeout)
+
+    def mark_ready(self):
+        """Pierre is ready to take its first command."""
+        self.ready_at = self._now()
+        self._pool.shutdown(wait=False)
+
+    def _get_timing(self, name: str) -> Optional[ComponentTiming]:
+        with self._lock:
+            return next((t for t in self._timings if t.name == name), None)
+
+    def get_timings(self) -> Dict[str, Optional[float]]:
+        with self._lock:
+            return {t.name: t.duration for t in self._timings}
+
+    def report(self) -> str:
+        """Per-component timing breakdown of the startup."""
+        with self._lock:
+            timings = sorted(self._timings, key=lambda t: t.started)
+        lines = ["⏱️  Startup profile", f"   {'component':<24}{'start':>8}{'duration':>10}"]
+        for t in timings:
+            duration = f"{t.duration:.2f}s" if t.duration is not None else "running"
+            flags = (" ∥" if t.parallel else "") + (f"  ❌ {t.error}" if t.error else "")
+            lines.append(f"   {t.name:<24}{t.started:>7.2f}s{duration:>10}{flags}")
+
+        parallel = [t for t in timings if t.parallel and t.duration is not None]
+        if parallel:
+            window = max(t.started + t.duration for t in parallel) - min(t.started for t in parallel)
+            serial = sum(t.duration for t in parallel)
+            lines.append(f"   ∥ parallel loads: {window:.2f}s wall clock instead of {serial:.2f}s one after another")
+        if self.ready_at is not None:
+            lines.append(f"   ready for the first command after {self.ready_at:.2f}s")
+        return "\n".join(lines)
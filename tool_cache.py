@@ -0,0 +1,127 @@
+"""
+Tool result cache.
+Shared, size-bounded LRU cache of tool results with a TTL per tool. Tools opt
+in with one decorator line stacked above `@tool`:
+
+    @cache_result(ttl=600, key=lambda ticker: ticker.strip().upper())
+    @tool("yahoo_finance_news")
+    def yahoo_finance_news(ticker: str) -> str: ...
+
+The cache lives outside `tools/`, keyed by tool name. The ToolManager drops a
+tool's results when its module is reloaded or unloaded: the new code may
+compute them differently.
+"""
+
+import functools
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Optional
+
+from singleton import singleton
+
+MAX_ENTRIES = int(os.getenv("TOOL_CACHE_MAX_ENTRIES", 256))
+
+# Results that look like failures are not cached, the next call should retry
+_FAILURE = re.compile(r"^\W*(error|search error|search timeout|unable to|sorry|no .* available)", re.IGNORECASE)
+
+_MISSING = object()
+
+
+@singleton
+class ToolResultCache:
+    """Singleton LRU cache of tool results with per-entry expiry."""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (tool name, key) -> (expires at, result)
+        self._lock = threading.Lock()
+        self.hits = defaultdict(int)
+        self.misses = defaultdict(int)
+        self.evictions = 0
+
+    def get(self, tool_name: str, key: str) -> Any:
+        """Cached result, or _MISSING if absent or expired."""
+        with self._lock:
+            entry = self._entries.get((tool_name, key))
+            if entry is not None and entry[0] > time.time():
+                self._entries.move_to_end((tool_name, key))
+                self.hits[tool_name] += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[(tool_name, key)]
+            self.misses[tool_name] += 1
+            return _MISSING
+
+    def put(self, tool_name: str, key: str, result: Any, ttl: float):
+        with self._lock:
+            self._entries[(tool_name, key)] = (time.time() + ttl, result)
+            self._entries.move_to_end((tool_name, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self, tool_name: Optional[str] = None):
+        """Drop every entry, or only those of one tool."""
+        with self._lock:
+            if tool_name is None:
+                self._entries.clear()
+            else:
+                for cache_key in [k for k in self._entries if k[0] == tool_name]:
+                    del self._entries[cache_key]
+
+    def get_stats(self) -> str:
+        """Get formatted cache statistics."""
+        with self._lock:
+            hits, misses = sum(self.hits.values()), sum(self.misses.values())
+            rate = (hits / (hits + misses) * 100) if hits + misses else 0
+            info = (f"🗃️  Tool cache: {len(self._entries)}/{self.max_entries} entries, "
+                    f"{hits} hits / {misses} misses ({rate:.0f}% hit rate), {self.evictions} evictions")
+            for name in sorted(set(self.hits) | set(self.misses)):
+                info += f"\n  • {name}: {self.hits[name]} hits / {self.misses[name]} misses"
+            return info
+
+
+def cache_result(ttl: float, key: Callable[..., Any] = None):
+    """
+    Cache a tool's results for `ttl` seconds. Stack it above `@tool`.
+
+    Args:
+        ttl: Seconds a result stays valid
+        key: Optional normalizer called with the tool's arguments, returning what
+            identifies the call (e.g. `lambda city: city.strip().lower()`).
+            Defaults to the arguments themselves, with strings stripped
+
+    Returns:
+        Decorator wrapping the tool's function
+    """
+    def decorate(tool):
+        func = tool.func
+        if func is None:
+            logging.warning(f"⚠️  {tool.name} has no synchronous function, not cached")
+            return tool
+
+        @functools.wraps(func)
+        def cached(*args, **kwargs):
+            if args:
+                return func(*args, **kwargs)  # positional calls are not produced by the agent
+            normalized = key(**kwargs) if key else {k: v.strip() if isinstance(v, str) else v
+                                                    for k, v in kwargs.items()}
+            cache_key = json.dumps(normalized, sort_keys=True, default=str)
+            cache = ToolResultCache()
+            result = cache.get(tool.name, cache_key)
+            if result is not _MISSING:
+                logging.debug(f"🗃️  Cache hit for {tool.name}({cache_key})")
+                return result
+            result = func(**kwargs)
+            if not (isinstance(result, str) and _FAILURE.match(result)):
+                cache.put(tool.name, cache_key, result, ttl)
+            return result
+
+        tool.func = cached
+        return tool
+    return decorate
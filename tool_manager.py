@@ -3,9 +3,12 @@ Tool Manager for Hot-Reloading Tools
 Dynamically loads and reloads tools from the tools directory at runtime.
 """
 
+import functools
 import importlib
+import os
 import sys
 import logging
+import threading
 from pathlib import Path
 from typing import List, Dict, Any
 from singleton import singleton
@@ -15,6 +18,21 @@ from langchain_ollama import ChatOllama, OllamaLLM
 from langchain_core.messages import HumanMessage
 from langchain.agents import AgentExecutor, create_tool_calling_agent
 from langchain_core.prompts import ChatPromptTemplate
+from tool_manifest import ToolManifest, LazyTool
+from tool_cache import ToolResultCache
+from prompt_profiler import tool_token_costs
+
+# Build tools from the manifest cache and import their modules on first call
+LAZY_TOOLS = os.getenv("LAZY_TOOLS", "True").lower() == "true"
+
+
+def _locked(method):
+    """Run a ToolManager method holding its lock."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 @singleton
@@ -28,6 +46,11 @@ class ToolManager:
         self.tools = {}
         self.tool_to_module = {}  # Maps tool name to module name
         self.module_to_tools = {}  # Maps module name to list of tool names
+        self.manifest = ToolManifest()
+        self.lazy = LAZY_TOOLS
+        # The watcher, the reload worker and pool threads resolving lazy tools all
+        # import modules and update the maps below: one of them at a time
+        self.lock = threading.RLock()
         logging.info("🔧 ToolManager initialized")
     
     def discover_tool_files(self) -> List[str]:
@@ -47,6 +70,7 @@ class ToolManager:
         logging.debug(f"Discovered {len(tool_files)} tool files: {tool_files}")
         return tool_files
     
+    @_locked
     def load_module(self, module_name: str, reload: bool = False):
         """Load or reload a specific module."""
         full_module_name = f"{self.tools_directory}.{module_name}"
@@ -68,6 +92,7 @@ class ToolManager:
             traceback.print_exc()
             return None
     
+    @_locked
     def extract_tools_from_module(self, module, module_name: str) -> Dict[str, Any]:
         """Extract all LangChain tools from a module."""
         tools = {}
@@ -102,6 +127,7 @@ class ToolManager:
         
         return tools
     
+    @_locked
     def load_all_tools(self, reload: bool = False) -> List[Any]:
         """
         Load or reload all tools from the tools directory.
@@ -122,20 +148,62 @@ class ToolManager:
         tool_files = self.discover_tool_files()
         logging.info(f"Found {len(tool_files)} tool modules")
         
+        lazy_count = 0
         for module_name in tool_files:
+            if self.lazy and not reload and self._load_lazy_tools(module_name):
+                lazy_count += 1
+                continue
+
             module = self.load_module(module_name, reload=reload)
             
             if module:
                 module_tools = self.extract_tools_from_module(module, module_name)
                 self.tools.update(module_tools)
-        
+                self.manifest.put(module_name, self._module_path(module_name), list(module_tools.values()))
+
+        self.manifest.prune(tool_files)
+        self.manifest.save()
+        if lazy_count:
+            logging.info(f"💤 {lazy_count} tool modules served from the manifest, imported on first call")
         logging.info(f"✅ Loaded {len(self.tools)} tools total: {list(self.tools.keys())}")
         return list(self.tools.values())
+
+    def _module_path(self, module_name: str) -> Path:
+        return Path(self.tools_directory) / f"{module_name}.py"
+
+    @_locked
+    def _load_lazy_tools(self, module_name: str) -> bool:
+        """Register proxy tools from the manifest, True if the module could be skipped."""
+        if f"{self.tools_directory}.{module_name}" in sys.modules:
+            return False  # already imported anyway, use the real tools
+        entries = self.manifest.get(module_name, self._module_path(module_name))
+        if not entries:
+            return False
+        for entry in entries:
+            self.tools[entry["name"]] = LazyTool.from_manifest(entry, module_name, self._resolve_lazy_tool)
+            self.tool_to_module[entry["name"]] = module_name
+        self.module_to_tools[module_name] = [entry["name"] for entry in entries]
+        return True
+
+    @_locked
+    def _resolve_lazy_tool(self, module_name: str, tool_name: str) -> Any:
+        """Import the module behind a proxy tool and return the real tool."""
+        module = self.load_module(module_name)
+        if module is None:
+            return None
+        module_tools = self.extract_tools_from_module(module, module_name)
+        if tool_name not in module_tools:
+            logging.error(f"❌ Tool {tool_name} is not in {module_name} anymore, reload the tools")
+            return None
+        return module_tools[tool_name]
     
+    @_locked
     def reload_all_tools(self) -> List[Any]:
         """Reload all tools."""
+        ToolResultCache().clear()  # computed by the old code
         return self.load_all_tools(reload=True)
     
+    @_locked
     def reload_specific_tool(self, identifier: str) -> List[Any]:
         """
         Reload a specific tool module by module name or tool name.
@@ -163,6 +231,7 @@ class ToolManager:
             if module_name in self.module_to_tools:
                 old_tool_names = self.module_to_tools[module_name]
                 for tool_name in old_tool_names:
+                    ToolResultCache().clear(tool_name)
                     if tool_name in self.tools:
                         del self.tools[tool_name]
                         logging.debug(f"  Removed old tool: {tool_name}")
@@ -172,13 +241,38 @@ class ToolManager:
             # Add new tools from reloaded module
             module_tools = self.extract_tools_from_module(module, module_name)
             self.tools.update(module_tools)
+            self.manifest.put(module_name, self._module_path(module_name), list(module_tools.values()))
+            self.manifest.save()
 
             logging.info(f"✅ Reloaded {module_name}. Total tools: {len(self.tools)}")
         else:
             logging.error(f"❌ Failed to reload module: {module_name}")
 
         return list(self.tools.values())
-    
+
+    @_locked
+    def unload_module(self, module_name: str) -> List[Any]:
+        """
+        Forget a module whose file was deleted, and the tools it provided.
+
+        Args:
+            module_name: Module name (e.g., "time")
+
+        Returns:
+            List of all remaining tools
+        """
+        for tool_name in self.module_to_tools.pop(module_name, []):
+            ToolResultCache().clear(tool_name)
+            self.tools.pop(tool_name, None)
+            self.tool_to_module.pop(tool_name, None)
+        self.loaded_modules.pop(module_name, None)
+        sys.modules.pop(f"{self.tools_directory}.{module_name}", None)
+        self.manifest.remove(module_name)
+        self.manifest.save()
+        logging.info(f"🗑️  Unloaded module: {module_name}. Total tools: {len(self.tools)}")
+        return list(self.tools.values())
+
+    @_locked
     def get_all_tools(self) -> List[Any]:
         """
         Get all currently loaded tools.
@@ -188,6 +282,7 @@ class ToolManager:
         """
         return list(self.tools.values())
     
+    @_locked
     def get_tool_names(self) -> List[str]:
         """
         Get names of all currently loaded tools.
@@ -197,6 +292,7 @@ class ToolManager:
         """
         return list(self.tools.keys())
     
+    @_locked
     def get_tool_by_name(self, name: str) -> Any:
         """
         Get a specific tool by name.
@@ -209,10 +305,12 @@ class ToolManager:
         """
         return self.tools.get(name)
     
+    @_locked
     def get_tool_count(self) -> int:
         """Get the number of loaded tools."""
         return len(self.tools)
     
+    @_locked
     def get_tools_info(self) -> str:
         """Get formatted information about all loaded tools."""
         if not self.tools:
@@ -226,10 +324,21 @@ class ToolManager:
         
         return info
     
+    def get_tool_token_costs(self) -> List[tuple]:
+        """
+        Estimated prompt tokens of each tool's schema.
+
+        Returns:
+            List of (tool name, tokens), most expensive first
+        """
+        return tool_token_costs(self.get_all_tools())
+
+    @_locked
     def get_module_for_tool(self, tool_name: str) -> str:
         """Get the module name for a specific tool."""
         return self.tool_to_module.get(tool_name, None)
     
+    @_locked
     def get_tools_in_module(self, module_name: str) -> List[str]:
         """Get all tool names in a specific module."""
         return self.module_to_tools.get(module_name, [])
@@ -0,0 +1,170 @@
+"""
+Tool manifest cache.
+On-disk index of the tools each module in `tools/` provides (name, description,
+argument schema, return_direct), keyed by the file's mtime and hash. ToolManager
+builds lightweight proxy tools from it, so the LLM gets the tool schemas at
+startup without importing the modules (and their yfinance/PIL/mss/... deps).
+A module is only imported the first time one of its tools is called.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.tools import BaseTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+MANIFEST_VERSION = 2
+MANIFEST_PATH = os.getenv("TOOL_MANIFEST_PATH", ".cache/tool_manifest.json")
+
+
+def _file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def describe_tool(tool: BaseTool) -> Dict[str, Any]:
+    """Manifest entry of a loaded tool, with the exact schema sent to the LLM."""
+    function = convert_to_openai_tool(tool)["function"]
+    return {
+        "name": tool.name,
+        "description": tool.description,
+        "parameters": function.get("parameters", {"type": "object", "properties": {}}),
+        "return_direct": tool.return_direct,
+        "metadata": tool.metadata,  # utils.tool_options (parallel_safe, timeout)
+    }
+
+
+def tools_signature(tools: List[BaseTool]) -> str:
+    """Hash of the tool schemas as the LLM sees them (changes only if the prompt prefix does)."""
+    entries = [describe_tool(tool) for tool in tools]
+    return hashlib.sha256(json.dumps(entries, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class ToolManifest:
+    """Manifest of tool schemas per module, invalidated when the module file changes."""
+
+    def __init__(self, path: str = MANIFEST_PATH):
+        self.path = Path(path)
+        self.modules: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logging.warning(f"⚠️  Ignoring unreadable tool manifest {self.path}: {e}")
+            return
+        if data.get("version") == MANIFEST_VERSION:
+            self.modules = data.get("modules", {})
+
+    def get(self, module_name: str, file_path: Path) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get the cached tool entries of a module if its file is unchanged.
+
+        Args:
+            module_name: Module name in the tools directory
+            file_path: Path of the module file
+
+        Returns:
+            List of tool entries, or None if the module has to be imported
+        """
+        entry = self.modules.get(module_name)
+        if entry is None:
+            return None
+        try:
+            mtime = file_path.stat().st_mtime
+            if mtime != entry["mtime"]:
+                # Touched but maybe not modified (checkout, copy), the hash decides
+                if _file_hash(file_path) != entry["sha256"]:
+                    return None
+                entry["mtime"] = mtime
+                self._dirty = True
+        except OSError:
+            return None
+        return entry["tools"]
+
+    def put(self, module_name: str, file_path: Path, tools: List[BaseTool]):
+        """Record the tools of a freshly imported module."""
+        try:
+            self.modules[module_name] = {
+                "mtime": file_path.stat().st_mtime,
+                "sha256": _file_hash(file_path),
+                "tools": [describe_tool(tool) for tool in tools],
+            }
+            self._dirty = True
+        except Exception as e:
+            logging.warning(f"⚠️  Could not add {module_name} to the tool manifest: {e}")
+
+    def remove(self, module_name: str):
+        if self.modules.pop(module_name, None) is not None:
+            self._dirty = True
+
+    def prune(self, module_names: List[str]):
+        """Forget modules that no longer exist."""
+        for module_name in set(self.modules) - set(module_names):
+            self.remove(module_name)
+
+    def save(self):
+        if not self._dirty:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps({"version": MANIFEST_VERSION, "modules": self.modules}, indent=1),
+                                encoding="utf-8")
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except OSError as e:
+            logging.warning(f"⚠️  Could not save the tool manifest: {e}")
+
+
+class LazyTool(BaseTool):
+    """
+    Stand-in for a tool whose module has not been imported yet.
+
+    It exposes the cached name, description and JSON schema, and imports the
+    real tool on first invocation through `resolver`.
+    """
+
+    module_name: str
+    resolver: Callable[[str, str], Optional[BaseTool]]  # (module_name, tool_name) -> real tool
+    resolved: Optional[BaseTool] = None
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._resolve_lock = threading.Lock()
+
+    @classmethod
+    def from_manifest(cls, entry: Dict[str, Any], module_name: str, resolver: Callable) -> "LazyTool":
+        return cls(
+            name=entry["name"],
+            description=entry["description"],
+            args_schema=entry["parameters"],
+            return_direct=entry.get("return_direct", False),
+            metadata=entry.get("metadata"),
+            module_name=module_name,
+            resolver=resolver,
+        )
+
+    def resolve(self) -> Optional[BaseTool]:
+        """Import the module and get the real tool (once)."""
+        if self.resolved is None:
+            with self._resolve_lock:
+                if self.resolved is None:
+                    self.resolved = self.resolver(self.module_name, self.name)
+        return self.resolved
+
+    def _run(self, *args, run_manager=None, **kwargs) -> Any:
+        tool = self.resolve()
+        if tool is None:
+            return f"Error: the tool {self.name} could not be loaded from tools/{self.module_name}.py"
+        # The run's callbacks (cancellation...) reach the real tool as child callbacks
+        config = {"callbacks": run_manager.get_child()} if run_manager is not None else None
+        return tool.invoke(kwargs if kwargs or not args else args[0], config=config)
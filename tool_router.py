@@ -0,0 +1,155 @@
+"""
+Tool router.
+Scores the loaded tools against the user's input with a BM25 index over their
+names and descriptions, and binds only the top-k (plus pinned tools) to the
+agent for that request, instead of sending every tool schema every time.
+"""
+
+import logging
+import math
+import os
+import re
+import time
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Sequence
+
+TOP_K = int(os.getenv("TOOL_ROUTER_TOP_K", 4))  # 0 disables routing, every tool is bound
+# Tools bound to every request. run_command is pinned because the system prompt's
+# error-recovery playbook relies on it, read_observation because any tool output may be cut
+PINNED_TOOLS = [name.strip() for name in os.getenv("TOOL_ROUTER_PINNED", "run_command,exit_pierre,read_observation").split(",")
+                if name.strip()]
+
+NAME_WEIGHT = 3  # tool-name tokens count as much as three description tokens
+MIN_RELATIVE_SCORE = 0.3  # within the top-k, drop tools scoring under 30% of the best one
+
+STOPWORDS = {
+    # English
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "with", "is", "are", "be", "it",
+    "this", "that", "me", "my", "you", "your", "i", "can", "please", "what", "use", "tool", "when",
+    "user", "says", "something", "like", "if", "as", "by", "from", "at", "do", "get", "returns",
+    # French
+    "le", "la", "les", "un", "une", "des", "du", "de", "et", "ou", "en", "au", "aux", "est", "sont",
+    "je", "tu", "il", "elle", "nous", "vous", "moi", "mon", "ma", "mes", "ton", "ta", "tes", "ce",
+    "cette", "ces", "que", "qui", "quoi", "quel", "quelle", "pour", "dans", "sur", "avec", "pas",
+    "ne", "peux", "peut", "stp", "svp", "plait", "pierre",
+}
+
+# Tool descriptions are in English; map frequent French request words onto their vocabulary
+GLOSSARY = {
+    "heure": "time clock", "heures": "time clock", "temps": "time", "ville": "city",
+    "fichier": "file read", "fichiers": "file read", "lire": "read file", "lis": "read file",
+    "contenu": "content file", "dossier": "directory folder",
+    "commande": "command run", "lance": "run command", "lancer": "run command", "execute": "run command",
+    "executer": "run command", "installe": "install command", "installer": "install command",
+    "terminal": "terminal command",
+    "capture": "screenshot capture", "ecran": "screen screenshot",
+    "recherche": "search web", "cherche": "search web", "chercher": "search web", "internet": "web search",
+    "actualites": "news headlines", "actualite": "news headlines", "nouvelles": "news headlines",
+    "infos": "news headlines", "journal": "news headlines",
+    "bourse": "finance stock", "action": "stock finance", "actions": "stock finance",
+    "batterie": "battery", "systeme": "system", "memoire": "memory", "disque": "disk",
+    "processeur": "cpu", "exploitation": "os operating",
+    "reseau": "network scan arp", "appareils": "devices network",
+    "micro": "microphone audio", "microphone": "microphone audio", "audio": "audio", "voix": "voice audio",
+    "vocal": "voice audio", "clavier": "keyboard",
+    "recharge": "reload", "recharger": "reload", "outils": "tools", "outil": "tool",
+    "quitte": "exit quit", "quitter": "exit quit", "arrete": "exit stop", "eteins": "exit shutdown",
+    "matrice": "matrix", "texte": "text ocr",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, accent-free word tokens without stopwords, with plural 's' stripped."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    tokens = []
+    for word in re.findall(r"[a-z0-9]+", text.replace("_", " ")):
+        if word in STOPWORDS or len(word) < 2:
+            continue
+        if len(word) > 3 and word.endswith("s"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+def expand_query(text: str) -> List[str]:
+    """Query tokens plus the English equivalents of known French words."""
+    tokens = tokenize(text)
+    expanded = list(tokens)
+    for token in tokens:
+        if token in GLOSSARY:
+            expanded.extend(tokenize(GLOSSARY[token]))
+        elif token + "s" in GLOSSARY:  # plural stripped by tokenize
+            expanded.extend(tokenize(GLOSSARY[token + "s"]))
+    return expanded
+
+
+class BM25Index:
+    """Okapi BM25 over a small, fixed set of documents."""
+
+    def __init__(self, documents: Sequence[List[str]], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.term_counts = [Counter(doc) for doc in documents]
+        self.lengths = [len(doc) for doc in documents]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if documents else 0
+        df = Counter(term for doc in documents for term in set(doc))
+        n = len(documents)
+        self.idf = {term: math.log(1 + (n - freq + 0.5) / (freq + 0.5)) for term, freq in df.items()}
+
+    def scores(self, query: Iterable[str]) -> List[float]:
+        query_terms = Counter(query)
+        results = []
+        for counts, length in zip(self.term_counts, self.lengths):
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * length / self.avg_length) if self.avg_length else self.k1
+            for term, query_freq in query_terms.items():
+                freq = counts.get(term)
+                if freq:
+                    score += query_freq * self.idf[term] * freq * (self.k1 + 1) / (freq + norm)
+            results.append(score)
+        return results
+
+
+class ToolRouter:
+    """Picks the tools worth binding for a request."""
+
+    def __init__(self, tools: Sequence, top_k: int = TOP_K, pinned: Sequence[str] = PINNED_TOOLS):
+        self.tools = list(tools)
+        self.top_k = top_k
+        self.pinned = [tool for tool in self.tools if tool.name in set(pinned)]
+        documents = [tokenize(tool.name) * NAME_WEIGHT + tokenize(tool.description) for tool in self.tools]
+        self.index = BM25Index(documents)
+        self.last_route_ms = 0.0
+
+    def is_enabled(self) -> bool:
+        return 0 < self.top_k and self.top_k + len(self.pinned) < len(self.tools)
+
+    def score(self, text: str) -> Dict[str, float]:
+        """BM25 score of every tool for a text."""
+        return {tool.name: score for tool, score in zip(self.tools, self.index.scores(expand_query(text)))}
+
+    def select(self, text: str) -> List:
+        """
+        Get the tools to bind for a request.
+
+        Args:
+            text: The user's input (optionally with the previous turn for follow-ups)
+
+        Returns:
+            Pinned tools plus the top-k scoring tools, in the ToolManager's order
+            (a stable order keeps identical subsets byte-identical in the prompt)
+        """
+        if not self.is_enabled():
+            return list(self.tools)
+        start = time.perf_counter()
+        scores = self.index.scores(expand_query(text))
+        ranked = sorted((i for i, score in enumerate(scores) if score > 0), key=lambda i: -scores[i])
+        cutoff = scores[ranked[0]] * MIN_RELATIVE_SCORE if ranked else 0
+        chosen = {i for i in ranked[:self.top_k] if scores[i] >= cutoff}
+        selected = [tool for i, tool in enumerate(self.tools) if i in chosen or tool in self.pinned]
+        self.last_route_ms = (time.perf_counter() - start) * 1000
+        logging.info(f"🧭 Routed to {len(selected)}/{len(self.tools)} tools in {self.last_route_ms:.2f} ms: "
+                     f"{', '.join(tool.name for tool in selected)}")
+        return selected
@@ -0,0 +1,88 @@
+"""
+Tool file watcher.
+Polls `tools/` for modified, new and deleted modules and hot-reloads only
+those, so editing a tool no longer needs a `reload_tools` call and the cost of
+a reload depends on what changed rather than on how many tools exist.
+"""
+
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Set, Tuple
+
+WATCH_INTERVAL = float(os.getenv("TOOL_WATCH_INTERVAL", 1.0))  # seconds between scans
+WATCH_DEBOUNCE = float(os.getenv("TOOL_WATCH_DEBOUNCE", 0.5))  # quiet time before reloading a burst of saves
+
+
+class ToolWatcher:
+    """Background watcher reloading the tool modules that changed on disk."""
+
+    def __init__(self, ai_manager, interval: float = WATCH_INTERVAL, debounce: float = WATCH_DEBOUNCE):
+        self.ai_manager = ai_manager
+        self.tool_manager = ai_manager.get_tool_manager()
+        self.interval = interval
+        self.debounce = debounce
+        self._stop = threading.Event()
+        self._thread = None
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        """Map of module name -> (mtime_ns, size) for the tool files."""
+        snapshot = {}
+        for file in Path(self.tool_manager.tools_directory).glob("*.py"):
+            if file.stem == "__init__" or file.stem.startswith("_"):
+                continue
+            try:
+                stat = file.stat()
+            except OSError:
+                continue  # deleted between glob and stat
+            snapshot[file.stem] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def _diff(self, old: Dict, new: Dict) -> Tuple[Set[str], Set[str]]:
+        changed = {name for name, state in new.items() if old.get(name) != state}
+        removed = set(old) - set(new)
+        return changed, removed
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._watch_loop, name="pierre-tool-watcher", daemon=True)
+        self._thread.start()
+        logging.info(f"👀 Watching {self.tool_manager.tools_directory}/ for tool changes")
+
+    def stop(self):
+        self._stop.set()
+
+    def _watch_loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                current = self._scan()
+                if current == self._snapshot:
+                    continue
+                # Editors save in several steps, wait until the files stop moving
+                while not self._stop.wait(self.debounce):
+                    settled = self._scan()
+                    if settled == current:
+                        break
+                    current = settled
+                changed, removed = self._diff(self._snapshot, current)
+                self._snapshot = current
+                self.apply(changed, removed)
+            except Exception as e:
+                logging.error(f"❌ Tool watcher failed: {e}")
+
+    def apply(self, changed: Set[str], removed: Set[str]):
+        """
+        Have the reload worker reload the changed modules, drop the removed ones and update the agent.
+
+        Args:
+            changed: Modified or new module names
+            removed: Deleted module names
+        """
+        if not changed and not removed:
+            return
+        self.ai_manager.reload_async(modules=changed, removed=removed)
+        logging.info(f"👀 Reloading {len(changed)} changed and {len(removed)} removed tool module(s): "
+                     f"{', '.join(sorted(changed | removed))}")
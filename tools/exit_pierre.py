@@ -1,9 +1,11 @@
 from langchain.tools import tool
+from utils.tool_options import tool_options
 import logging
 import sys
 import os
 
 
+@tool_options(parallel_safe=False)  # raises SystemExit, must stay on the agent's thread
 @tool("exit_pierre", return_direct=False)
 def exit_pierre() -> str:
     """
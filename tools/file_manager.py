@@ -1,11 +1,54 @@
 from langchain.tools import tool
+import os
+import re
+import sys
+
+# Add parent directory to path for import
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from utils import file_reader
+
+WHOLE_FILE_BYTES = 16 * 1024  # smaller text files are returned whole by default
+DEFAULT_WINDOW_LINES = 100
+MAX_BYTE_LENGTH = 2048
+
+
+def _size(size: int) -> str:
+    for unit in ("bytes", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "bytes" else f"{size:.1f} {unit}"
+        size /= 1024
+
 
 @tool("read_file", return_direct=False)
-def read_file(filename: str) -> str:
+def read_file(filename: str, start_line: int = 0, num_lines: int = 0, tail: int = 0, search: str = "",
+              context: int = 2, byte_offset: int = -1, byte_length: int = 0) -> str:
     """
-    Reads and returns the contents of a specified file.
+    Reads a file, or the part of it you ask for. Works on files of any size: large files
+    are never loaded whole, so use the options below to look inside big logs or data files.
     Args:
         filename: The path to the file to read.
+        start_line: First line to read (1-based). With num_lines, reads a window of lines
+        num_lines: Number of lines to read from start_line (default 100)
+        tail: Read the last N lines instead (e.g. tail=50 for the end of a log)
+        search: Regular expression (case-insensitive), matched against each line on its own
+                (^ and $ are the line's start and end); returns matching lines with their
+                line numbers and `context` lines around each match
+        context: Lines shown before and after each search match (default 2)
+        byte_offset: Read raw bytes from this offset (hex dump for binary files)
+        byte_length: Number of bytes to read from byte_offset (max 2048)
+
+    Without options: small text files are returned whole; for large ones the first
+    100 lines are returned with the file size, then use start_line, tail or search.
+    Binary files (images, archives, executables) are detected and described instead
+    of being decoded; use byte_offset to inspect their bytes.
+
+    Examples:
+    - "What are the last errors in /var/log/syslog?" → read_file("/var/log/syslog", search="error")
+    - "Show the end of app.log" → read_file("app.log", tail=50)
+    - "Show lines 200 to 260 of main.py" → read_file("main.py", start_line=200, num_lines=61)
     
     !IMPORTANT: Path Validation & Error Recovery Strategy
     
@@ -61,7 +104,53 @@ def read_file(filename: str) -> str:
     """
 
     try:
-        with open(filename, 'r') as f:
-            return f.read()
+        path = os.path.expanduser(filename.strip())
+        if os.path.isdir(path):
+            return f"Error reading file: {path} is a directory"
+        size = os.path.getsize(path)
+        kind = file_reader.sniff(path)
+        header = f"{path} ({_size(size)}, {kind.description})"
+
+        if byte_offset >= 0:
+            length = max(1, min(byte_length or 256, MAX_BYTE_LENGTH))
+            raw = file_reader.read_bytes(path, byte_offset, length)
+            if not raw:
+                return f"{header}\nOffset {byte_offset} is past the end of the file."
+            if kind.binary:
+                return f"{header}, bytes {byte_offset}-{byte_offset + len(raw) - 1}:\n{file_reader.hexdump(raw, byte_offset)}"
+            return (f"{header}, bytes {byte_offset}-{byte_offset + len(raw) - 1}:\n"
+                    f"{raw.decode(kind.encoding, errors='replace')}")
+
+        if kind.binary:
+            raw = file_reader.read_bytes(path, 0, 256)
+            return (f"{header}: binary file, not shown as text. First bytes:\n{file_reader.hexdump(raw)}\n"
+                    f"Use byte_offset/byte_length to inspect other bytes.")
+
+        if search:
+            try:
+                re.compile(search)
+            except re.error:
+                search = re.escape(search)
+            text, matches, more = file_reader.search(path, kind, search, max(0, min(context, 10)))
+            if not matches:
+                return f"{header}\nNo line matches '{search}'."
+            note = "\n[More matches not shown, refine the search or use start_line]" if more else ""
+            return f"{header}, {matches} matching line(s) (':' match, '-' context):\n{text}{note}"
+
+        if tail > 0:
+            text, first = file_reader.tail_lines(path, kind, tail)
+            return f"{header}, last lines from line {first}:\n{text}" if text else f"{header}\n(empty file)"
+
+        if not start_line and not num_lines and size <= WHOLE_FILE_BYTES:
+            with open(path, "r", encoding=kind.encoding, errors="replace") as f:
+                return f.read()
+
+        start = max(1, start_line or 1)
+        text, last, more = file_reader.read_lines(path, kind, start, max(1, num_lines or DEFAULT_WINDOW_LINES))
+        if not text:
+            return f"{header}\nThe file has fewer than {start} lines."
+        note = (f"\n[Continues after line {last}: use start_line={last + 1}, tail or search to read more]"
+                if more else "")
+        return f"{header}, lines {start}-{last}:\n{text}{note}"
     except Exception as e:
         return f"Error reading file: {e}"
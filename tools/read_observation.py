@@ -0,0 +1,67 @@
+from langchain.tools import tool
+from utils.tool_options import tool_options
+import re
+import sys
+import os
+
+# Add parent directory to path for import
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from observation_budget import ObservationStore
+from utils.tokens import CHARS_PER_TOKEN
+from utils.tool_options import DEFAULT_OBSERVATION_TOKENS
+
+MAX_CHARS = int(DEFAULT_OBSERVATION_TOKENS * CHARS_PER_TOKEN)
+MAX_MATCHES = 40
+
+
+@tool_options(observation_tokens=0)  # already sized to fit
+@tool("read_observation", return_direct=False)
+def read_observation(handle: str, offset: int = 0, length: int = 3000, search: str = "") -> str:
+    """
+    Reads more of a long tool output that was cut down. Cut outputs end with a note
+    like: Full output kept as "obs-3".
+
+    Args:
+        handle: The handle given in the note, e.g. "obs-3"
+        offset: Character position to start reading from (0 = beginning)
+        length: Number of characters to read
+        search: Optional text or regular expression; returns the matching lines
+                (with their line numbers) instead of a range
+
+    Example:
+    - run_command output was cut and the error is in the middle →
+      read_observation(handle="obs-3", search="error")
+    - See the part after the first 4000 characters →
+      read_observation(handle="obs-3", offset=4000)
+    """
+    text = ObservationStore().get(handle)
+    if text is None:
+        return f"Error: no output kept under '{handle}' (it may have expired). Run the tool again."
+
+    if search:
+        try:
+            pattern = re.compile(search, re.IGNORECASE)
+        except re.error:
+            pattern = re.compile(re.escape(search), re.IGNORECASE)
+        matches, size = [], 0
+        for number, line in enumerate(text.split("\n"), 1):
+            if pattern.search(line):
+                entry = f"{number}: {line[:300]}"
+                if len(matches) >= MAX_MATCHES or size + len(entry) > MAX_CHARS:
+                    matches.append("[... more matches, refine the search ...]")
+                    break
+                matches.append(entry)
+                size += len(entry) + 1
+        if not matches:
+            return f"No line of {handle} matches '{search}'."
+        return "\n".join(matches)
+
+    offset = max(0, offset)
+    length = max(1, min(length, MAX_CHARS))
+    if offset >= len(text):
+        return f"Offset {offset} is past the end of {handle} ({len(text)} characters)."
+    end = min(len(text), offset + length)
+    return f"[{handle}: characters {offset}-{end} of {len(text)}]\n{text[offset:end]}"
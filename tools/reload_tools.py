@@ -1,4 +1,5 @@
 from langchain.tools import tool
+from utils.tool_options import tool_options
 import logging
 import sys
 import os
@@ -14,6 +15,7 @@ from ai_manager import AIManager
 logger = logging.getLogger(__name__)
 
 
+@tool_options(parallel_safe=False)  # replaces the tools other calls may be using
 @tool("reload_tools", return_direct=False)
 def reload_tools(identifier: str = "all") -> str:
     """
@@ -23,6 +25,9 @@ def reload_tools(identifier: str = "all") -> str:
         identifier: Can be:
             - "all" to reload all tools
             - "list" to list all current tools without reloading
+            - "tokens" to report where the prompt tokens go (per tool and per component)
+            - "cache" to show the tool result and response cache statistics
+            - "intents" to show the fast-path intent router statistics
             - A module name (e.g., "time", "matrix") to reload that file
             - A tool name (e.g., "get_time") to reload the module containing that tool
     
@@ -35,6 +40,7 @@ def reload_tools(identifier: str = "all") -> str:
     - "Reload time module"
     - "Refresh tools"
     - "List all tools"
+    - "Which tools cost the most tokens?"
     """
     
     try:
@@ -43,12 +49,19 @@ def reload_tools(identifier: str = "all") -> str:
         
         if identifier.lower() == "all":
             logger.info("🔄 Reloading all tools...")
-            tool_manager.reload_all_tools()
-            ai_manager.reload()
-            return "✅ Successfully reloaded all tools!" 
+            # Reloaded and published by the reload worker, this run keeps its agent
+            ai_manager.reload_async(reload_all=True)
+            return "✅ Reloading all tools! They will be available from the next request."
         elif identifier.lower() == "list":
             # List current tools without reloading
             return tool_manager.get_tools_info()
+        elif identifier.lower() == "tokens":
+            return ai_manager.get_token_report()
+        elif identifier.lower() == "cache":
+            from tool_cache import ToolResultCache
+            return f"{ToolResultCache().get_stats()}\n{ai_manager.response_cache.get_stats()}"
+        elif identifier.lower() == "intents":
+            return ai_manager.intent_router.get_stats()
         else:
             logger.info(f"🔄 Reloading: {identifier}")
             
@@ -61,18 +74,13 @@ def reload_tools(identifier: str = "all") -> str:
                 # Assume it's a module name
                 module_name = identifier
                 display_name = f"module '{module_name}.py'"
-            
-            tools = tool_manager.reload_specific_tool(identifier)
-            ai_manager.reload()
-            
-            # Get the tools that were reloaded from this module
-            reloaded_tools = tool_manager.get_tools_in_module(module_name)
-            
-            result = f"✅ Successfully reloaded {display_name}\n"
-            result += f"📦 Reloaded {len(reloaded_tools)} tool(s): {', '.join(reloaded_tools)}\n"
-            result += f"📊 Total tools loaded: {len(tools)}\n\n"
-            
-            return result
+                if module_name not in tool_manager.discover_tool_files():
+                    return f"❌ No tool or module named '{identifier}'. Use reload_tools('list') to see the tools."
+
+            ai_manager.reload_async(modules=[identifier])
+            current_tools = tool_manager.get_tools_in_module(module_name)
+            return (f"✅ Reloading {display_name}, it will be available from the next request.\n"
+                    f"📦 Tools currently in the module: {', '.join(current_tools) or 'none'}")
             
     except Exception as e:
         error_msg = f"❌ Failed to reload tools: {str(e)}"
@@ -1,5 +1,5 @@
 from langchain.tools import tool
-import subprocess
+from utils.tool_options import tool_options
 import platform
 import tempfile
 import sys
@@ -13,12 +13,34 @@ if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
 
 from utils import terminal
+from utils.process_runner import run_process
+from utils import shell_sessions
 
 logger = logging.getLogger(__name__)
 
+# Seconds before a captured command is stopped, unless the call sets its own timeout
+DEFAULT_TIMEOUT = float(os.getenv("RUN_COMMAND_TIMEOUT", 120))
+# Run captured commands in persistent shells, so cd/export/activate carry over between calls
+SHELL_SESSIONS = os.getenv("SHELL_SESSIONS", "True").lower() == "true"
 
+
+def _print_output(stream: str, line: str):
+    """Show the command's output on the console while it runs."""
+    print(f"  │ {line}", file=sys.stderr if stream == "stderr" else sys.stdout, flush=True)
+
+
+def _cancellation_check(callbacks):
+    """is_cancelled of the run's cancellation handler (barge-in), if there is one."""
+    for handler in getattr(callbacks, "handlers", None) or []:
+        if callable(getattr(handler, "is_cancelled", None)):
+            return handler.is_cancelled
+    return None
+
+
+@tool_options(parallel_safe=False)  # commands of one step often depend on each other (install, then run)
 @tool("run_command", return_direct=False)
-def run_command(commands: str, open_terminal: bool = False) -> str:
+def run_command(commands: str, open_terminal: bool = False, timeout: float = 0, session: str = "main",
+                callbacks=None) -> str:
     """
     Runs commands and captures output. Only opens a terminal window for interactive applications.
     
@@ -28,6 +50,12 @@ def run_command(commands: str, open_terminal: bool = False) -> str:
                  - Multiple commands on separate lines (each will be executed after the previous)
         open_terminal: Set to True ONLY when launching interactive applications or GUI programs.
                       Default: False (capture output)
+        timeout: Seconds before a captured command is stopped, 0 for the default;
+                 raise it for long installs or builds
+        session: Name of the persistent shell the command runs in. The working directory,
+                 exported variables and activated environments (cd, export, conda activate,
+                 source venv/bin/activate) are kept between calls with the same session.
+                 Use another name for an independent shell
 
     !IMPORTANT - DEFAULT BEHAVIOR:
     By default, this tool CAPTURES OUTPUT and returns it to you.
@@ -64,7 +92,9 @@ def run_command(commands: str, open_terminal: bool = False) -> str:
     - User says "open terminal and run X" → use open_terminal=True
     
     Output format when capturing:
-    - Returns stdout, stderr, and exit code
+    - Returns stdout, stderr, exit code and the shell's working directory
+    - Long output keeps its beginning and end, the middle is omitted
+    - On timeout, returns the output produced so far
     - Perfect for checking results, debugging, or chaining commands
     
     Output format when opening terminal:
@@ -82,32 +112,40 @@ def run_command(commands: str, open_terminal: bool = False) -> str:
         logger.info(f"Running command(s): {command_input} (open_terminal={open_terminal})")
 
         if not open_terminal:
-            # Run command directly and capture output (no terminal window)
+            # Run command directly, streaming its output to the console (no terminal window)
+            limit = timeout if timeout and timeout > 0 else DEFAULT_TIMEOUT
+            options = dict(on_output=_print_output, cancelled=_cancellation_check(callbacks))
             try:
-                result = subprocess.run(
-                    command_input,
-                    shell=True,
-                    capture_output=True,
-                    text=True,
-                    timeout=30
-                )
-                
+                if SHELL_SESSIONS and shell_sessions.is_supported():
+                    result = shell_sessions.ShellSessionManager().run(command_input, limit,
+                                                                      session=session or "main", **options)
+                else:
+                    result = run_process(command_input, limit, **options)
+            except Exception as e:
+                return f"❌ Failed to execute command: {str(e)}"
+
+            if result.cancelled:
+                output = f"🛑 Command cancelled after {result.duration:.0f} seconds: {command_input}\n\n"
+            elif result.timed_out:
+                output = f"⏱️ Command timed out after {limit:g} seconds: {command_input}\n"
+                output += "It was stopped; output produced until then:\n\n"
+            elif result.returncode is None:
+                output = f"⚠️ The shell session ended while running: {command_input}\n"
+                output += "The next command starts a new session (back to the default directory).\n\n"
+            else:
                 output = f"✅ Command executed successfully\n"
                 output += f"Command: {command_input}\n\n"
-                
-                if result.stdout:
-                    output += f"--- STDOUT ---\n{result.stdout}\n"
-                if result.stderr:
-                    output += f"--- STDERR ---\n{result.stderr}\n"
-                    
+
+            if result.stdout:
+                output += f"--- STDOUT ---\n{result.stdout}\n"
+            if result.stderr:
+                output += f"--- STDERR ---\n{result.stderr}\n"
+            if result.returncode is not None:
                 output += f"--- EXIT CODE ---\n{result.returncode}\n"
-                
-                return output
-                
-            except subprocess.TimeoutExpired:
-                return f"⏱️ Command timed out after 30 seconds: {command_input}"
-            except Exception as e:
-                return f"❌ Failed to execute command: {str(e)}"
+            if result.cwd:
+                output += f"--- WORKING DIRECTORY ---\n{result.cwd}\n"
+
+            return output
         
         else:
             # Open terminal window (output not captured)
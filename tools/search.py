@@ -1,10 +1,14 @@
 # tools/search.py
 
 from langchain.tools import tool
+from tool_cache import cache_result
+from utils.tool_options import tool_options
 import requests
 from urllib.parse import quote
 import json
 
+@cache_result(ttl=600, key=lambda query: query.strip().lower())
+@tool_options(timeout=15)
 @tool
 def search_web(query: str) -> str:
     """Search the web using DuckDuckGo Instant Answer API."""
@@ -44,6 +48,8 @@ def search_web(query: str) -> str:
     except Exception as e:
         return f"Search error: {e}"
 
+@cache_result(ttl=300)
+@tool_options(timeout=15)
 @tool
 def get_news_headlines() -> str:
     """Get current news headlines."""
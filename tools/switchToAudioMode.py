@@ -1,7 +1,8 @@
 from langchain.tools import tool
+from utils.tool_options import tool_options
 import utils.terminal as terminal
 from input import InputMethod
-from speechToText import SpeechToText
+@tool_options(parallel_safe=False)  # changes the input method
 @tool("switch_to_audio_mode", return_direct=False)
 def switch_to_audio_mode() -> str:
     """
@@ -12,6 +13,7 @@ def switch_to_audio_mode() -> str:
     - "Enable audio interaction"
     """
     try:
+        from speechToText import SpeechToText  # vosk is only imported when audio mode is requested
         input_tool = InputMethod()
         input_tool.set_selected_method(input_tool.MICROPHONE)
         if(not SpeechToText().isLoaded()):
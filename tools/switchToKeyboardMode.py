@@ -1,6 +1,8 @@
 from langchain.tools import tool
+from utils.tool_options import tool_options
 from input import InputMethod
 import logging
+@tool_options(parallel_safe=False)  # changes the input method
 @tool("switch_to_keyboard_mode", return_direct=False)
 def switch_to_keyboard_mode() -> str:
     """
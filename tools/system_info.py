@@ -1,6 +1,7 @@
 # tools/system_info.py
 
 from langchain.tools import tool
+from tool_cache import cache_result
 import psutil
 import platform
 import os
@@ -53,6 +54,7 @@ def get_battery_status() -> str:
     except Exception as e:
         return f"Error getting battery info: {e}"
     
+@cache_result(ttl=24 * 3600)
 @tool("get_os", return_direct=False)
 def get_os() -> str:
     """Get the operating system name."""
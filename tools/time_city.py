@@ -1,9 +1,11 @@
 # tools/time_tool.py
 
 from langchain.tools import tool
+from tool_cache import cache_result
 from datetime import datetime
 import pytz
 
+@cache_result(ttl=5, key=lambda city: city.strip().lower())  # short: the answer is a clock time
 @tool("get_time_city", return_direct=False)
 def get_time_city(city: str ) -> str:
     """Returns the current time in a given city.
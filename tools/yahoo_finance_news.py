@@ -1,10 +1,14 @@
 # tools/yahoo_finance_news.py
 
 from langchain.tools import tool
+from tool_cache import cache_result
+from utils.tool_options import tool_options
 import yfinance as yf
 from datetime import datetime
 import logging
 
+@cache_result(ttl=600, key=lambda ticker: ticker.strip().upper())
+@tool_options(timeout=20)
 @tool("yahoo_finance_news", return_direct=False)
 def yahoo_finance_news(ticker: str) -> str:
     """Fetches the last 4 news articles about a company from Yahoo Finance.
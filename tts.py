@@ -1,9 +1,35 @@
-import wave
+import logging
 import re
+import threading
+from typing import Optional
 from piper import PiperVoice
 from model_manager import ModelManager as Model
-from playsound import playsound
-voice = PiperVoice.load(Model().get_model_piper())
+from audio_output import AudioOutput
+from tts_cache import SynthesisCache, CachedAudio
+
+voice = None  # loaded by load_voice(), at startup or on first use
+_voice_lock = threading.Lock()
+
+# Phrases Pierre says all the time, synthesized once at startup
+COMMON_PHRASES = [
+    "Oui monsieur?",
+    "Screenshot captured and saved sir.",
+    "Audio mode activated. I am now listening via the microphone.",
+    "Keyboard mode activated. I am now listening via the keyboard.",
+    "✅ Reloading all tools! They will be available from the next request.",
+    "Matrix mode activated! Enjoy the rain, Neo.",
+]
+
+
+def load_voice() -> PiperVoice:
+    """Load the Piper voice once and return it (safe to call from several threads)."""
+    global voice
+    if voice is None:
+        with _voice_lock:
+            if voice is None:
+                voice = PiperVoice.load(Model().get_model_piper())
+                logging.info("✅ Piper voice loaded successfully.")
+    return voice
 
 
 def clean_text_for_speech(text: str) -> str:
@@ -38,13 +64,55 @@ def clean_text_for_speech(text: str) -> str:
     return text
 
 
-def speak_text(text: str):
+def speak_text(text: str, generation: Optional[int] = None):
     """Convert text to speech and play it.
 
     Args:
         text: The text to be spoken
+        generation: Playback generation it was queued in (see playback_generation);
+            nothing is played if playback was interrupted since
     """
     text = clean_text_for_speech(text)
-    with wave.open("output.wav", "wb") as wav_file:
-        voice.synthesize_wav(text, wav_file)
-    playsound("output.wav")
\ No newline at end of file
+    if generation is None:
+        generation = AudioOutput().generation
+    if not text or generation != AudioOutput().generation:
+        return
+
+    model = Model().get_model_piper()
+    cached = SynthesisCache().get(model, text)
+    if cached:
+        AudioOutput().play(cached.pcm, cached.sample_rate, cached.channels, cached.sample_width, generation)
+        return
+
+    # Piper chunks go straight to the shared output stream, no temporary WAV file
+    voice = load_voice()
+    pcm = AudioOutput().play_chunks(voice.synthesize(text), generation)
+    if pcm is not None:  # interrupted playback is not cached
+        SynthesisCache().put(model, text, CachedAudio(pcm, voice.config.sample_rate))
+
+
+def playback_generation() -> int:
+    """The current playback generation, bumped by every stop_speaking()."""
+    return AudioOutput().generation
+
+
+def stop_speaking() -> bool:
+    """Interrupt the utterance being played. Returns True once playback has stopped."""
+    return AudioOutput().interrupt()
+
+
+def prewarm_speech(phrases=None):
+    """Synthesize recurring phrases into the cache without playing them.
+
+    Args:
+        phrases: Phrases to synthesize, defaults to COMMON_PHRASES
+    """
+    model = Model().get_model_piper()
+    voice = load_voice()
+    for phrase in phrases or COMMON_PHRASES:
+        text = clean_text_for_speech(phrase)
+        if not text or SynthesisCache().contains(model, text):
+            continue
+        pcm = b"".join(chunk.audio_int16_bytes for chunk in voice.synthesize(text))
+        SynthesisCache().put(model, text, CachedAudio(pcm, voice.config.sample_rate), persist=True)
+    logging.info(f"🔥 Speech cache pre-warmed. {SynthesisCache().get_stats()}")
@@ -0,0 +1,216 @@
+"""
+Synthesis cache for recurring phrases.
+Keeps synthesized PCM in memory (LRU, bounded in bytes) and optionally spills
+it to WAV files on disk, so phrases Pierre repeats all the time are played
+without running Piper again. Only pre-warmed phrases and phrases heard again
+are spilled, and the disk store is bounded in bytes (least recently used
+files are deleted first).
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import wave
+from collections import OrderedDict
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from singleton import singleton
+
+
+class CachedAudio(NamedTuple):
+    pcm: bytes
+    sample_rate: int
+    channels: int = 1
+    sample_width: int = 2
+
+
+@singleton
+class SynthesisCache:
+    """Singleton LRU cache of synthesized audio keyed on (voice model, cleaned text)."""
+
+    def __init__(self):
+        self.max_bytes = int(os.getenv("TTS_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+        # Long answers rarely repeat and would evict the short phrases that do
+        self.max_entry_bytes = int(os.getenv("TTS_CACHE_MAX_ENTRY_BYTES", 1024 * 1024))
+        self.disk_directory = os.getenv("TTS_CACHE_DIR") or None
+        self.max_disk_bytes = int(os.getenv("TTS_CACHE_DISK_MAX_BYTES", 64 * 1024 * 1024))
+
+        self._entries = OrderedDict()  # key -> CachedAudio, least recently used first
+        self._size = 0
+        self._disk_size = 0
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._writing = set()  # keys being written to disk
+        self.hits = 0
+        self.misses = 0
+
+        if self.disk_directory:
+            Path(self.disk_directory).mkdir(parents=True, exist_ok=True)
+            self._trim_disk()
+        logging.info(f"💾 SynthesisCache initialized ({self.max_bytes // 1024} KB, disk: {self.disk_directory})")
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        return hashlib.sha1(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+    def get(self, model: str, text: str) -> Optional[CachedAudio]:
+        """
+        Look up synthesized audio, checking memory first and then the disk store.
+
+        Args:
+            model: Piper voice model path
+            text: Cleaned text
+
+        Returns:
+            CachedAudio or None if the phrase was never synthesized
+        """
+        key = self.make_key(model, text)
+        with self._lock:
+            audio = self._entries.get(key)
+            if audio is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if audio is not None:
+            # The phrase recurs: keep it across restarts, without delaying its playback
+            path = self._disk_path(key)
+            if path is not None and not path.exists():
+                threading.Thread(target=self._save_to_disk, args=(key, audio), daemon=True).start()
+            return audio
+
+        audio = self._load_from_disk(key)
+        with self._lock:
+            if audio is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._store(key, audio)
+        return audio
+
+    def put(self, model: str, text: str, audio: CachedAudio, persist: bool = False):
+        """
+        Store synthesized audio in memory.
+
+        Args:
+            model: Piper voice model path
+            text: Cleaned text
+            audio: The synthesized audio
+            persist: Also write it to the disk store now (pre-warmed phrases);
+                other phrases are written there once they are played again
+        """
+        if not audio.pcm or len(audio.pcm) > self.max_entry_bytes:
+            return
+        key = self.make_key(model, text)
+        with self._lock:
+            self._store(key, audio)
+        if persist:
+            self._save_to_disk(key, audio)
+
+    def contains(self, model: str, text: str) -> bool:
+        key = self.make_key(model, text)
+        with self._lock:
+            if key in self._entries:
+                return True
+        path = self._disk_path(key)
+        return path is not None and path.exists()
+
+    def get_stats(self) -> str:
+        """Get formatted cache statistics."""
+        with self._lock:
+            total = self.hits + self.misses
+            rate = (self.hits / total * 100) if total else 0
+            return (f"💾 TTS cache: {len(self._entries)} phrases, {self._size // 1024} KB / "
+                    f"{self.max_bytes // 1024} KB, hit rate {rate:.0f}% ({self.hits}/{total})")
+
+    def _store(self, key: str, audio: CachedAudio):
+        # Caller holds the lock
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size -= len(previous.pcm)
+        self._entries[key] = audio
+        self._size += len(audio.pcm)
+
+        while self._size > self.max_bytes and self._entries:
+            evicted_key, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted.pcm)
+            logging.debug(f"  Evicted cached phrase {evicted_key[:8]}")
+
+    def _disk_path(self, key: str) -> Optional[Path]:
+        if not self.disk_directory:
+            return None
+        return Path(self.disk_directory) / f"{key}.wav"
+
+    def _load_from_disk(self, key: str) -> Optional[CachedAudio]:
+        path = self._disk_path(key)
+        if path is None or not path.exists():
+            return None
+        try:
+            with wave.open(str(path), "rb") as wav_file:
+                audio = CachedAudio(
+                    pcm=wav_file.readframes(wav_file.getnframes()),
+                    sample_rate=wav_file.getframerate(),
+                    channels=wav_file.getnchannels(),
+                    sample_width=wav_file.getsampwidth()
+                )
+            os.utime(path)  # the modification time orders the files for eviction
+            return audio
+        except Exception as e:
+            logging.warning(f"⚠️  Failed to read cached audio {path}: {e}")
+            return None
+
+    def _save_to_disk(self, key: str, audio: CachedAudio):
+        path = self._disk_path(key)
+        if path is None:
+            return
+        with self._disk_lock:
+            if key in self._writing or path.exists():
+                return
+            self._writing.add(key)
+        try:
+            # Write to a temporary name first so readers never see a partial file
+            tmp_path = path.with_suffix(".tmp")
+            with wave.open(str(tmp_path), "wb") as wav_file:
+                wav_file.setnchannels(audio.channels)
+                wav_file.setsampwidth(audio.sample_width)
+                wav_file.setframerate(audio.sample_rate)
+                wav_file.writeframes(audio.pcm)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logging.warning(f"⚠️  Failed to write cached audio {path}: {e}")
+            return
+        finally:
+            with self._disk_lock:
+                self._writing.discard(key)
+        with self._disk_lock:
+            self._disk_size += path.stat().st_size
+            over = self._disk_size > self.max_disk_bytes
+        if over:
+            self._trim_disk()
+
+    def _trim_disk(self):
+        """Delete the least recently used WAV files until the disk store fits in max_disk_bytes."""
+        with self._disk_lock:
+            files = []
+            for path in Path(self.disk_directory).iterdir():
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                if path.suffix == ".wav":
+                    files.append((stat.st_mtime, stat.st_size, path))
+            files.sort()
+            size = sum(file_size for _, file_size, _ in files)
+            removed = 0
+            for _, file_size, path in files:
+                if size <= self.max_disk_bytes:
+                    break
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                size -= file_size
+                removed += 1
+            self._disk_size = size
+        if removed:
+            logging.debug(f"  Removed {removed} cached audio files from {self.disk_directory}")
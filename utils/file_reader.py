@@ -0,0 +1,316 @@
+"""
+Constant-memory file reading for read_file.
+Files are memory-mapped and only the requested part is decoded: a line
+window, the last lines, a byte range, or the lines matching a regex with their
+context. Binary files and the text encoding are detected from the first few KB.
+"""
+
+import codecs
+import mmap
+import os
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+
+SNIFF_BYTES = 8192
+MAX_LINE_CHARS = 500  # longer lines are cut in the output
+MAX_OUTPUT_CHARS = 4000
+COUNT_CHUNK_BYTES = 1 << 20
+SEARCH_CHUNK_BYTES = 1 << 20  # decoded at once by search, ends on a line boundary
+
+_BOMS = [(codecs.BOM_UTF8, "utf-8-sig"), (codecs.BOM_UTF32_LE, "utf-32"), (codecs.BOM_UTF32_BE, "utf-32"),
+         (codecs.BOM_UTF16_LE, "utf-16"), (codecs.BOM_UTF16_BE, "utf-16")]
+_MAGIC = [(b"\x89PNG", "PNG image"), (b"\xff\xd8\xff", "JPEG image"), (b"GIF8", "GIF image"),
+          (b"%PDF", "PDF document"), (b"PK\x03\x04", "ZIP archive (also docx/xlsx/jar)"),
+          (b"\x1f\x8b", "gzip archive"), (b"\x7fELF", "ELF executable"), (b"MZ", "Windows executable"),
+          (b"SQLite format 3", "SQLite database"), (b"BZh", "bzip2 archive"), (b"\xfd7zXZ", "xz archive"),
+          (b"7z\xbc\xaf", "7-Zip archive"), (b"OggS", "Ogg audio"), (b"RIFF", "RIFF (WAV/AVI) media")]
+_TEXT_CONTROLS = {7, 8, 9, 10, 12, 13, 27}
+_ESCAPE = re.compile(r"\\(.)", re.DOTALL)  # one escape sequence of a regex pattern
+
+
+@dataclass
+class FileKind:
+    binary: bool
+    encoding: Optional[str]  # None for binary files
+    description: str  # "utf-8 text", "PNG image"...
+
+    @property
+    def ascii_compatible(self) -> bool:
+        """Newlines are single 0x0A bytes, so lines can be found in the raw bytes."""
+        return self.encoding is not None and not self.encoding.startswith(("utf-16", "utf-32"))
+
+
+def sniff(path: str) -> FileKind:
+    """Guess whether a file is text, and its encoding, from its first SNIFF_BYTES."""
+    with open(path, "rb") as f:
+        sample = f.read(SNIFF_BYTES)
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return FileKind(False, encoding, f"{encoding} text")
+    for magic, description in _MAGIC:
+        if sample.startswith(magic):
+            return FileKind(True, None, description)
+    if b"\x00" in sample:
+        return FileKind(True, None, "binary data")
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)  # a character may be cut at the end
+        return FileKind(False, "utf-8", "utf-8 text")
+    except UnicodeDecodeError:
+        pass
+    controls = sum(1 for byte in sample if byte < 32 and byte not in _TEXT_CONTROLS)
+    if controls <= len(sample) * 0.05:
+        return FileKind(False, "latin-1", "latin-1 text")
+    return FileKind(True, None, "binary data")
+
+
+def _open_map(path: str) -> Optional[mmap.mmap]:
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _count_newlines(data, start: int, end: int) -> int:
+    count = 0
+    for position in range(start, end, COUNT_CHUNK_BYTES):
+        count += data[position:min(end, position + COUNT_CHUNK_BYTES)].count(b"\n")
+    return count
+
+
+def _line_bounds(data, position: int) -> Tuple[int, int]:
+    """Start and end (excluding the newline) of the line containing position."""
+    start = data.rfind(b"\n", 0, position) + 1
+    end = data.find(b"\n", position)
+    return start, len(data) if end < 0 else end
+
+
+def _decode(raw: bytes, encoding: str) -> str:
+    return raw.decode(encoding, errors="replace").rstrip("\r")
+
+
+def _format_line(number: int, text: str, marker: str = ":") -> str:
+    if len(text) > MAX_LINE_CHARS:
+        text = text[:MAX_LINE_CHARS] + f"... ({len(text)} chars)"
+    return f"{number}{marker} {text}"
+
+
+class _Output:
+    """Lines collected up to MAX_OUTPUT_CHARS."""
+
+    def __init__(self, max_chars: int = MAX_OUTPUT_CHARS):
+        self.lines: List[str] = []
+        self.size = 0
+        self.max_chars = max_chars
+        self.full = False
+
+    def add(self, line: str) -> bool:
+        if self.size + len(line) + 1 > self.max_chars and self.lines:
+            self.full = True
+            return False
+        self.lines.append(line)
+        self.size += len(line) + 1
+        return True
+
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+
+def _text_lines(path: str, encoding: str) -> Iterator[str]:
+    """Decoded lines of a text file whose newlines aren't single bytes (UTF-16/32), streamed."""
+    with open(path, "r", encoding=encoding, errors="replace", newline="") as f:
+        for line in f:
+            yield line.rstrip("\r\n")
+
+
+def read_lines(path: str, kind: FileKind, start_line: int, num_lines: int) -> Tuple[str, int, bool]:
+    """
+    Lines start_line..start_line + num_lines - 1 (1-based) with their numbers.
+
+    Returns:
+        (text, last line number shown, whether more lines follow)
+    """
+    output = _Output()
+    last = start_line - 1
+    if not kind.ascii_compatible:
+        for number, line in enumerate(_text_lines(path, kind.encoding), 1):
+            if number < start_line:
+                continue
+            if number >= start_line + num_lines or not output.add(_format_line(number, line)):
+                return output.text(), last, True
+            last = number
+        return output.text(), last, False
+
+    data = _open_map(path)
+    if data is None:
+        return "", 0, False
+    with data:
+        position = 0
+        for _ in range(start_line - 1):
+            position = data.find(b"\n", position) + 1
+            if position == 0:
+                return "", 0, False
+        number = start_line
+        while position < len(data) and number < start_line + num_lines:
+            end = data.find(b"\n", position)
+            end = len(data) if end < 0 else end
+            if not output.add(_format_line(number, _decode(data[position:end], kind.encoding))):
+                break
+            last, position, number = number, end + 1, number + 1
+        return output.text(), last, position < len(data)
+
+
+def tail_lines(path: str, kind: FileKind, count: int) -> Tuple[str, Optional[int]]:
+    """
+    The last `count` lines.
+
+    Returns:
+        (text, number of the first line shown, None if unknown)
+    """
+    if not kind.ascii_compatible:
+        lines = deque(enumerate(_text_lines(path, kind.encoding), 1), maxlen=count)
+        output = _Output()
+        for number, line in reversed(lines):
+            if not output.add(_format_line(number, line)):
+                break
+        output.lines.reverse()
+        return output.text(), lines[0][0] if lines else None
+
+    data = _open_map(path)
+    if data is None:
+        return "", None
+    with data:
+        end = len(data) - 1 if data[-1:] == b"\n" else len(data)
+        collected: List[bytes] = []
+        size = 0
+        while len(collected) < count and end > 0:
+            start = data.rfind(b"\n", 0, end) + 1
+            line = data[start:end]
+            if size + min(len(line), MAX_LINE_CHARS) > MAX_OUTPUT_CHARS and collected:
+                break
+            collected.append(line)
+            size += min(len(line), MAX_LINE_CHARS) + 8
+            end = start - 1
+        first_line = _count_newlines(data, 0, max(0, end + 1)) + 1
+        numbered = [_format_line(first_line + i, _decode(line, kind.encoding))
+                    for i, line in enumerate(reversed(collected))]
+        return "\n".join(numbered), first_line
+
+
+def read_bytes(path: str, offset: int, length: int) -> bytes:
+    """Raw bytes of a range, without reading the rest of the file."""
+    data = _open_map(path)
+    if data is None:
+        return b""
+    with data:
+        return data[offset:offset + length]
+
+
+def hexdump(raw: bytes, offset: int = 0) -> str:
+    lines = []
+    for position in range(0, len(raw), 16):
+        chunk = raw[position:position + 16]
+        hex_part = " ".join(f"{byte:02x}" for byte in chunk)
+        text_part = "".join(chr(byte) if 32 <= byte < 127 else "." for byte in chunk)
+        lines.append(f"{offset + position:08x}  {hex_part:<47}  {text_part}")
+    return "\n".join(lines)
+
+
+class _LineSearch:
+    """Matching lines and their context, fed one decoded line at a time."""
+
+    def __init__(self, regex: re.Pattern, context: int, max_matches: int):
+        self.regex = regex
+        self.context = context
+        self.max_matches = max_matches
+        self.output = _Output()
+        self.matches = 0
+        self.before = deque(maxlen=context)  # (number, line) not shown yet
+        self.after_left = 0
+        self.last_printed = 0
+        self.stopped = False
+
+    def feed(self, number: int, line: str) -> bool:
+        """Handle one line; False once the search must stop."""
+        if self.regex.search(line):
+            if self.matches >= self.max_matches:
+                self.stopped = True
+                return False
+            if self.last_printed and number - len(self.before) > self.last_printed + 1:
+                self.output.add("--")
+            for previous_number, previous in self.before:
+                self.output.add(_format_line(previous_number, previous, "-"))
+            self.before.clear()
+            if not self.output.add(_format_line(number, line)):
+                self.stopped = True
+                return False
+            self.matches, self.after_left, self.last_printed = self.matches + 1, self.context, number
+        elif self.after_left:
+            self.output.add(_format_line(number, line, "-"))
+            self.after_left, self.last_printed = self.after_left - 1, number
+        else:
+            self.before.append((number, line))
+        return True
+
+    def result(self) -> Tuple[str, int, bool]:
+        return self.output.text(), self.matches, self.stopped
+
+
+def _text_chunks(data, encoding: str) -> Iterator[str]:
+    """Decoded SEARCH_CHUNK_BYTES pieces of a mapped file, each ending with a whole line."""
+    position = 0
+    while position < len(data):
+        end = data.find(b"\n", min(len(data), position + SEARCH_CHUNK_BYTES))
+        end = len(data) if end < 0 else end + 1
+        yield data[position:end].decode(encoding, errors="replace").replace("\r\n", "\n")
+        position = end
+
+
+def _line_anchors(pattern: str) -> str:
+    """The pattern with \\A and \\Z turned into ^ and $: on a chunk they must match at every line."""
+    return _ESCAPE.sub(lambda m: {"A": "^", "Z": "$"}.get(m.group(1), m.group(0)), pattern)
+
+
+def search(path: str, kind: FileKind, pattern: str, context: int = 2, max_matches: int = 50) -> Tuple[str, int, bool]:
+    """
+    Lines matching a regex with `context` lines around them.
+
+    The regex is matched against each decoded line on its own, so ^ and $ are
+    the line's start and end, a match never spans lines, and case is ignored
+    for accented letters too.
+
+    Returns:
+        (text, number of matching lines shown, whether the search stopped early)
+    """
+    regex = re.compile(pattern, re.IGNORECASE)
+    lines = _LineSearch(regex, context, max_matches)
+    if not kind.ascii_compatible:
+        for number, line in enumerate(_text_lines(path, kind.encoding), 1):
+            if not lines.feed(number, line):
+                break
+        return lines.result()
+
+    # Whole chunks are checked first (with MULTILINE, any line match is a chunk
+    # match); only chunks with a candidate are split and matched line by line
+    chunk_regex = re.compile(_line_anchors(pattern), re.IGNORECASE | re.MULTILINE)
+    data = _open_map(path)
+    if data is None:
+        return "", 0, False
+    with data:
+        number = 1
+        for chunk in _text_chunks(data, kind.encoding):
+            chunk_lines = chunk.split("\n")
+            if chunk.endswith("\n"):
+                chunk_lines.pop()
+            if lines.after_left or chunk_regex.search(chunk):
+                for line in chunk_lines:
+                    if not lines.feed(number, line):
+                        return lines.result()
+                    number += 1
+            else:
+                tail = chunk_lines[-context:] if context else []
+                first = number + len(chunk_lines) - len(tail)
+                lines.before.extend(zip(range(first, first + len(tail)), tail))
+                number += len(chunk_lines)
+    return lines.result()
@@ -0,0 +1,213 @@
+"""
+Streaming subprocess engine.
+Runs a shell command on an asyncio loop, hands its stdout/stderr to a callback
+line by line while it runs, and keeps only the head and tail of each stream for
+the text returned to the LLM. The command can be cancelled or time out; either
+way the output read so far is returned.
+"""
+
+import asyncio
+import codecs
+import locale
+import logging
+import os
+import signal
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+OUTPUT_HEAD_CHARS = 4000
+OUTPUT_TAIL_CHARS = 4000
+READ_CHUNK_BYTES = 4096
+POLL_INTERVAL = 0.1  # seconds between cancellation checks
+KILL_GRACE_SECONDS = 2.0  # between SIGTERM and SIGKILL
+
+OutputCallback = Callable[[str, str], None]  # (stream name, line)
+
+
+class HeadTailBuffer:
+    """Keeps the first and last characters of a stream, counts what is dropped in between."""
+
+    def __init__(self, head_chars: int = OUTPUT_HEAD_CHARS, tail_chars: int = OUTPUT_TAIL_CHARS):
+        self.head_chars = head_chars
+        self.tail_chars = tail_chars
+        self.head = ""
+        self.tail = ""
+        self.total_chars = 0
+
+    def write(self, text: str):
+        self.total_chars += len(text)
+        if len(self.head) < self.head_chars:
+            room = self.head_chars - len(self.head)
+            self.head += text[:room]
+            text = text[room:]
+        if text:
+            self.tail = (self.tail + text)[-self.tail_chars:]
+
+    @property
+    def omitted_chars(self) -> int:
+        return self.total_chars - len(self.head) - len(self.tail)
+
+    def getvalue(self) -> str:
+        if self.omitted_chars > 0:
+            return f"{self.head}\n[... {self.omitted_chars} characters omitted ...]\n{self.tail}"
+        return self.head + self.tail
+
+
+@dataclass
+class ProcessResult:
+    command: str
+    returncode: Optional[int]  # None if the process had to be killed
+    stdout: str
+    stderr: str
+    duration: float
+    timed_out: bool = False
+    cancelled: bool = False
+    truncated_chars: int = 0  # dropped from the middle of stdout + stderr
+    cwd: Optional[str] = None  # working directory after the command (shell sessions)
+
+    @property
+    def finished(self) -> bool:
+        return not (self.timed_out or self.cancelled)
+
+
+async def _pump(stream: asyncio.StreamReader, name: str, buffer: HeadTailBuffer, on_output: Optional[OutputCallback]):
+    decoder = codecs.getincrementaldecoder(locale.getpreferredencoding(False))(errors="replace")
+    pending = ""
+    while True:
+        chunk = await stream.read(READ_CHUNK_BYTES)
+        text = decoder.decode(chunk, final=not chunk)
+        buffer.write(text)
+        if on_output is not None:
+            lines = (pending + text).split("\n")
+            pending = lines.pop()
+            if not chunk and pending:
+                lines.append(pending)
+            for line in lines:
+                try:
+                    on_output(name, line.rstrip("\r"))
+                except Exception as e:
+                    logging.debug(f"Output callback failed: {e}")
+        if not chunk:
+            return
+
+
+def _signal_group(process: asyncio.subprocess.Process, sig: int):
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, sig)  # even if the shell is gone, its children may not be
+        elif process.returncode is None:
+            process.kill() if sig == getattr(signal, "SIGKILL", None) else process.terminate()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+async def _terminate(process: asyncio.subprocess.Process, readers: asyncio.Future):
+    """SIGTERM the command's process group, SIGKILL it if its pipes are still open after the grace period."""
+    _signal_group(process, signal.SIGTERM)
+    done, _ = await asyncio.wait({readers}, timeout=KILL_GRACE_SECONDS)
+    if not done:
+        _signal_group(process, getattr(signal, "SIGKILL", signal.SIGTERM))
+
+
+def _consume(future: asyncio.Future):
+    # Retrieve the result so a cancelled or failed gather is not reported as never retrieved
+    if not future.cancelled():
+        future.exception()
+
+
+async def stream_process(command: str, timeout: float, on_output: Optional[OutputCallback] = None,
+                         cancelled: Optional[Callable[[], bool]] = None, cwd: Optional[str] = None,
+                         head_chars: int = OUTPUT_HEAD_CHARS, tail_chars: int = OUTPUT_TAIL_CHARS) -> ProcessResult:
+    """
+    Run a shell command, streaming its output.
+
+    Args:
+        command: Shell command line
+        timeout: Seconds before the command is stopped
+        on_output: Called with ("stdout" | "stderr", line) for every line as it arrives
+        cancelled: Polled while the command runs; returning True stops it
+        cwd: Working directory
+        head_chars, tail_chars: How much of the start and end of each stream to keep
+
+    Returns:
+        The result, with the output read until the command ended or was stopped
+    """
+    start = time.monotonic()
+    process = await asyncio.create_subprocess_shell(
+        command,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=cwd,
+        start_new_session=os.name == "posix",  # own process group, so children are stopped too
+    )
+    stdout, stderr = HeadTailBuffer(head_chars, tail_chars), HeadTailBuffer(head_chars, tail_chars)
+    readers = asyncio.gather(_pump(process.stdout, "stdout", stdout, on_output),
+                             _pump(process.stderr, "stderr", stderr, on_output))
+    readers.add_done_callback(_consume)
+    # Process.wait() also waits for the pipes to close, which a background child
+    # can hold open long after the shell exited: returncode is checked as well
+    waiter = asyncio.ensure_future(process.wait())
+    timed_out = was_cancelled = False
+
+    deadline = start + timeout
+    while not waiter.done() and process.returncode is None:
+        await asyncio.wait({waiter}, timeout=min(POLL_INTERVAL, max(0.0, deadline - time.monotonic())))
+        if waiter.done() or process.returncode is not None:
+            break
+        if cancelled is not None and cancelled():
+            was_cancelled = True
+        elif time.monotonic() >= deadline:
+            timed_out = True
+        else:
+            continue
+        break
+
+    if timed_out or was_cancelled:
+        await _terminate(process, readers)
+    # Background children may keep the pipes open after the shell exits
+    done, _ = await asyncio.wait({readers}, timeout=KILL_GRACE_SECONDS)
+    if not done:
+        readers.cancel()
+    if not waiter.done():
+        waiter.cancel()
+        while process.returncode is None and time.monotonic() - start < timeout + 2 * KILL_GRACE_SECONDS:
+            await asyncio.sleep(POLL_INTERVAL / 10)
+    process._transport.close()  # don't wait for pipes a detached child holds (kills the shell if still there)
+
+    return ProcessResult(
+        command=command,
+        returncode=None if timed_out or was_cancelled else process.returncode,
+        stdout=stdout.getvalue(),
+        stderr=stderr.getvalue(),
+        duration=time.monotonic() - start,
+        timed_out=timed_out,
+        cancelled=was_cancelled,
+        truncated_chars=max(0, stdout.omitted_chars) + max(0, stderr.omitted_chars),
+    )
+
+
+def run_process(command: str, timeout: float, **kwargs) -> ProcessResult:
+    """Blocking wrapper around `stream_process`, callable from any thread."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(stream_process(command, timeout, **kwargs))
+
+    # Already inside an event loop (async caller): run on a helper thread's own loop
+    result = {}
+
+    def target():
+        try:
+            result["value"] = asyncio.run(stream_process(command, timeout, **kwargs))
+        except BaseException as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=target, name="pierre-process", daemon=True)
+    thread.start()
+    thread.join()
+    if "error" in result:
+        raise result["error"]
+    return result["value"]
@@ -0,0 +1,299 @@
+"""
+Persistent shell sessions.
+run_command chains (check, install, retry) run in long-lived bash processes on a
+pseudo-terminal, so `cd`, `conda activate` and exported variables carry over
+from one call to the next. Each command is followed by a sentinel line carrying
+its exit code and the shell's cwd, which tells where its output ends. Commands
+are written to a script the shell sources, so only a short line is typed into
+the pty (a canonical-mode pty cuts input lines at 4095 bytes). Sessions idle
+for too long are closed by a reaper thread.
+"""
+
+import atexit
+import codecs
+import fcntl
+import locale
+import logging
+import os
+import pty
+import re
+import secrets
+import select
+import shlex
+import shutil
+import signal
+import subprocess
+import tempfile
+import termios
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from singleton import singleton
+from utils.process_runner import (HeadTailBuffer, KILL_GRACE_SECONDS, OUTPUT_HEAD_CHARS, OUTPUT_TAIL_CHARS,
+                                  POLL_INTERVAL, OutputCallback, ProcessResult)
+
+IDLE_TIMEOUT = float(os.getenv("SHELL_SESSION_IDLE", 600))  # seconds before an unused session is closed
+MAX_SESSIONS = int(os.getenv("SHELL_MAX_SESSIONS", 4))
+REAP_INTERVAL = 30.0
+READ_CHUNK_BYTES = 4096
+MAX_INPUT_LINE = 4095  # bytes the pty line discipline accepts per line (N_TTY_BUF_SIZE - 1)
+
+_ANSI = re.compile(r"\x1b\[[0-?]*[ -/]*[@-~]|\x1b\][^\x07]*\x07|\x1b[()][A-Z0-9]")
+
+
+def is_supported() -> bool:
+    """Shell sessions need a POSIX pty and bash."""
+    return os.name == "posix" and shutil.which("bash") is not None
+
+
+def _make_controlling_tty():
+    # Runs in the child after setsid(): the pty becomes its controlling terminal,
+    # so Ctrl-C written to it interrupts the foreground command
+    fcntl.ioctl(0, termios.TIOCSCTTY, 0)
+
+
+class ShellSession:
+    """One bash process on a pseudo-terminal, running one command at a time."""
+
+    def __init__(self, name: str, cwd: Optional[str] = None):
+        self.name = name
+        self.cwd = cwd or os.getcwd()
+        self.created_at = self.last_used = time.monotonic()
+        self.commands_run = 0
+        self._token = secrets.token_hex(4)
+        self._lock = threading.Lock()
+        self._script_dir = tempfile.mkdtemp(prefix="pierre-shell-")
+        self._script = os.path.join(self._script_dir, "command.sh")
+
+        master, slave = pty.openpty()
+        attrs = termios.tcgetattr(slave)
+        attrs[1] &= ~termios.ONLCR  # no \r added to output lines
+        attrs[3] &= ~termios.ECHO  # the commands we write are not echoed back
+        termios.tcsetattr(slave, termios.TCSANOW, attrs)
+
+        env = dict(os.environ, PS1="", PS2="", PROMPT_COMMAND="", TERM="dumb", PAGER="cat", GIT_PAGER="cat")
+        try:
+            self.process = subprocess.Popen(
+                [shutil.which("bash") or "/bin/bash", "--noprofile", "--norc", "--noediting", "-i"],
+                stdin=slave, stdout=slave, stderr=slave, cwd=self.cwd, env=env,
+                start_new_session=True, preexec_fn=_make_controlling_tty, close_fds=True,
+            )
+        except Exception:
+            os.close(master)
+            shutil.rmtree(self._script_dir, ignore_errors=True)
+            raise
+        finally:
+            os.close(slave)
+        self._fd = master
+        self._write("set +H; unset HISTFILE\n")  # no history expansion of "!" in commands
+        logging.info(f"🐚 Shell session '{name}' started (pid {self.process.pid})")
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    def run(self, command: str, timeout: float, on_output: Optional[OutputCallback] = None,
+            cancelled: Optional[Callable[[], bool]] = None, head_chars: int = OUTPUT_HEAD_CHARS,
+            tail_chars: int = OUTPUT_TAIL_CHARS) -> ProcessResult:
+        """
+        Run a command in this shell (stdout and stderr merged).
+
+        Args:
+            command: Shell command line(s)
+            timeout: Seconds before the command is interrupted with Ctrl-C
+            on_output: Called with ("stdout", line) for every line as it arrives
+            cancelled: Polled while the command runs; returning True interrupts it
+            head_chars, tail_chars: How much of the start and end of the output to keep
+
+        Returns:
+            The result; returncode is None if the command was interrupted or the shell exited
+        """
+        with self._lock:
+            self.commands_run += 1
+            marker = f"__PIERRE_{self._token}_{self.commands_run}__"
+            start = time.monotonic()
+            with open(self._script, "w", encoding="utf-8") as f:
+                f.write(command.strip() + "\n")
+            # Sourced, so cd/export/conda activate still change this shell; the whole line is
+            # parsed before it runs, so the sentinel can't be read as the command's input
+            self._write(f"{{ . {shlex.quote(self._script)}; }} < /dev/null; {self._sentinel_command()}")
+
+            output = HeadTailBuffer(head_chars, tail_chars)
+            decoder = codecs.getincrementaldecoder(locale.getpreferredencoding(False))(errors="replace")
+            pending = ""
+            returncode = None
+            interrupted = None  # "timeout" or "cancelled"
+            interrupted_at = 0.0
+            finished = False
+
+            while not finished:
+                now = time.monotonic()
+                if interrupted is None:
+                    if cancelled is not None and cancelled():
+                        interrupted = "cancelled"
+                    elif now - start >= timeout:
+                        interrupted = "timeout"
+                    if interrupted:
+                        interrupted_at = now
+                        self._interrupt()
+                elif now - interrupted_at >= KILL_GRACE_SECONDS:
+                    logging.warning(f"⚠️  Shell session '{self.name}' did not recover from Ctrl-C, closing it")
+                    self.close()
+                    break
+
+                data = self._read(POLL_INTERVAL)
+                if data is None:  # the shell exited
+                    break
+                pending += decoder.decode(data)
+                lines = pending.split("\n")
+                pending = lines.pop()
+                for line in lines:
+                    line = _ANSI.sub("", line).replace("\r", "")
+                    text, found, status, cwd = self._parse_sentinel(line, marker)
+                    if text:
+                        output.write(text + "\n")
+                        if on_output is not None:
+                            try:
+                                on_output("stdout", text)
+                            except Exception as e:
+                                logging.debug(f"Output callback failed: {e}")
+                    if found:
+                        returncode = None if interrupted else status
+                        self.cwd = cwd or self.cwd
+                        finished = True
+                        break
+
+            self.last_used = time.monotonic()
+            return ProcessResult(
+                command=command,
+                returncode=returncode,
+                stdout=output.getvalue(),
+                stderr="",
+                duration=time.monotonic() - start,
+                timed_out=interrupted == "timeout",
+                cancelled=interrupted == "cancelled",
+                truncated_chars=max(0, output.omitted_chars),
+                cwd=self.cwd,
+            )
+
+    def close(self):
+        """Stop the shell and everything it started."""
+        if self.is_alive():
+            try:
+                os.killpg(self.process.pid, signal.SIGHUP)
+                self.process.wait(KILL_GRACE_SECONDS)
+            except subprocess.TimeoutExpired:
+                os.killpg(self.process.pid, signal.SIGKILL)
+                self.process.wait()
+            except ProcessLookupError:
+                pass
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        shutil.rmtree(self._script_dir, ignore_errors=True)
+
+    def _sentinel_command(self) -> str:
+        # The marker is assembled by printf, so the command text never contains it
+        return (f"printf '__PIERRE_%s_%s__ %s %s\\n' '{self._token}' '{self.commands_run}' \"$?\" \"$PWD\"\n")
+
+    def _parse_sentinel(self, line: str, marker: str):
+        """(output text, is our sentinel, exit code, cwd) of a line."""
+        index = line.find("__PIERRE_")
+        if index < 0:
+            return line, False, None, None
+        match = re.match(r"__PIERRE_(\w+?_\d+)__ (\d+) (.*)$", line[index:])
+        if match is None:
+            return line, False, None, None
+        if f"__PIERRE_{match.group(1)}__" != marker:
+            return line[:index], False, None, None  # left over from an interrupted command
+        return line[:index], True, int(match.group(2)), match.group(3)
+
+    def _interrupt(self):
+        """Ctrl-C the running command, then ask for the sentinel again."""
+        self._write("\x03")
+        time.sleep(POLL_INTERVAL)
+        self._write(self._sentinel_command())
+
+    def _write(self, text: str):
+        data = text.encode()
+        if any(len(line) > MAX_INPUT_LINE for line in data.split(b"\n")):
+            # The line discipline would silently cut it and run the rest
+            raise ValueError(f"Line of {len(data)} bytes is too long for the shell's terminal")
+        if self._fd is not None:
+            os.write(self._fd, data)
+
+    def _read(self, timeout: float) -> Optional[bytes]:
+        """Available output (possibly empty), None once the shell is gone."""
+        if self._fd is None:
+            return None
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return b"" if self.is_alive() else None
+        try:
+            data = os.read(self._fd, READ_CHUNK_BYTES)
+        except OSError:  # EIO: the other end of the pty is closed
+            return None
+        return data or None
+
+
+@singleton
+class ShellSessionManager:
+    """Named shell sessions reused across tool calls, closed when idle."""
+
+    def __init__(self, idle_timeout: float = IDLE_TIMEOUT, max_sessions: int = MAX_SESSIONS):
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, ShellSession]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._reaper = None
+        atexit.register(self.close_all)
+
+    def get(self, name: str = "main") -> ShellSession:
+        """The session with this name, started if needed."""
+        with self._lock:
+            session = self._sessions.get(name)
+            if session is not None and not session.is_alive():
+                session.close()
+                session = None
+            if session is None:
+                while len(self._sessions) >= self.max_sessions:
+                    _, oldest = self._sessions.popitem(last=False)
+                    oldest.close()
+                session = ShellSession(name)
+                self._sessions[name] = session
+            self._sessions.move_to_end(name)
+            if self._reaper is None:
+                self._reaper = threading.Thread(target=self._reap_loop, name="pierre-shell-reaper", daemon=True)
+                self._reaper.start()
+            return session
+
+    def run(self, command: str, timeout: float, session: str = "main", **kwargs) -> ProcessResult:
+        """Run a command in a named session, see `ShellSession.run`."""
+        return self.get(session).run(command, timeout, **kwargs)
+
+    def close(self, name: str):
+        with self._lock:
+            session = self._sessions.pop(name, None)
+        if session is not None:
+            session.close()
+
+    def close_all(self):
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+    def _reap_loop(self):
+        while True:
+            time.sleep(REAP_INTERVAL)
+            now = time.monotonic()
+            with self._lock:
+                idle = [name for name, session in self._sessions.items()
+                        if not session._lock.locked() and (now - session.last_used > self.idle_timeout
+                                                           or not session.is_alive())]
+                sessions = [self._sessions.pop(name) for name in idle]
+            for session in sessions:
+                logging.info(f"🐚 Closing idle shell session '{session.name}' ({session.commands_run} commands)")
+                session.close()
@@ -0,0 +1,37 @@
+import math
+from typing import Iterable
+
+# Rough average for Qwen-style BPE tokenizers on mixed French/English text
+CHARS_PER_TOKEN = 3.5
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens of a text without loading a tokenizer.
+
+    Args:
+        text: The text to measure
+
+    Returns:
+        int: Estimated token count
+    """
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def estimate_messages_tokens(messages: Iterable) -> int:
+    """
+    Estimate the token count of a list of LangChain messages.
+
+    Args:
+        messages: Messages with a `content` attribute
+
+    Returns:
+        int: Estimated token count, including a small per-message overhead
+    """
+    total = 0
+    for message in messages:
+        content = message.content if isinstance(message.content, str) else str(message.content)
+        total += estimate_tokens(content) + 4  # role markers and separators
+    return total
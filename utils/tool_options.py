@@ -0,0 +1,49 @@
+import os
+from typing import Optional
+
+# Default time limit of a tool call running on the executor's pool, in seconds
+DEFAULT_TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT", 60))
+# Default size limit of a tool output put in the agent scratchpad, in estimated tokens
+DEFAULT_OBSERVATION_TOKENS = int(os.getenv("OBSERVATION_TOKEN_BUDGET", 1200))
+
+
+def tool_options(parallel_safe: bool = True, timeout: Optional[float] = None,
+                 observation_tokens: Optional[int] = None):
+    """
+    Declare how the agent executor may run a tool. Stack it above `@tool`:
+
+        @tool_options(parallel_safe=False)
+        @tool("exit_pierre")
+        def exit_pierre() -> str: ...
+
+    Args:
+        parallel_safe: False if the tool must run alone, on the agent's thread
+            (it changes Pierre's state, exits, or depends on call order)
+        timeout: Seconds before a call is abandoned, defaults to TOOL_TIMEOUT
+        observation_tokens: Token budget of the tool's output in the agent scratchpad,
+            defaults to OBSERVATION_TOKEN_BUDGET; 0 never cuts it
+
+    Returns:
+        Decorator storing the options in the tool's metadata
+    """
+    def decorate(tool):
+        options = {"parallel_safe": parallel_safe}
+        if timeout is not None:
+            options["timeout"] = timeout
+        if observation_tokens is not None:
+            options["observation_tokens"] = observation_tokens
+        tool.metadata = {**(tool.metadata or {}), **options}
+        return tool
+    return decorate
+
+
+def is_parallel_safe(tool) -> bool:
+    return (tool.metadata or {}).get("parallel_safe", True)
+
+
+def get_timeout(tool) -> float:
+    return (tool.metadata or {}).get("timeout", DEFAULT_TOOL_TIMEOUT)
+
+
+def get_observation_tokens(tool) -> int:
+    return (tool.metadata or {}).get("observation_tokens", DEFAULT_OBSERVATION_TOKENS)
@@ -0,0 +1,223 @@
+"""
+Voice activity detection.
+Sits between the capture ring buffer and the recognizers: silent frames are
+skipped, speech start and end are detected, and complete utterances are handed
+to Vosk instead of fixed-size reads that cut commands mid-sentence.
+"""
+
+import logging
+import os
+import time
+from collections import deque
+from typing import Optional
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+FRAME_MS = 30
+FRAME_SAMPLES = SAMPLE_RATE * FRAME_MS // 1000
+FRAME_BYTES = FRAME_SAMPLES * SAMPLE_WIDTH
+
+
+class EnergyZcrBackend:
+    """
+    Energy and zero-crossing-rate detector, vectorized over all frames of a chunk.
+
+    The noise floor adapts to the room: frames classified as silence slowly pull
+    it towards their energy, so a fan or a distant TV does not count as speech.
+    """
+
+    def __init__(self, energy_ratio: float = 3.0, min_energy: float = 200.0, zcr_unvoiced: float = 0.25):
+        self.energy_ratio = energy_ratio
+        self.min_energy = min_energy
+        self.zcr_unvoiced = zcr_unvoiced
+        self.noise_floor = min_energy / energy_ratio
+
+    def classify(self, frames: np.ndarray) -> np.ndarray:
+        """
+        Args:
+            frames: int16 array of shape (n_frames, FRAME_SAMPLES)
+
+        Returns:
+            Boolean array, True for speech frames
+        """
+        samples = frames.astype(np.float32)
+        energy = np.sqrt(np.mean(samples * samples, axis=1))
+        signs = np.signbit(samples)
+        zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+
+        threshold = max(self.min_energy, self.noise_floor * self.energy_ratio)
+        voiced = energy > threshold
+        # Fricatives ("s", "ch", "f") are quiet but cross zero very often
+        unvoiced = (energy > threshold / 2) & (zcr > self.zcr_unvoiced)
+        speech = voiced | unvoiced
+
+        silence = energy[~speech]
+        if silence.size:
+            self.noise_floor = 0.95 * self.noise_floor + 0.05 * float(np.median(silence))
+        return speech
+
+
+class WebRtcBackend:
+    """Google WebRTC VAD (optional `webrtcvad` package)."""
+
+    def __init__(self, aggressiveness: int = 2):
+        import webrtcvad
+        self.vad = webrtcvad.Vad(aggressiveness)
+
+    def classify(self, frames: np.ndarray) -> np.ndarray:
+        return np.array([self.vad.is_speech(frame.tobytes(), SAMPLE_RATE) for frame in frames], dtype=bool)
+
+
+BACKENDS = {
+    "energy": EnergyZcrBackend,
+    "webrtc": WebRtcBackend,
+}
+
+
+def create_backend(name: Optional[str] = None):
+    """Create the VAD backend selected by name or by the VAD_BACKEND environment variable."""
+    name = name or os.getenv("VAD_BACKEND", "energy")
+    try:
+        return BACKENDS[name]()
+    except ImportError as e:
+        logging.warning(f"⚠️  VAD backend '{name}' unavailable ({e}), falling back to energy")
+        return EnergyZcrBackend()
+    except KeyError:
+        raise ValueError(f"Unknown VAD backend '{name}'. Supported backends are {list(BACKENDS)}.")
+
+
+class VoiceActivityDetector:
+    """Frames raw PCM chunks and classifies them with a pluggable backend."""
+
+    def __init__(self, backend=None):
+        self.backend = backend or create_backend()
+        self._leftover = b""
+
+    def frames(self, chunk: bytes):
+        """
+        Split a chunk into whole frames, keeping the remainder for the next call.
+
+        Returns:
+            Tuple of (frames as int16 array of shape (n, FRAME_SAMPLES), speech flags)
+        """
+        data = self._leftover + chunk
+        usable = len(data) - len(data) % FRAME_BYTES
+        self._leftover = data[usable:]
+        frames = np.frombuffer(data[:usable], dtype=np.int16).reshape(-1, FRAME_SAMPLES)
+        if not len(frames):
+            return frames, np.zeros(0, dtype=bool)
+        return frames, self.backend.classify(frames)
+
+    def is_speech(self, chunk: bytes) -> bool:
+        """True if any frame of the chunk contains speech."""
+        _, flags = self.frames(chunk)
+        return bool(flags.any())
+
+    def reset(self):
+        self._leftover = b""
+
+
+class SpeechGate:
+    """
+    Lets only speech through to a streaming recognizer (e.g. the wake-word one).
+
+    A chunk of pre-roll is kept so the onset of a word is not lost, and a few
+    chunks of hangover keep the recognizer fed between syllables.
+    """
+
+    def __init__(self, detector: Optional[VoiceActivityDetector] = None, hangover_chunks: int = 4):
+        self.detector = detector or VoiceActivityDetector()
+        self.hangover_chunks = hangover_chunks
+        self._hangover = 0
+        self._previous = b""
+
+    def filter(self, chunk: bytes) -> bytes:
+        """
+        Returns:
+            The audio to feed the recognizer, empty if the chunk is silence
+        """
+        if self.detector.is_speech(chunk):
+            data = self._previous + chunk if self._hangover == 0 else chunk
+            self._hangover = self.hangover_chunks
+        elif self._hangover > 0:
+            data = chunk
+            self._hangover -= 1
+        else:
+            data = b""
+        self._previous = chunk
+        return data
+
+    def is_open(self) -> bool:
+        return self._hangover > 0
+
+
+class Endpointer:
+    """Detects the start and end of an utterance in a capture stream."""
+
+    CHUNK_BYTES = 3200  # 100 ms
+    STALL_MARGIN_S = 2.0  # wall-clock slack over max_utterance_s when the capture stalls
+
+    def __init__(self, detector: Optional[VoiceActivityDetector] = None,
+                 start_ms: int = 90, end_silence_ms: int = 800, pre_roll_ms: int = 300, max_utterance_s: float = 15):
+        self.detector = detector or VoiceActivityDetector()
+        self.start_frames = max(1, start_ms // FRAME_MS)
+        self.end_frames = max(1, end_silence_ms // FRAME_MS)
+        self.max_frames = int(max_utterance_s * 1000 // FRAME_MS)
+        self.max_utterance_s = max_utterance_s
+        self.pre_roll = deque(maxlen=max(1, pre_roll_ms // FRAME_MS))
+
+    def listen(self, cursor, timeout: Optional[float] = None) -> Optional[bytes]:
+        """
+        Read from a capture cursor until a complete utterance has been heard.
+
+        Args:
+            cursor: CaptureCursor to read from
+            timeout: Seconds to wait for speech to start, None waits forever
+
+        Returns:
+            The utterance PCM (with pre-roll), or None if nobody spoke before the
+            timeout or the capture stopped
+        """
+        self.detector.reset()
+        self.pre_roll.clear()
+        utterance = None
+        speech_run = 0
+        silence_run = 0
+        frame_count = 0
+        start_time = time.time()
+        speech_started_at = None
+
+        while True:
+            if utterance is None and timeout is not None and time.time() - start_time > timeout:
+                return None
+            # Frames are counted from captured audio: bound the wait when audio stops flowing
+            if speech_started_at is not None and time.time() - speech_started_at > self.max_utterance_s + self.STALL_MARGIN_S:
+                logging.warning(f"⚠️ Capture stalled mid-utterance, keeping {frame_count * FRAME_MS} ms")
+                return bytes(utterance)
+
+            chunk = cursor.read(self.CHUNK_BYTES, timeout=0.5)
+            if not chunk and cursor.ring.closed:
+                logging.warning("⚠️ Audio capture stopped, no utterance")
+                return None
+            frames, flags = self.detector.frames(chunk)
+
+            for frame, speech in zip(frames, flags):
+                frame = frame.tobytes()
+                if utterance is None:
+                    self.pre_roll.append(frame)
+                    speech_run = speech_run + 1 if speech else 0
+                    if speech_run >= self.start_frames:
+                        logging.debug("🗨️ Speech started")
+                        utterance = bytearray(b"".join(self.pre_roll))
+                        frame_count = len(self.pre_roll)
+                        speech_started_at = time.time()
+                    continue
+
+                utterance += frame
+                frame_count += 1
+                silence_run = 0 if speech else silence_run + 1
+                if silence_run >= self.end_frames or frame_count >= self.max_frames:
+                    logging.debug(f"🗨️ Speech ended ({frame_count * FRAME_MS} ms)")
+                    return bytes(utterance)